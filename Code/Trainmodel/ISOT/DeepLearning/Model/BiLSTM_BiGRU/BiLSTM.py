@@ -1,4 +1,6 @@
 #BiLSTM Embedding Layer & Tokenizer
+import os
+import sys
 import pandas as pd
 import re
 import pickle
@@ -28,18 +30,9 @@ df.drop(['title', 'text'], axis=1, inplace=True)
 X_train, X_test, y_train, y_test = train_test_split(df['title_text'], df['class'], test_size=0.2, random_state=42)
 
 # Tiền xử lý dữ liệu
-def normalize(data):
-    normalized = []
-    for i in data:
-        i = i.lower()
-        i = re.sub('https?://\S+|www\.\S+', '', i)  # Loại bỏ URL
-        i = re.sub('\\W', ' ', i)  # Loại bỏ ký tự đặc biệt
-        i = re.sub('\n', '', i)  # Loại bỏ xuống dòng
-        i = re.sub(' +', ' ', i)  # Loại bỏ khoảng trắng dư thừa
-        i = re.sub('^ ', '', i)  # Xóa khoảng trắng đầu câu
-        i = re.sub(' $', '', i)  # Xóa khoảng trắng cuối câu
-        normalized.append(i)
-    return normalized
+# normalize() dùng chung: Code/Trainmodel/shared/preprocessing.py (chạy 2 regex trên cả lô thay vì 6 lượt re.sub mỗi văn bản)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from preprocessing import normalize
 
 X_train, X_test = normalize(X_train), normalize(X_test)
 
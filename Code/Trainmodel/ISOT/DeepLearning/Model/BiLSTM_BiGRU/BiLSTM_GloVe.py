@@ -1,4 +1,6 @@
 #BiGRU & GloVe
+import os
+import sys
 import pandas as pd
 import re
 import pickle
@@ -64,14 +66,6 @@ X_test_tokens = [text.split() for text in X_test]
 embedding_dim = 100
 glove_path = '../working/glove_data/glove.6B.100d.txt'
 
-embeddings_index = {}
-with open(glove_path, encoding='utf-8') as f:
-    for line in f:
-        values = line.split()
-        word = values[0]
-        coefs = np.asarray(values[1:], dtype='float32')
-        embeddings_index[word] = coefs
-
 # Tokenization
 vocab_size = 10000
 max_length = 256
@@ -84,12 +78,12 @@ X_train = pad_sequences(tokenizer.texts_to_sequences(X_train), padding=padding_t
 X_test = pad_sequences(tokenizer.texts_to_sequences(X_test), padding=padding_type, truncating=trunc_type, maxlen=max_length)
 
 # Tạo Embedding Matrix từ GloVe
+# Kho nhị phân (shared/glove_store.py): lần đầu chuyển glove.txt sang vocab + ma trận float32 memory-map,
+# các lần sau chỉ tra vector của vocab_size từ thay vì đọc 400k dòng vào dict
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from glove_store import glove_embedding_matrix
 word_index = tokenizer.word_index
-embedding_matrix = np.zeros((vocab_size, embedding_dim))
-
-for word, i in word_index.items():
-    if i < vocab_size and word in embeddings_index:
-        embedding_matrix[i] = embeddings_index[word]
+embedding_matrix = glove_embedding_matrix(glove_path, word_index, vocab_size)
 
 # Build model với GloVe
 model = tf.keras.Sequential([
@@ -1,4 +1,6 @@
 #BiLSTM & Word2Vec
+import os
+import sys
 import pandas as pd
 import re
 import pickle
@@ -7,7 +9,6 @@ import tensorflow as tf
 import seaborn as sns
 import numpy as np
 from datetime import datetime
-from gensim.models import Word2Vec
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, confusion_matrix, precision_score, recall_score, f1_score, classification_report
 from tensorflow.keras.preprocessing.text import Tokenizer
@@ -30,18 +31,9 @@ df.drop(['title', 'text'], axis=1, inplace=True)
 X_train, X_test, y_train, y_test = train_test_split(df['title_text'], df['class'], test_size=0.2, random_state=42)
 
 # Tiền xử lý dữ liệu
-def normalize(data):
-    normalized = []
-    for i in data:
-        i = i.lower()
-        i = re.sub('https?://\S+|www\.\S+', '', i)  # Loại bỏ URL
-        i = re.sub('\\W', ' ', i)  # Loại bỏ ký tự đặc biệt
-        i = re.sub('\n', '', i)  # Loại bỏ xuống dòng
-        i = re.sub(' +', ' ', i)  # Loại bỏ khoảng trắng dư thừa
-        i = re.sub('^ ', '', i)  # Xóa khoảng trắng đầu câu
-        i = re.sub(' $', '', i)  # Xóa khoảng trắng cuối câu
-        normalized.append(i)
-    return normalized
+# normalize() dùng chung: Code/Trainmodel/shared/preprocessing.py (chạy 2 regex trên cả lô thay vì 6 lượt re.sub mỗi văn bản)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from preprocessing import normalize
 
 X_train, X_test = normalize(X_train), normalize(X_test)
 
@@ -49,9 +41,11 @@ X_train, X_test = normalize(X_train), normalize(X_test)
 X_train_tokens = [text.split() for text in X_train]
 X_test_tokens = [text.split() for text in X_test]
 
-# Huấn luyện Word2Vec
+# Huấn luyện Word2Vec (shared/w2v_stage.py): chỉ huấn luyện một lần cho mỗi corpus + siêu tham số, dùng chung với
+# LSTM_W2V.py; các lần sau mở KeyedVectors đã lưu bằng mmap. Số luồng = số lõi khả dụng
+from w2v_stage import embedding_matrix as w2v_embedding_matrix, train_word2vec
 embedding_dim = 100
-w2v_model = Word2Vec(sentences=X_train_tokens, vector_size=embedding_dim, window=5, min_count=1, workers=4)
+w2v = train_word2vec(X_train_tokens, vector_size=embedding_dim, window=5, min_count=1)
 
 # Tokenization
 vocab_size = 10000
@@ -66,11 +60,7 @@ X_test = pad_sequences(tokenizer.texts_to_sequences(X_test), padding=padding_typ
 
 # Tạo Embedding Matrix từ Word2Vec
 word_index = tokenizer.word_index
-embedding_matrix = np.zeros((vocab_size, embedding_dim))
-
-for word, i in word_index.items():
-    if i < vocab_size and word in w2v_model.wv:
-        embedding_matrix[i] = w2v_model.wv[word]
+embedding_matrix = w2v_embedding_matrix(w2v, word_index, vocab_size) # Từ không có trong Word2Vec: vector 0
 
 # Build model với Word2Vec
 model = tf.keras.Sequential([
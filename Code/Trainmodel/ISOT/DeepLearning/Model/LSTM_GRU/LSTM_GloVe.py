@@ -3,6 +3,8 @@
 # !unzip glove.6B.zip -d glove_data
 # !rm glove.6B.zip
 
+import os
+import sys
 import pandas as pd
 import re
 import numpy as np
@@ -36,17 +38,9 @@ df.drop(['title', 'text'], axis=1, inplace=True)
 X_train, X_test, y_train, y_test = train_test_split(df['title_text'], df['class'], test_size=0.2, random_state=42)
 
 # Tiền xử lý dữ liệu
-def normalize(data):
-    normalized = []
-    for i in data:
-        i = i.lower()
-        i = re.sub(r'https?://\S+|www\.\S+', '', i)  # Loại bỏ URL
-        i = re.sub(r'\W', ' ', i)  # Loại bỏ ký tự đặc biệt
-        i = re.sub(r'\n', '', i)  # Loại bỏ xuống dòng
-        i = re.sub(r' +', ' ', i)  # Loại bỏ khoảng trắng dư thừa
-        i = i.strip()  # Xóa khoảng trắng đầu/cuối
-        normalized.append(i)
-    return normalized
+# normalize() dùng chung: Code/Trainmodel/shared/preprocessing.py (chạy 2 regex trên cả lô thay vì 6 lượt re.sub mỗi văn bản)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from preprocessing import normalize
 
 X_train, X_test = normalize(X_train), normalize(X_test)
 
@@ -70,22 +64,11 @@ with open(f"LSTM_GloVe_tokenizer.pkl", "wb") as f:
 # Load GloVe embeddings
 embedding_dim = 100  # Kích thước vector word embedding
 glove_path = '../working/glove_data/glove.6B.100d.txt'  # Đường dẫn đến file GloVe
-embedding_index = {}
-
-with open(glove_path, 'r', encoding='utf-8') as f:
-    for line in f:
-        values = line.split()
-        word = values[0]
-        vector = np.asarray(values[1:], dtype='float32')
-        embedding_index[word] = vector
-
-# Tạo embedding matrix
-embedding_matrix = np.zeros((max_words, embedding_dim))
-for word, i in tokenizer.word_index.items():
-    if i < max_words:
-        vector = embedding_index.get(word)
-        if vector is not None:
-            embedding_matrix[i] = vector
+
+# Tạo embedding matrix từ kho nhị phân (shared/glove_store.py): lần đầu chuyển glove.txt sang vocab + ma trận
+# float32 memory-map, các lần sau chỉ tra vector của max_words từ thay vì đọc 400k dòng vào dict
+from glove_store import glove_embedding_matrix
+embedding_matrix = glove_embedding_matrix(glove_path, tokenizer.word_index, max_words)
 
 # Build LSTM model with GloVe embeddings
 model = Sequential([
@@ -1,4 +1,6 @@
 #LSTM & Word2Vec
+import os
+import sys
 import pandas as pd
 import re
 import pickle
@@ -11,7 +13,6 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, confusion_matrix, precision_score, recall_score, f1_score, classification_report
 from tensorflow.keras.preprocessing.text import Tokenizer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
-from gensim.models import Word2Vec
 
 plt.style.use('ggplot')
 
@@ -30,18 +31,9 @@ df.drop(['title', 'text'], axis=1, inplace=True)
 X_train, X_test, y_train, y_test = train_test_split(df['title_text'], df['class'], test_size=0.2, random_state=42)
 
 # Tiền xử lý dữ liệu
-def normalize(data):
-    normalized = []
-    for i in data:
-        i = i.lower()
-        i = re.sub('https?://\S+|www\.\S+', '', i)  # Loại bỏ URL
-        i = re.sub('\\W', ' ', i)  # Loại bỏ ký tự đặc biệt
-        i = re.sub('\n', '', i)  # Loại bỏ xuống dòng
-        i = re.sub(' +', ' ', i)  # Loại bỏ khoảng trắng dư thừa
-        i = re.sub('^ ', '', i)  # Xóa khoảng trắng đầu câu
-        i = re.sub(' $', '', i)  # Xóa khoảng trắng cuối câu
-        normalized.append(i)
-    return normalized
+# normalize() dùng chung: Code/Trainmodel/shared/preprocessing.py (chạy 2 regex trên cả lô thay vì 6 lượt re.sub mỗi văn bản)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from preprocessing import normalize
 
 X_train, X_test = normalize(X_train), normalize(X_test)
 
@@ -58,18 +50,12 @@ word_index = tokenizer.word_index
 X_train = pad_sequences(tokenizer.texts_to_sequences(X_train), padding=padding_type, truncating=trunc_type, maxlen=max_length)
 X_test = pad_sequences(tokenizer.texts_to_sequences(X_test), padding=padding_type, truncating=trunc_type, maxlen=max_length)
 
-# Train Word2Vec
-# Lấy danh sách câu gốc trước khi tokenization
-sentences = [text.split() for text in df['title_text']]
-w2v_model = Word2Vec(sentences, vector_size=embedding_dim, window=5, min_count=1, workers=4)
-embedding_matrix = np.zeros((vocab_size, embedding_dim))
-
-for word, i in word_index.items():
-    if i < vocab_size:
-        try:
-            embedding_matrix[i] = w2v_model.wv[word]
-        except KeyError:
-            embedding_matrix[i] = np.random.normal(scale=0.6, size=(embedding_dim,))
+# Train Word2Vec (shared/w2v_stage.py) trên cùng corpus X_train đã normalize như BiLSTM_W2V.py: Word2Vec chỉ được
+# huấn luyện một lần cho cả hai script (cache theo corpus + siêu tham số, mở lại bằng mmap), số luồng = số lõi khả dụng
+from w2v_stage import embedding_matrix as w2v_embedding_matrix, train_word2vec
+sentences = [text.split() for text in X_train]
+w2v = train_word2vec(sentences, vector_size=embedding_dim, window=5, min_count=1)
+embedding_matrix = w2v_embedding_matrix(w2v, word_index, vocab_size, missing="random", scale=0.6) # Từ thiếu: N(0, 0.6)
 
 # Build LSTM model
 model = tf.keras.Sequential([
@@ -1,5 +1,8 @@
 #MLP & TF-IDF
+import os
+import sys
 import pandas as pd
+import numpy as np
 import re
 import pickle
 import matplotlib.pyplot as plt
@@ -29,25 +32,22 @@ df.drop(['title', 'text'], axis=1, inplace=True)
 X_train, X_test, y_train, y_test = train_test_split(df['title_text'], df['class'], test_size=0.2, random_state=42)
 
 # Tiền xử lý dữ liệu
-def normalize(data):
-    normalized = []
-    for i in data:
-        i = i.lower()
-        i = re.sub('https?://\S+|www\.\S+', '', i)  # Loại bỏ URL
-        i = re.sub('\\W', ' ', i)  # Loại bỏ ký tự đặc biệt
-        i = re.sub('\n', '', i)  # Loại bỏ xuống dòng
-        i = re.sub(' +', ' ', i)  # Loại bỏ khoảng trắng dư thừa
-        i = re.sub('^ ', '', i)  # Xóa khoảng trắng đầu câu
-        i = re.sub(' $', '', i)  # Xóa khoảng trắng cuối câu
-        normalized.append(i)
-    return normalized
+# normalize() dùng chung: Code/Trainmodel/shared/preprocessing.py (chạy 2 regex trên cả lô thay vì 6 lượt re.sub mỗi văn bản)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from preprocessing import normalize
 
 X_train, X_test = normalize(X_train), normalize(X_test)
 
 # TF-IDF
-vectorizer = TfidfVectorizer(max_features=10000)
-X_train = vectorizer.fit_transform(X_train).toarray()
-X_test = vectorizer.transform(X_test).toarray()
+# Giữ ma trận thưa CSR float32 (không .toarray() cả tập: ~45k x 10k float64 ~ 3.6 GB); mỗi lô được chuyển sang dense
+# float32 khi đưa vào model (shared/sparse_data.py), nên MAX_FEATURES có thể tăng xa hơn 10k mà không hết RAM
+from sparse_data import sparse_dataset
+MAX_FEATURES = int(os.environ.get("MAX_FEATURES", 10000))
+vectorizer = TfidfVectorizer(max_features=MAX_FEATURES, dtype=np.float32)
+X_train = vectorizer.fit_transform(X_train)
+X_test = vectorizer.transform(X_test)
+train_ds = sparse_dataset(X_train, y_train, batch_size=128, shuffle=True, densify=True)
+test_ds = sparse_dataset(X_test, y_test, batch_size=128, densify=True) # Giữ thứ tự để so với y_test
 
 # Save vectorizer
 with open(f"MLP_TDIDF_vectorizer.pkl", "wb") as f:
@@ -65,7 +65,7 @@ model = Sequential([
 model.compile(loss='binary_crossentropy', optimizer=Adam(1e-4), metrics=['accuracy'])
 
 # Train model
-history = model.fit(X_train, y_train, epochs=10, batch_size=128, validation_data=(X_test, y_test), shuffle=True)
+history = model.fit(train_ds, epochs=10, validation_data=test_ds)
 
 # Lấy thời gian hiện tại để gắn vào tên tệp
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -101,11 +101,11 @@ plt.savefig(f"MLP_TDIDF_training_accuracy_{timestamp}.png")
 plt.show()
 
 # Model evaluation
-test_loss, test_acc = model.evaluate(X_test, y_test)
+test_loss, test_acc = model.evaluate(test_ds)
 print(f"Test Accuracy: {test_acc:.4f}")
 
 # Dự đoán
-y_pred = (model.predict(X_test) >= 0.5).astype(int)
+y_pred = (model.predict(sparse_dataset(X_test, batch_size=128, densify=True)) >= 0.5).astype(int)
 
 # Tính các chỉ số đánh giá
 accuracy = accuracy_score(y_test, y_pred)
@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
@@ -46,9 +48,11 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.20, random
 # Load BERT tokenizer
 tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
 
-# Tokenize data
-train_encodings = tokenizer(list(X_train), truncation=True, padding=True, max_length=256, return_tensors="tf")
-test_encodings = tokenizer(list(X_test), truncation=True, padding=True, max_length=256, return_tensors="tf")
+# Tokenize data (có cache trên đĩa: Code/Trainmodel/shared/token_cache.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from token_cache import encode_cached
+train_encodings = encode_cached(X_train, tokenizer, max_length=256).padded(padding='longest')
+test_encodings = encode_cached(X_test, tokenizer, max_length=256).padded(padding='longest')
 # Convert labels to tensors
 train_labels = tf.convert_to_tensor(y_train.values)
 test_labels = tf.convert_to_tensor(y_test.values)
@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import re
 from nltk.stem.porter import PorterStemmer
@@ -36,20 +38,9 @@ y = df['class']
 
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.20, random_state=42)
 
-def normalize(data):
-    normalized = []
-    for i in data:
-        i = i.lower()
-        # get rid of urls
-        i = re.sub('https?://\S+|www\.\S+', '', i)
-        # get rid of non words and extra spaces
-        i = re.sub('\\W', ' ', i)
-        i = re.sub('\n', '', i)
-        i = re.sub(' +', ' ', i)
-        i = re.sub('^ ', '', i)
-        i = re.sub(' $', '', i)
-        normalized.append(i)
-    return normalized
+# normalize() dùng chung: Code/Trainmodel/shared/preprocessing.py (chạy 2 regex trên cả lô thay vì 6 lượt re.sub mỗi văn bản)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "shared"))
+from preprocessing import normalize
 
 X_train = normalize(X_train)
 X_test = normalize(X_test)
@@ -1,4 +1,6 @@
 # Import thư viện
+import os
+import sys
 import pandas as pd
 import numpy as np
 import tensorflow as tf
@@ -47,11 +49,19 @@ y_test = df2["label"]
 # Tokenizer RoBERTa
 tokenizer = RobertaTokenizer.from_pretrained('roberta-base')
 
-def encode_texts(texts, tokenizer, max_length=256):
-    return tokenizer(list(texts), padding='max_length', truncation=True, max_length=max_length, return_tensors='tf')
+# Token cache (Code/Trainmodel/shared/token_cache.py): lần chạy sau với cùng dữ liệu/tokenizer/max_length
+# (vd. chỉ đổi optimizer hoặc số epoch) đọc input_ids từ đĩa thay vì tokenize lại
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+from token_cache import encode_cached
+# Pipeline tf.data (shared/tf_pipeline.py): gom lô theo độ dài + pad động tới câu dài nhất của lô thay vì pad mọi câu
+# tới 256 token, prefetch lô kế tiếp trong lúc lô hiện tại đang huấn luyện
+from tf_pipeline import build_pipeline, cached_dataset
 
-X_train_enc = encode_texts(X_train, tokenizer)
-X_test_enc = encode_texts(X_test, tokenizer)
+BATCH_SIZE = 16
+X_train_enc = encode_cached(X_train, tokenizer, max_length=256)
+X_test_enc = encode_cached(X_test, tokenizer, max_length=256)
+train_ds = build_pipeline(cached_dataset(X_train_enc, y_train), BATCH_SIZE, tokenizer.pad_token_id, shuffle_buffer=len(X_train_enc))
+test_ds = build_pipeline(cached_dataset(X_test_enc, y_test), BATCH_SIZE, tokenizer.pad_token_id, bucket=False) # Giữ thứ tự để so với y_test
 
 # Load mô hình RoBERTa
 model = TFRobertaForSequenceClassification.from_pretrained('roberta-base', num_labels=2)
@@ -64,12 +74,7 @@ model.compile(optimizer=optimizer, loss=loss_fn, metrics=['accuracy'])
 
 # Huấn luyện
 early_stop = tf.keras.callbacks.EarlyStopping(monitor='loss', patience=3, restore_best_weights=True)
-history = model.fit(
-    [X_train_enc['input_ids'], X_train_enc['attention_mask']], 
-    tf.keras.utils.to_categorical(y_train, num_classes=2),
-    validation_data=([X_test_enc['input_ids'], X_test_enc['attention_mask']], tf.keras.utils.to_categorical(y_test, num_classes=2)),
-    epochs=10, batch_size=16, shuffle=True, callbacks=[early_stop]
-)
+history = model.fit(train_ds, validation_data=test_ds, epochs=10, callbacks=[early_stop])
 
 # Lấy timestamp
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -96,7 +101,7 @@ plt.savefig(f"RoBERTa_accuracy_{timestamp}.png")
 plt.show()
 
 # Dự đoán
-y_pred_logits = model.predict([X_test_enc['input_ids'], X_test_enc['attention_mask']])[0]
+y_pred_logits = model.predict(test_ds)[0]
 y_pred = np.argmax(y_pred_logits, axis=1)
 
 # Tính các chỉ số đánh giá
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Thời gian tạo embedding_matrix và RSS đỉnh: đọc glove.txt vào dict (cũ) so với kho nhị phân glove_store.
+
+Mỗi chế độ chạy trong một tiến trình con riêng. word_index được dựng như Tokenizer Keras (<OOV> = 1, từ phổ biến trước)
+từ --csv đã qua normalize(), giữ num_words từ như các script *_GloVe.py.
+Chạy: python bench_glove.py --glove ../working/glove_data/glove.6B.100d.txt --csv ../input/isot-fakenew-dataset/train.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+def keras_word_index(texts):
+    counts = Counter(word for text in texts for word in text.split())
+    return {word: i + 2 for i, (word, _) in enumerate(sorted(counts.items(), key=lambda kv: -kv[1]))} | {"<OOV>": 1}
+
+
+def legacy_embedding_matrix(glove_path, word_index, num_words, embedding_dim):
+    """Đúng như LSTM_GloVe.py trước đây."""
+    embedding_index = {}
+    with open(glove_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            values = line.split()
+            embedding_index[values[0]] = np.asarray(values[1:], dtype='float32')
+    embedding_matrix = np.zeros((num_words, embedding_dim))
+    for word, i in word_index.items():
+        if i < num_words:
+            vector = embedding_index.get(word)
+            if vector is not None: embedding_matrix[i] = vector
+    return embedding_matrix
+
+
+def load_glove_dim(glove_path):
+    with open(glove_path, encoding="utf-8") as f: return len(f.readline().split()) - 1
+
+
+def run_worker(args):
+    from glove_store import glove_embedding_matrix, load_glove
+    from preprocessing import normalize
+    word_index = keras_word_index(normalize(pd.read_csv(args.csv, delimiter=";", names=["text", "label"], skiprows=1)["text"].dropna()))
+    start = time.perf_counter()
+    if args.worker == "text": matrix = legacy_embedding_matrix(args.glove, word_index, args.num_words, load_glove_dim(args.glove))
+    else: matrix = glove_embedding_matrix(args.glove, word_index, args.num_words)
+    seconds = time.perf_counter() - start
+    print(json.dumps({"mode": args.worker, "seconds": seconds, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      "digest": hashlib.sha256(matrix.astype(np.float32).tobytes()).hexdigest()[:16]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--glove", required=True)
+    parser.add_argument("--csv", required=True, help="CSV phân tách ';' với cột text;label")
+    parser.add_argument("--num-words", type=int, default=10000)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker: return run_worker(args)
+
+    from glove_store import store_path
+    shutil.rmtree(store_path(args.glove), ignore_errors=True) # Bắt đầu từ trạng thái chưa chuyển
+    results = []
+    for mode in ("text", "store-cold", "store-warm"):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", mode] + sys.argv[1:], capture_output=True, text=True)
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if output.returncode != 0 or not lines: print(f"❌ {mode} thất bại:\n{output.stderr[-2000:]}"); continue
+        results.append(json.loads(lines[-1]))
+    print(f"{args.glove} -> embedding_matrix ({args.num_words} từ)")
+    print(f"{'chế độ':<14}{'giây':>8}{'RSS đỉnh MB':>13}  ma trận")
+    for r in results: print(f"{r['mode']:<14}{r['seconds']:>8.2f}{r['peak_rss_mb']:>13.0f}  {r['digest']}")
+    if len({r["digest"] for r in results}) > 1: print("❌ embedding_matrix khác nhau giữa các chế độ"); sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""So sánh normalize() cũ (vòng lặp từng văn bản, 6 lượt re.sub) với preprocessing.normalize() trên ISOT.
+
+Kiểm tra kết quả giống hệt nhau trên toàn bộ corpus và các trường hợp biên trước khi đo thời gian;
+thoát với mã 1 nếu có văn bản khác kết quả.
+Chạy: python bench_preprocessing.py --isot-dir ../input/isot-dataset --workers 4
+      python bench_preprocessing.py --csv "../../../Dataset/New_Dataset/Fake or Real News Dataset/test.csv"
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+from preprocessing import DOC_SEPARATOR, normalize
+
+EDGE_CASES = ["", " ", "\n", "   Hello   World  ", "Visit https://example.com/a?b=1 now", "www.site.org/x,y end",
+              "HTTP://UPPER.COM stays", "tab\tand\nnewline", "under_score snake_case", "ΟΔΟΣ ΣΟΦΟΣ", "İstanbul",
+              "emoji 😀 and — dashes", "naïve café", "x" + DOC_SEPARATOR + "y", "trailing url http://a.b", "!!!", "a  \n  b"]
+
+
+def legacy_normalize(data):
+    """Bản gốc được chép trong MLP_TFIDF.py, LSTM.py, BiLSTM.py, ..."""
+    normalized = []
+    for i in data:
+        i = i.lower()
+        i = re.sub(r'https?://\S+|www\.\S+', '', i)
+        i = re.sub(r'\W', ' ', i)
+        i = re.sub(r'\n', '', i)
+        i = re.sub(r' +', ' ', i)
+        i = re.sub(r'^ ', '', i)
+        i = re.sub(r' $', '', i)
+        normalized.append(i)
+    return normalized
+
+
+def load_isot(isot_dir):
+    frames = [pd.read_csv(os.path.join(isot_dir, name))[['title', 'text']] for name in ("Fake.csv", "True.csv")]
+    df = pd.concat(frames, ignore_index=True)
+    return (df['title'] + ' ' + df['text']).astype(str).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--isot-dir", default="../input/isot-dataset", help="Thư mục chứa Fake.csv và True.csv")
+    parser.add_argument("--csv", default=None, help="Dùng file test.csv (phân tách ';') thay cho ISOT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = (pd.read_csv(args.csv, delimiter=";", names=["text", "label"], skiprows=1)["text"].dropna().astype(str).tolist()
+             if args.csv else load_isot(args.isot_dir))
+    print(f"📄 {len(texts)} văn bản, {sum(len(t) for t in texts) / 2**20:.1f} MB")
+
+    expected = legacy_normalize(EDGE_CASES + texts)
+    for workers in (1, args.workers):
+        mismatches = [i for i, (a, b) in enumerate(zip(expected, normalize(EDGE_CASES + texts, workers=workers))) if a != b]
+        if mismatches:
+            i = mismatches[0]; source = (EDGE_CASES + texts)[i]
+            print(f"❌ {len(mismatches)} văn bản khác kết quả (workers={workers}), ví dụ #{i}: {source[:80]!r}\n   cũ: {expected[i][:80]!r}\n   mới: {normalize([source])[0][:80]!r}")
+            sys.exit(1)
+    print(f"✅ Kết quả giống hệt normalize() cũ trên {len(expected)} văn bản")
+
+    print(f"{'cách':<28}{'tốt nhất s':>12}{'docs/s':>12}{'tăng tốc':>10}")
+    baseline = None
+    for name, fn in (("normalize() cũ", legacy_normalize), ("preprocessing.normalize", normalize),
+                     (f"preprocessing, {args.workers} tiến trình", lambda data: normalize(data, workers=args.workers))):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter(); fn(texts); best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f"{name:<28}{best:>12.2f}{len(texts) / best:>12.0f}{baseline / best:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""RSS đỉnh và thời gian mỗi epoch của MLP TF-IDF/BoW: .toarray() float64 (cũ) so với lô thưa (sparse_data.py).
+
+Mỗi chế độ chạy trong một tiến trình con riêng:
+    dense    X.toarray() rồi model.fit(X, y) như MLP_TFIDF.py / MLP_BoW.py trước đây
+    sparse   lô tf.SparseTensor, Dense nhân sparse x dense
+    densify  lô CSR được chuyển sang dense float32 từng lô một
+Chạy: python bench_sparse_mlp.py --csv ../input/isot-fakenew-dataset/train.csv --vectorizer tfidf --max-features 10000
+--repeat N nhân bản tập dữ liệu N lần để mô phỏng kích thước ISOT (~45k bài) khi chỉ có CSV nhỏ.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def run_worker(args):
+    import tensorflow as tf
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    from tensorflow.keras.layers import Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    from preprocessing import normalize
+    from sparse_data import sparse_dataset
+    df = pd.read_csv(args.csv, delimiter=";", names=["text", "label"], skiprows=1).dropna()
+    texts = normalize(df["text"]) * args.repeat; y = np.tile(df["label"].astype(int).values, args.repeat)
+    vectorizer_class = TfidfVectorizer if args.vectorizer == "tfidf" else CountVectorizer
+    if args.worker == "dense": X = vectorizer_class(max_features=args.max_features).fit_transform(texts).toarray()
+    else: X = vectorizer_class(max_features=args.max_features, dtype=np.float32).fit_transform(texts)
+    model = Sequential([Input(shape=(X.shape[1],), sparse=args.worker == "sparse"), Dense(512, activation='relu'), Dropout(0.5),
+                        Dense(256, activation='relu'), Dropout(0.5), Dense(1, activation='sigmoid')])
+    model.compile(loss='binary_crossentropy', optimizer=tf.keras.optimizers.Adam(1e-4), metrics=['accuracy'])
+    epoch_times = []
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None): self.start = time.perf_counter()
+        def on_epoch_end(self, epoch, logs=None): epoch_times.append(time.perf_counter() - self.start)
+
+    if args.worker == "dense": history = model.fit(X, y, epochs=args.epochs, batch_size=128, shuffle=True, verbose=0, callbacks=[EpochTimer()])
+    else: history = model.fit(sparse_dataset(X, y, batch_size=128, shuffle=True, densify=args.worker == "densify"),
+                              epochs=args.epochs, verbose=0, callbacks=[EpochTimer()])
+    print(json.dumps({"mode": args.worker, "rows": X.shape[0], "features": X.shape[1], "epoch_s": epoch_times[-1], "first_epoch_s": epoch_times[0],
+                      "accuracy": history.history["accuracy"][-1], "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", required=True, help="CSV phân tách ';' với cột text;label")
+    parser.add_argument("--vectorizer", choices=["tfidf", "bow"], default="tfidf")
+    parser.add_argument("--max-features", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--modes", default="dense,sparse,densify")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker: return run_worker(args)
+
+    results = []
+    for mode in args.modes.split(","):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", mode] + sys.argv[1:], capture_output=True, text=True,
+                                env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if output.returncode != 0 or not lines: print(f"❌ {mode} thất bại:\n{output.stderr[-2000:]}"); continue
+        results.append(json.loads(lines[-1]))
+    if results: print(f"{args.vectorizer}: {results[0]['rows']} văn bản x {results[0]['features']} đặc trưng, {args.epochs} epoch")
+    print(f"{'chế độ':<10}{'s/epoch':>9}{'epoch đầu s':>13}{'accuracy':>10}{'RSS đỉnh MB':>13}")
+    for r in results: print(f"{r['mode']:<10}{r['epoch_s']:>9.2f}{r['first_epoch_s']:>13.2f}{r['accuracy']:>10.3f}{r['peak_rss_mb']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Thời gian mỗi bước huấn luyện và RSS đỉnh: mảng pad max_length đưa thẳng vào model.fit() (cũ) so với pipeline tf.data.
+
+Mỗi chế độ chạy trong một tiến trình con riêng để RSS đỉnh không lẫn vào nhau.
+Chạy (như Rov2.py):
+    python bench_tf_pipeline.py --csv "../../../Dataset/New_Dataset/Fake News Detection Dataset/test.csv" --model roberta-base
+Không có transformers/trọng số RoBERTa: --model proxy dùng một encoder Keras nhỏ (2 lớp attention) và tokenizer
+tách từ + hash, đủ để so sánh tương đối chi phí padding/nạp dữ liệu chứ không phải thời gian thực của RoBERTa.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+class HashTokenizer:
+    """Tokenizer thay thế khi không có transformers: <s> + hash(từ) + </s>, cắt ở max_length."""
+    name_or_path = "hash"; pad_token_id = 1; vocab_size = 30000
+
+    def __len__(self):
+        return self.vocab_size
+
+    def __call__(self, texts, truncation=True, max_length=256, padding=False, **kwargs):
+        rows = [[0] + [3 + zlib.crc32(w.encode("utf-8")) % (self.vocab_size - 3) for w in t.split()][:max_length - 2] + [2] for t in texts]
+        if padding == "max_length": # Như tokenizer HF: pad + attention_mask
+            return {"input_ids": np.array([r + [self.pad_token_id] * (max_length - len(r)) for r in rows], dtype=np.int32),
+                    "attention_mask": np.array([[1] * len(r) + [0] * (max_length - len(r)) for r in rows], dtype=np.int32)}
+        return {"input_ids": rows}
+
+
+def proxy_model(vocab_size, dim=128, heads=4, layers=2):
+    import tensorflow as tf
+    ids = tf.keras.Input((None,), dtype="int32", name="input_ids"); mask = tf.keras.Input((None,), dtype="int32", name="attention_mask")
+    x = tf.keras.layers.Embedding(vocab_size, dim)(ids)
+    attention_mask = tf.keras.layers.Lambda(lambda m: tf.cast(m[:, None, :], tf.bool))(mask)
+    for _ in range(layers):
+        x = tf.keras.layers.LayerNormalization()(x + tf.keras.layers.MultiHeadAttention(heads, dim // heads)(x, x, attention_mask=attention_mask))
+        x = tf.keras.layers.LayerNormalization()(x + tf.keras.layers.Dense(dim)(tf.keras.layers.Dense(dim * 4, activation="gelu")(x)))
+    logits = tf.keras.layers.Dense(2)(x[:, 0]) # Vị trí <s> như head phân loại của RoBERTa
+    return tf.keras.Model({"input_ids": ids, "attention_mask": mask}, logits)
+
+
+class StepTimer:
+    def __init__(self):
+        self.times = []
+
+    def make(self):
+        import tensorflow as tf
+        timer = self
+
+        class Callback(tf.keras.callbacks.Callback):
+            def on_train_batch_begin(self, batch, logs=None): timer.start = time.perf_counter()
+            def on_train_batch_end(self, batch, logs=None): timer.times.append(time.perf_counter() - timer.start)
+        return Callback()
+
+
+def run_worker(args):
+    """Tiến trình con: huấn luyện --epochs epoch ở một chế độ, in một dòng JSON kết quả."""
+    import tensorflow as tf
+    from tf_pipeline import build_pipeline, cached_dataset, csv_text_dataset, tokenized_dataset
+    from token_cache import encode_cached
+    df = pd.read_csv(args.csv, delimiter=";", names=["text", "label"], skiprows=1).dropna()
+    texts, labels = df["text"].astype(str).tolist(), df["label"].astype(int).values
+    if args.model == "proxy":
+        tokenizer = HashTokenizer(); model = proxy_model(len(tokenizer))
+    else:
+        from transformers import AutoTokenizer, TFAutoModelForSequenceClassification
+        tokenizer = AutoTokenizer.from_pretrained(args.model); model = TFAutoModelForSequenceClassification.from_pretrained(args.model, num_labels=2)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=1e-5), loss=tf.keras.losses.CategoricalCrossentropy(from_logits=True))
+    timer = StepTimer(); start = time.perf_counter()
+    if args.worker == "dense": # Như Rov2.py trước đây: tokenize pad max_length rồi đưa mảng NumPy vào fit()
+        enc = tokenizer(texts, padding="max_length", truncation=True, max_length=args.max_length, return_tensors="np")
+        model.fit({"input_ids": enc["input_ids"], "attention_mask": enc["attention_mask"]}, tf.keras.utils.to_categorical(labels, num_classes=2),
+                  epochs=args.epochs, batch_size=args.batch_size, shuffle=True, verbose=0, callbacks=[timer.make()])
+    else:
+        if args.worker == "pipeline-csv": # Stream CSV + tokenize song song trong tf.data
+            dataset = tokenized_dataset(csv_text_dataset(args.csv), tokenizer, max_length=args.max_length)
+        else: # Token cache (như Rov2.py hiện tại)
+            dataset = cached_dataset(encode_cached(texts, tokenizer, max_length=args.max_length, cache_dir=args.cache_dir), labels)
+        train_ds = build_pipeline(dataset, args.batch_size, tokenizer.pad_token_id, shuffle_buffer=len(texts))
+        model.fit(train_ds, epochs=args.epochs, verbose=0, callbacks=[timer.make()])
+    total = time.perf_counter() - start
+    steps = np.array(timer.times[3:] or timer.times) # Bỏ vài bước đầu (trace đồ thị)
+    print(json.dumps({"mode": args.worker, "steps": len(timer.times), "step_ms": float(steps.mean() * 1000), "step_p95_ms": float(np.percentile(steps, 95) * 1000),
+                      "total_s": total, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", required=True, help="CSV phân tách ';' với cột text;label")
+    parser.add_argument("--model", default="roberta-base", help="checkpoint HF (như Rov2.py) hoặc 'proxy'")
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--modes", default="dense,pipeline-cache,pipeline-csv")
+    parser.add_argument("--cache-dir", default=os.path.join("token_cache", "bench"))
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker: return run_worker(args)
+
+    results = []
+    for mode in args.modes.split(","):
+        command = [sys.executable, os.path.abspath(__file__), "--worker", mode] + sys.argv[1:]
+        output = subprocess.run(command, capture_output=True, text=True,
+                                env=dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3"))
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if output.returncode != 0 or not lines: print(f"❌ {mode} thất bại:\n{output.stderr[-2000:]}"); continue
+        results.append(json.loads(lines[-1]))
+    print(f"{args.csv} - model {args.model}, batch {args.batch_size}, max_length {args.max_length}, {args.epochs} epoch")
+    print(f"{'chế độ':<18}{'số bước':>8}{'ms/bước':>10}{'p95 ms':>10}{'tổng s':>9}{'RSS đỉnh MB':>13}")
+    for r in results:
+        print(f"{r['mode']:<18}{r['steps']:>8}{r['step_ms']:>10.1f}{r['step_p95_ms']:>10.1f}{r['total_s']:>9.1f}{r['peak_rss_mb']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
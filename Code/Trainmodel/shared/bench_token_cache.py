@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Thời gian khởi động lạnh/nóng của token cache so với tokenize trực tiếp như các script cũ.
+
+Chạy: python bench_token_cache.py --csv ../input/fndataset/train.csv --tokenizer roberta-base --max-length 256
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from token_cache import encode_cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", required=True, help="CSV phân tách ';' với cột text;label (như Rov2.py)")
+    parser.add_argument("--tokenizer", default="roberta-base")
+    parser.add_argument("--max-length", type=int, default=256)
+    args = parser.parse_args()
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    texts = pd.read_csv(args.csv, delimiter=";", names=["text", "label"], skiprows=1)["text"].astype(str).tolist()
+
+    start = time.perf_counter()
+    direct = tokenizer(texts, padding="max_length", truncation=True, max_length=args.max_length, return_tensors="np")
+    direct_s = time.perf_counter() - start
+
+    cache_dir = tempfile.mkdtemp(prefix="token_cache_")
+    try:
+        timings = {}
+        for phase in ("cold", "warm"):
+            start = time.perf_counter()
+            encoded = encode_cached(texts, tokenizer, max_length=args.max_length, cache_dir=cache_dir)
+            padded = encoded.padded(padding="max_length", max_length=args.max_length)
+            timings[phase] = time.perf_counter() - start
+        assert np.array_equal(padded["input_ids"], direct["input_ids"]) and np.array_equal(padded["attention_mask"], direct["attention_mask"])
+        print(f"{len(texts)} văn bản, max_length={args.max_length}: kết quả giống hệt tokenize trực tiếp")
+        print(f"{'tokenize trực tiếp (cũ)':<28}{direct_s:>8.2f}s")
+        print(f"{'token cache - lạnh':<28}{timings['cold']:>8.2f}s")
+        print(f"{'token cache - nóng':<28}{timings['warm']:>8.2f}s  ({direct_s / timings['warm']:.0f}x nhanh hơn)")
+        print(f"Dung lượng cache trên đĩa: {encoded.ids.nbytes / 2**20:.1f} MB (không pad) so với {direct['input_ids'].nbytes * 2 / 2**20:.1f} MB mảng đã pad")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
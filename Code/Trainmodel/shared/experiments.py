@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+# --- Bộ chạy thí nghiệm thống nhất cho "model zoo": LSTM/GRU/BiLSTM/BiGRU x Embedding/GloVe/W2V, LSTM & MLP x TF-IDF/BoW,
+#     BERT/RoBERTa x optimizer x số epoch ---
+# Các script cũ chỉ khác nhau vài dòng nhưng mỗi script tự đọc dữ liệu, normalize và tokenize lại. Ở đây:
+#   1. Mỗi dataset được đọc + normalize MỘT lần; mỗi đặc trưng (chuỗi token, ma trận GloVe/W2V, TF-IDF/BoW, token transformer)
+#      được tính một lần cho mỗi (dataset, tham số) và lưu vào EXPERIMENT_CACHE_DIR, dùng chung giữa các thí nghiệm và các lần chạy.
+#   2. Các thí nghiệm độc lập chạy song song trong ProcessPoolExecutor (spawn - TF không an toàn khi fork), mỗi tiến trình
+#      bị giới hạn số luồng TF/BLAS để các run không tranh lõi của nhau.
+#   3. Kết quả ghi vào Result/<dataset>/<thư mục mô hình>/ với cùng bộ file như các script cũ.
+# Chạy: python experiments.py --jobs 4 [--only "LSTM_*"] [--datasets "Fake News Dataset"] [--epochs 1] [--list]
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SHARED_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_DIR = os.environ.get("EXPERIMENT_INPUT_DIR", os.path.join("..", "input")) # Như đường dẫn Kaggle của các script
+RESULT_DIR = os.environ.get("EXPERIMENT_RESULT_DIR", os.path.join(SHARED_DIR, "..", "..", "..", "Result"))
+CACHE_DIR = os.environ.get("EXPERIMENT_CACHE_DIR", "experiment_cache")
+GLOVE_PATH = os.environ.get("GLOVE_PATH", os.path.join("..", "working", "glove_data", "glove.6B.100d.txt"))
+VOCAB_SIZE, MAX_LENGTH = 10000, 256
+W2V_PARAMS = {"vector_size": 100, "window": 5, "min_count": 1, "epochs": 5, "seed": 1} # Như *_W2V.py (epochs/seed: mặc định của gensim/w2v_stage)
+W2V_MISSING = {"w2v": {}, "w2v_random": {"missing": "random", "scale": 0.6}} # Từ không có trong Word2Vec: vector 0 / N(0, 0.6)
+VECTORIZER_PARAMS = {"max_features": VOCAB_SIZE} # TF-IDF/BoW của MLP_*.py, LSTM_TFIDF.py
+
+# Thư mục trong Result/ -> (thư mục trong INPUT_DIR, định dạng): "isot" = Fake.csv/True.csv chia 80/20; "split" = train.csv/test.csv (text;label)
+DATASETS = {
+    "ISOT Fake News Dataset": ("isot-dataset", "isot"),
+    "Fake News Dataset": ("fndataset", "split"),
+    "Fake News Detection Dataset": ("faknewdetection", "split"),
+    "Fake or Real News Dataset": ("fakeorreal", "split"),
+}
+RECURRENT = {"LSTM": ("lstm", False), "GRU": ("gru", False), "BiLSTM": ("lstm", True), "BiGRU": ("gru", True)}
+# (hai chiều?, embedding) -> (đặc trưng, cấu hình) đúng như script trong ISOT/DeepLearning/Model/LSTM_GRU (một chiều) và
+# BiLSTM_BiGRU (hai chiều). Mỗi script dùng chung cho cặp LSTM/GRU (BiLSTM/BiGRU): biến thể GRU chỉ đổi lớp hồi quy.
+# Tham số không ghi lấy theo RECURRENT_DEFAULTS.
+RECURRENT_DEFAULTS = {"trainable": False, "spatial_dropout": 0.0, "layer_dropout": 0.0, "cell_dropout": 0.0, "dense": None, "dropout": 0.0,
+                      "optimizer": "Adam", "learning_rate": 1e-5, "epochs": 10, "batch_size": 128, "early_stopping": True, "validation": False}
+RECURRENT_SCRIPTS = {
+    (False, "Embedding"): ("sequences", {"embedding_dim": 64, "trainable": True, "units": (64, 16), "dense": 64, "dropout": 0.5}), # LSTM.py
+    (False, "GloVe"): ("glove", {"embedding_dim": 100, "units": (128, 64), "layer_dropout": 0.5, # LSTM_GloVe.py: không có Dense ẩn,
+                                 "early_stopping": False, "validation": True}),                   # không EarlyStopping, validation trên tập test
+    (False, "W2V"): ("w2v_random", {"embedding_dim": 100, "units": (64, 32), "dense": 64, "dropout": 0.5}), # LSTM_W2V.py: từ thiếu N(0, 0.6)
+    (True, "Embedding"): ("sequences", {"embedding_dim": 64, "trainable": True, "units": (64, 16), "dense": 64, "dropout": 0.5}), # BiLSTM.py
+    (True, "GloVe"): ("glove", {"embedding_dim": 100, "trainable": True, "spatial_dropout": 0.3, "units": (128, 64), "cell_dropout": 0.3, # BiLSTM_GloVe.py
+                                "dense": 64, "dropout": 0.3, "optimizer": "Adamax", "epochs": 50}),
+    (True, "W2V"): ("w2v", {"embedding_dim": 100, "units": (100, 16), "dense": 100, "dropout": 0.5}), # BiLSTM_W2V.py: từ thiếu = vector 0
+}
+TRANSFORMERS = {"BERT": "bert-base-uncased", "RoBERTa": "roberta-base"}
+OPTIMIZERS = ("Adam", "AdamW", "Adamax")
+TRANSFORMER_EPOCHS = (3, 5, 10)
+
+Experiment = namedtuple("Experiment", ["name", "dataset", "kind", "feature", "result_subdir", "params"])
+
+
+def default_experiments():
+    """Toàn bộ model zoo cho mọi dataset (một cấu hình cho mỗi mô hình)."""
+    experiments = []
+    for dataset in DATASETS:
+        for arch, (cell, bidirectional) in RECURRENT.items():
+            for (script_bidirectional, embedding), (feature, params) in RECURRENT_SCRIPTS.items():
+                if script_bidirectional != bidirectional: continue
+                experiments.append(Experiment(f"{arch}_{embedding}", dataset, "recurrent", feature, os.path.join("DeepLearning", arch, embedding),
+                                              dict(RECURRENT_DEFAULTS, **params, cell=cell, bidirectional=bidirectional)))
+        experiments.append(Experiment("LSTM_TFIDF", dataset, "tfidf_lstm", "tfidf", os.path.join("DeepLearning", "LSTM", "TF-IDF"), {"epochs": 10, "learning_rate": 1e-4}))
+        for vectorizer in ("TFIDF", "BoW"):
+            experiments.append(Experiment(f"MLP_{vectorizer}", dataset, "mlp", vectorizer.lower(), os.path.join("DeepLearning", "MLP", vectorizer),
+                                          {"epochs": 10, "learning_rate": 1e-4 if vectorizer == "TFIDF" else 1e-5}))
+        for family, checkpoint in TRANSFORMERS.items():
+            for optimizer in OPTIMIZERS:
+                for epochs in TRANSFORMER_EPOCHS:
+                    experiments.append(Experiment(f"{family}_{optimizer}_{epochs}poch", dataset, "transformer", f"transformer:{checkpoint}",
+                                                  os.path.join(family, optimizer, f"{epochs}poch"),
+                                                  {"checkpoint": checkpoint, "optimizer": optimizer, "epochs": epochs, "learning_rate": 1e-5, "batch_size": 16}))
+    return experiments
+
+
+def load_experiments(path):
+    """Cấu hình từ file JSON: danh sách {"name", "dataset", "kind", "feature", "result_subdir", "params"}."""
+    with open(path, encoding="utf-8") as f: return [Experiment(**item) for item in json.load(f)]
+
+
+# ---------- Dữ liệu và đặc trưng (tiến trình chính, mỗi thứ tính một lần) ----------
+
+def _input_files(dataset):
+    directory, layout = DATASETS[dataset]
+    names = ("Fake.csv", "True.csv") if layout == "isot" else ("train.csv", "test.csv")
+    return layout, [os.path.join(INPUT_DIR, directory, name) for name in names]
+
+
+def load_dataset(dataset, limit=None):
+    """(X_train, X_test, y_train, y_test) văn bản gốc, cùng cách đọc/chia như các script."""
+    layout, files = _input_files(dataset)
+    if layout == "isot":
+        from sklearn.model_selection import train_test_split
+        fake_df = pd.read_csv(files[0])[['title', 'text']]; real_df = pd.read_csv(files[1])[['title', 'text']]
+        fake_df['class'] = 0; real_df['class'] = 1
+        df = pd.concat([fake_df, real_df], ignore_index=True).sample(frac=1, random_state=42).reset_index(drop=True)
+        X_train, X_test, y_train, y_test = train_test_split(df['title'] + ' ' + df['text'], df['class'], test_size=0.2, random_state=42)
+    else:
+        train_df, test_df = (pd.read_csv(f, delimiter=";", names=["text", "label"], skiprows=1).dropna() for f in files)
+        X_train, y_train, X_test, y_test = train_df["text"], train_df["label"], test_df["text"], test_df["label"]
+    X_train, X_test = [str(t) for t in X_train][:limit], [str(t) for t in X_test][:limit]
+    return X_train, X_test, np.asarray(y_train, dtype=np.int32)[:limit], np.asarray(y_test, dtype=np.int32)[:limit]
+
+
+def _file_stamp(path):
+    return [os.path.abspath(path), os.path.getsize(path), int(os.path.getmtime(path))]
+
+
+def feature_params(feature):
+    """Tham số (và file ngoài) quyết định nội dung một đặc trưng; là một phần khóa cache của feature_path()."""
+    if feature == "glove": return {"glove": _file_stamp(GLOVE_PATH)} # Đổi GLOVE_PATH hoặc file GloVe -> tính lại ma trận
+    if feature in W2V_MISSING: return dict(W2V_PARAMS, **W2V_MISSING[feature])
+    if feature in ("tfidf", "bow"): return VECTORIZER_PARAMS
+    return {}
+
+
+def feature_path(dataset, feature, limit=None):
+    """File cache của một đặc trưng; khóa gồm kích thước/mtime file dữ liệu và tham số của đặc trưng nên đổi gì cũng tính lại."""
+    sources = [(os.path.basename(f), os.path.getsize(f), int(os.path.getmtime(f))) for f in _input_files(dataset)[1]]
+    key = json.dumps([dataset, feature, sources, limit, VOCAB_SIZE, MAX_LENGTH, feature_params(feature)], sort_keys=True)
+    key = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{feature.replace(':', '_').replace('/', '_')}_{key}.npz")
+
+
+class DatasetFeatures:
+    """Đọc + normalize dataset một lần, tính lười từng đặc trưng cần dùng và ghi ra .npz."""
+
+    def __init__(self, dataset, limit=None):
+        self.dataset = dataset; self.limit = limit; self._data = None; self._normalized = None; self._tokenizer = None
+        self.shared_seconds = 0.0 # Đọc + normalize + fit Tokenizer: phần mà script cũ nào cũng làm lại
+
+    @property
+    def data(self):
+        if self._data is None:
+            start = time.perf_counter(); self._data = load_dataset(self.dataset, self.limit); self.shared_seconds += time.perf_counter() - start
+            print(f"📥 {self.dataset}: {len(self._data[0])} train / {len(self._data[1])} test trong {time.perf_counter() - start:.1f}s")
+        return self._data
+
+    @property
+    def normalized(self):
+        if self._normalized is None:
+            from preprocessing import normalize
+            X_train, X_test = self.data[:2]
+            start = time.perf_counter(); self._normalized = (normalize(X_train), normalize(X_test)); self.shared_seconds += time.perf_counter() - start
+        return self._normalized
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            from tensorflow.keras.preprocessing.text import Tokenizer
+            texts = self.normalized[0]; start = time.perf_counter()
+            self._tokenizer = Tokenizer(num_words=VOCAB_SIZE, oov_token="<OOV>"); self._tokenizer.fit_on_texts(texts)
+            self.shared_seconds += time.perf_counter() - start
+        return self._tokenizer
+
+    def build(self, feature):
+        y_train, y_test = self.data[2:]; X_train, X_test = self.normalized if not feature.startswith("transformer:") else self.data[:2]
+        if feature == "sequences":
+            from tensorflow.keras.preprocessing.sequence import pad_sequences
+            pad = lambda texts: pad_sequences(self.tokenizer.texts_to_sequences(texts), padding='post', truncating='post', maxlen=MAX_LENGTH)
+            return {"X_train": pad(X_train), "X_test": pad(X_test)}
+        if feature == "glove":
+            from glove_store import glove_embedding_matrix
+            return {"embedding_matrix": glove_embedding_matrix(GLOVE_PATH, self.tokenizer.word_index, VOCAB_SIZE)}
+        if feature in ("w2v", "w2v_random"): # Cùng một Word2Vec (cache của w2v_stage), chỉ khác cách điền từ thiếu
+            from w2v_stage import embedding_matrix, train_word2vec
+            wv = train_word2vec([t.split() for t in X_train], **W2V_PARAMS)
+            return {"embedding_matrix": embedding_matrix(wv, self.tokenizer.word_index, VOCAB_SIZE, **W2V_MISSING[feature])}
+        if feature in ("tfidf", "bow"):
+            from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+            vectorizer = (TfidfVectorizer if feature == "tfidf" else CountVectorizer)(dtype=np.float32, **VECTORIZER_PARAMS)
+            train, test = vectorizer.fit_transform(X_train).tocsr(), vectorizer.transform(X_test).tocsr()
+            return {f"{name}_{part}": getattr(matrix, part) for name, matrix in (("X_train", train), ("X_test", test))
+                    for part in ("data", "indices", "indptr", "shape")}
+        if feature.startswith("transformer:"):
+            from token_cache import encode_cached
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(feature.split(":", 1)[1])
+            train, test = encode_cached(X_train, tokenizer, MAX_LENGTH), encode_cached(X_test, tokenizer, MAX_LENGTH)
+            return {"train_ids": train.ids, "train_offsets": train.offsets, "test_ids": test.ids, "test_offsets": test.offsets,
+                    "pad_token_id": np.int64(tokenizer.pad_token_id)}
+        raise ValueError(f"Đặc trưng không hợp lệ: {feature}")
+
+    def prepare(self, feature):
+        """Đường dẫn .npz của đặc trưng (+ nhãn); chỉ tính nếu chưa có trong cache."""
+        path = feature_path(self.dataset, feature, self.limit)
+        if not os.path.exists(path):
+            start, shared = time.perf_counter(), self.shared_seconds; arrays = self.build(feature)
+            build_seconds = time.perf_counter() - start - (self.shared_seconds - shared)
+            os.makedirs(CACHE_DIR, exist_ok=True); tmp_path = f"{path}.tmp{os.getpid()}.npz"
+            np.savez(tmp_path, y_train=self.data[2], y_test=self.data[3], build_seconds=build_seconds, shared_seconds=self.shared_seconds, **arrays)
+            os.replace(tmp_path, path)
+            print(f"🧮 {self.dataset} / {feature}: {time.perf_counter() - start:.1f}s -> {path}")
+        return path
+
+
+def prep_cost(paths):
+    """Thời gian một script cũ tự bỏ ra để có các đặc trưng này (đọc + normalize + tokenize + tính đặc trưng); đọc từ file cache."""
+    costs = [np.load(path) for path in paths]
+    return max(float(c["shared_seconds"]) for c in costs) + sum(float(c["build_seconds"]) for c in costs)
+
+
+# ---------- Một thí nghiệm (tiến trình con) ----------
+
+def _limit_threads(threads):
+    """Giới hạn luồng của tiến trình con (gọi trước khi import TF)."""
+    for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"): os.environ[name] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"; os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    if SHARED_DIR not in sys.path: sys.path.append(SHARED_DIR)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads); tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _csr(features, name):
+    from scipy.sparse import csr_matrix
+    return csr_matrix((features[f"{name}_data"], features[f"{name}_indices"], features[f"{name}_indptr"]), shape=tuple(features[f"{name}_shape"]))
+
+
+def build_recurrent(params, embedding_matrix=None):
+    """Embedding -> [SpatialDropout1D] -> 2 lớp hồi quy [+ Dropout sau mỗi lớp] -> [Dense ẩn + Dropout] -> Dense(1), theo RECURRENT_SCRIPTS."""
+    import tensorflow as tf
+    params = dict(RECURRENT_DEFAULTS, **params)
+    cell = tf.keras.layers.LSTM if params["cell"] == "lstm" else tf.keras.layers.GRU
+    wrap = tf.keras.layers.Bidirectional if params["bidirectional"] else (lambda layer: layer)
+    embedding = tf.keras.layers.Embedding(VOCAB_SIZE, params["embedding_dim"], trainable=params["trainable"])
+    layers = [tf.keras.Input((MAX_LENGTH,), dtype="int32"), embedding]
+    if params["spatial_dropout"]: layers.append(tf.keras.layers.SpatialDropout1D(params["spatial_dropout"]))
+    layers.append(wrap(cell(params["units"][0], return_sequences=True)))
+    if params["layer_dropout"]: layers.append(tf.keras.layers.Dropout(params["layer_dropout"]))
+    layers.append(wrap(cell(params["units"][1], dropout=params["cell_dropout"])))
+    if params["layer_dropout"]: layers.append(tf.keras.layers.Dropout(params["layer_dropout"]))
+    if params["dense"]:
+        layers.append(tf.keras.layers.Dense(params["dense"], activation='relu'))
+        if params["dropout"]: layers.append(tf.keras.layers.Dropout(params["dropout"]))
+    model = tf.keras.Sequential(layers + [tf.keras.layers.Dense(1, activation='sigmoid')])
+    if embedding_matrix is not None: embedding.set_weights([embedding_matrix])
+    return model
+
+
+def train_experiment(experiment, features_path, extra_paths, threads, epochs_override=None):
+    """Huấn luyện + đánh giá một thí nghiệm, ghi kết quả vào Result/; trả về tóm tắt."""
+    start = time.perf_counter(); _limit_threads(threads)
+    import tensorflow as tf
+    params = dict(experiment.params, **({"epochs": epochs_override} if epochs_override else {}))
+    features = np.load(features_path, mmap_mode="r"); y_train, y_test = np.asarray(features["y_train"]), np.asarray(features["y_test"])
+    kind = experiment.kind
+    if kind == "recurrent": params = dict(RECURRENT_DEFAULTS, **params)
+    callbacks = [tf.keras.callbacks.EarlyStopping(monitor='loss', patience=5, restore_best_weights=True)] if params.get("early_stopping", True) else []
+    if kind == "recurrent":
+        matrix = np.load(extra_paths[0])["embedding_matrix"] if extra_paths else None
+        model = build_recurrent(params, matrix)
+        train = (features["X_train"], y_train); test_inputs = features["X_test"]; fit_kwargs = {"batch_size": params["batch_size"], "shuffle": True}
+        if params["validation"]: fit_kwargs["validation_data"] = (test_inputs, y_test) # Như LSTM_GloVe.py (log có thêm val_loss/val_accuracy)
+    elif kind in ("mlp", "tfidf_lstm"):
+        from sparse_data import sparse_dataset
+        X_train, X_test = _csr(features, "X_train"), _csr(features, "X_test")
+        if kind == "mlp":
+            model = tf.keras.Sequential([tf.keras.Input((X_train.shape[1],)), tf.keras.layers.Dense(512, activation='relu'), tf.keras.layers.Dropout(0.5),
+                                         tf.keras.layers.Dense(256, activation='relu'), tf.keras.layers.Dropout(0.5), tf.keras.layers.Dense(1, activation='sigmoid')])
+            reshape = lambda ds: ds
+        else: # LSTM_TFIDF.py: vector TF-IDF như chuỗi (số đặc trưng, 1)
+            model = tf.keras.Sequential([tf.keras.Input((X_train.shape[1], 1)), tf.keras.layers.LSTM(128, return_sequences=True), tf.keras.layers.Dropout(0.5),
+                                         tf.keras.layers.LSTM(64), tf.keras.layers.Dropout(0.5), tf.keras.layers.Dense(1, activation='sigmoid')])
+            reshape = lambda ds: ds.map(lambda x, *y: (x[..., None],) + y)
+        batch_size = params.get("batch_size", 128)
+        train = (reshape(sparse_dataset(X_train, y_train, batch_size=batch_size, shuffle=True, densify=True)),)
+        test_inputs = reshape(sparse_dataset(X_test, batch_size=batch_size, densify=True)); fit_kwargs = {}
+    elif kind == "transformer":
+        from tf_pipeline import build_pipeline, cached_dataset
+        from token_cache import EncodedTexts
+        from transformers import TFAutoModelForSequenceClassification
+        pad_id = int(features["pad_token_id"])
+        encoded = {part: EncodedTexts(features[f"{part}_ids"], features[f"{part}_offsets"], pad_id) for part in ("train", "test")}
+        train = (build_pipeline(cached_dataset(encoded["train"], y_train), params["batch_size"], pad_id, shuffle_buffer=len(y_train)),)
+        test_inputs = build_pipeline(cached_dataset(encoded["test"], y_test), params["batch_size"], pad_id, bucket=False); fit_kwargs = {}
+        model = TFAutoModelForSequenceClassification.from_pretrained(params["checkpoint"], num_labels=2)
+    else:
+        raise ValueError(f"Loại thí nghiệm không hợp lệ: {kind}")
+
+    if kind == "transformer":
+        optimizer = getattr(tf.keras.optimizers, params["optimizer"])(learning_rate=params["learning_rate"])
+        model.compile(optimizer=optimizer, loss=tf.keras.losses.CategoricalCrossentropy(from_logits=True), metrics=['accuracy'])
+    else:
+        optimizer = getattr(tf.keras.optimizers, params.get("optimizer", "Adam"))(params["learning_rate"])
+        model.compile(loss='binary_crossentropy', optimizer=optimizer, metrics=['accuracy'])
+    history = model.fit(*train, epochs=params["epochs"], callbacks=callbacks, verbose=0, **fit_kwargs)
+    output = model.predict(test_inputs, verbose=0)
+    y_pred = np.argmax(output[0], axis=1) if kind == "transformer" else (np.asarray(output).ravel() >= 0.5).astype(int)
+    prefix = save_results(experiment, history.history, y_test, y_pred)
+    from sklearn.metrics import accuracy_score, f1_score
+    return {"name": experiment.name, "dataset": experiment.dataset, "seconds": time.perf_counter() - start, "epochs": len(history.history["loss"]),
+            "accuracy": accuracy_score(y_test, y_pred), "f1": f1_score(y_test, y_pred), "output": prefix, "threads": threads}
+
+
+def _family_dir(dataset, subdir):
+    """Giữ cách viết hoa của thư mục đã có trong Result/ (vd. 'Bert', 'RoBerta' ở các dataset mới)."""
+    head, _, rest = subdir.partition(os.sep); base = os.path.join(RESULT_DIR, dataset)
+    existing = {name.lower(): name for name in os.listdir(base)} if os.path.isdir(base) else {}
+    return os.path.join(base, existing.get(head.lower(), head), rest)
+
+
+def save_results(experiment, history, y_test, y_pred):
+    """Cùng bộ file như các script (trả về tiền tố đường dẫn): training log, biểu đồ loss/accuracy, metrics, classification report, confusion matrix."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score, precision_score, recall_score
+    out_dir = _family_dir(experiment.dataset, experiment.result_subdir); os.makedirs(out_dir, exist_ok=True)
+    prefix = os.path.join(out_dir, f"{experiment.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    history_df = pd.DataFrame(history); history_df['Epoch'] = history_df.index + 1
+    history_df.to_csv(f"{prefix}_training_log.csv", index=False)
+    plt.style.use('ggplot')
+    for metric, color in (("loss", "r"), ("accuracy", "g")):
+        plt.figure(figsize=(10, 6)); plt.plot(history_df['Epoch'], history_df[metric], color, label=f'Training {metric}')
+        plt.title(f'Training {metric.title()}', size=15); plt.xlabel('Epochs', size=15); plt.legend()
+        plt.savefig(f"{prefix}_training_{metric}.png"); plt.close()
+    pd.DataFrame({"Metric": ["Accuracy", "Precision", "Recall", "F1 Score"],
+                  "Value": [accuracy_score(y_test, y_pred), precision_score(y_test, y_pred), recall_score(y_test, y_pred), f1_score(y_test, y_pred)]}
+                 ).to_csv(f"{prefix}_evaluation_metrics.csv", index=False)
+    pd.DataFrame(classification_report(y_test, y_pred, output_dict=True)).transpose().to_csv(f"{prefix}_classification_report.csv", index=True)
+    matrix = confusion_matrix(y_test, y_pred)
+    pd.DataFrame(matrix, index=["Actual 0", "Actual 1"], columns=["Predicted 0", "Predicted 1"]).to_csv(f"{prefix}_confusion_matrix.csv", index=True)
+    plt.figure(figsize=(10, 6)); sns.heatmap(matrix, annot=True, fmt='d', cmap='Blues')
+    plt.xlabel('Predicted Labels', size=15); plt.ylabel('True Labels', size=15); plt.title('Confusion Matrix', size=15)
+    plt.savefig(f"{prefix}_confusion_matrix.png"); plt.close()
+    return prefix
+
+
+# ---------- Lập lịch ----------
+
+def required_features(experiment):
+    """Các đặc trưng một thí nghiệm cần: chính + (ma trận embedding của GloVe/W2V đi kèm chuỗi token)."""
+    if experiment.feature in ("glove", "w2v", "w2v_random"): return ["sequences", experiment.feature]
+    return [experiment.feature]
+
+
+def _run_pool(items, jobs, threads, epochs_override):
+    """Chạy các (thí nghiệm, file đặc trưng) trong một pool spawn; trả về (kết quả, lỗi, các run bị hỏng do pool chết)."""
+    results, failures, crashed = [], [], []
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(train_experiment, e, paths[0], paths[1:], threads, epochs_override): (e, paths) for e, paths in items}
+        for future in as_completed(futures):
+            experiment, paths = futures[future]
+            try:
+                result = future.result(); result["prep_seconds"] = prep_cost(paths); results.append(result)
+                print(f"✅ {experiment.dataset} / {experiment.name}: acc {result['accuracy']:.4f}, {result['seconds']:.1f}s")
+            except BrokenProcessPool: crashed.append((experiment, paths))
+            except Exception as e:
+                failures.append((experiment, e)); print(f"❌ {experiment.dataset} / {experiment.name}: {type(e).__name__}: {e}")
+    return results, failures, crashed
+
+
+def run_all(experiments, jobs, threads=None, limit=None, epochs_override=None):
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    threads = threads or max(1, cores // jobs)
+    wall_start = time.perf_counter(); runnable = []
+    for dataset in dict.fromkeys(e.dataset for e in experiments): # Mỗi dataset đọc + normalize một lần
+        features = DatasetFeatures(dataset, limit)
+        for experiment in (e for e in experiments if e.dataset == dataset):
+            try: runnable.append((experiment, [features.prepare(f) for f in required_features(experiment)]))
+            except (ImportError, OSError) as e: print(f"⚠️ Bỏ qua {dataset} / {experiment.name}: {e}")
+    prep_wall = time.perf_counter() - wall_start
+    print(f"🚀 {len(runnable)} thí nghiệm, {jobs} tiến trình x {threads} luồng (máy có {cores} lõi)")
+    if jobs * threads > cores: print("⚠️ Số luồng vượt số lõi: thời gian từng run (và ước lượng tuần tự) bị đội lên do tranh lõi")
+    results, failures, crashed = _run_pool(runnable, jobs, threads, epochs_override)
+    for item in crashed: # Một tiến trình chết (thường do hết RAM) làm hỏng cả pool: chạy lại riêng từng run bị ảnh hưởng
+        print(f"🔁 Chạy lại riêng {item[0].dataset} / {item[0].name}")
+        retry = _run_pool([item], 1, threads, epochs_override); results += retry[0]; failures += retry[1]
+        for experiment, _ in retry[2]:
+            failures.append((experiment, "tiến trình bị dừng đột ngột")); print(f"❌ {experiment.dataset} / {experiment.name}: tiến trình bị dừng đột ngột (hết RAM?)")
+    return results, failures, time.perf_counter() - wall_start, prep_wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chạy song song các thí nghiệm của model zoo và ghi kết quả vào Result/.")
+    parser.add_argument("--config", default=None, help="file JSON danh sách thí nghiệm (mặc định: toàn bộ model zoo)")
+    parser.add_argument("--only", default="*", help="lọc theo tên thí nghiệm (glob, phân tách bằng dấu phẩy)")
+    parser.add_argument("--datasets", default=None, help="lọc theo dataset (phân tách bằng dấu phẩy)")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--threads", type=int, default=None, help="số luồng TF mỗi run (mặc định: số lõi / jobs)")
+    parser.add_argument("--epochs", type=int, default=None, help="ghi đè số epoch (chạy thử)")
+    parser.add_argument("--limit", type=int, default=None, help="chỉ dùng N văn bản đầu mỗi phần (chạy thử)")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--no-index", action="store_true", help="không ghi kết quả vào chỉ mục results_index.sqlite")
+    args = parser.parse_args()
+    experiments = load_experiments(args.config) if args.config else default_experiments()
+    patterns = args.only.split(","); datasets = args.datasets.split(",") if args.datasets else None
+    experiments = [e for e in experiments if any(fnmatch.fnmatch(e.name, p) for p in patterns) and (datasets is None or e.dataset in datasets)]
+    if args.list:
+        for e in experiments: print(f"{e.dataset:<30}{e.name:<24}{e.feature:<32}{e.result_subdir}")
+        return
+    results, failures, wall, prep_wall = run_all(experiments, args.jobs, args.threads, args.limit, args.epochs)
+    if results and not args.no_index: # Ghi thẳng các run mới vào chỉ mục kết quả (results_index.py), không cần quét lại Result/
+        from results_index import ResultsIndex
+        files = [path for r in results for path in glob.glob(f"{glob.escape(r['output'])}_*.csv")]
+        with ResultsIndex() as index: print(f"🗂️ Đã ghi {index.index_files(files)} run vào chỉ mục {index.path}")
+    run_total = sum(r["seconds"] for r in results)
+    # Chạy tuần tự từng script cũ = tổng thời gian các run + mỗi run tự đọc/normalize/tokenize/tính đặc trưng lại từ đầu
+    sequential = run_total + sum(r["prep_seconds"] for r in results)
+    print(f"\n{'dataset':<30}{'thí nghiệm':<24}{'accuracy':>10}{'f1':>8}{'giây':>8}")
+    for r in sorted(results, key=lambda r: (r["dataset"], r["name"])):
+        print(f"{r['dataset']:<30}{r['name']:<24}{r['accuracy']:>10.4f}{r['f1']:>8.4f}{r['seconds']:>8.1f}")
+    print(f"\n⏱️ Chuẩn bị dữ liệu/đặc trưng (một lần, dùng chung): {prep_wall:.1f}s; tổng thời gian các run: {run_total:.1f}s")
+    print(f"⏱️ Wall time: {wall:.1f}s so với ~{sequential:.1f}s nếu chạy tuần tự từng script (x{sequential / wall:.1f})" if results else "")
+    if failures: print(f"❌ {len(failures)} thí nghiệm lỗi"); sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# --- Kho GloVe nhị phân: chuyển glove.*.txt một lần sang vocab + ma trận float32 memory-map ---
+# Các script cũ đọc 400k dòng văn bản vào dict {từ: np.array} ở mỗi lần chạy rồi chỉ giữ ~10k dòng.
+# Ở đây file .txt được chuyển MỘT lần sang thư mục `<tên file>.store/`:
+#   vectors.npy  ma trận (số từ, dim) float32, đọc bằng mmap (chỉ các trang của từ cần dùng được nạp vào RAM)
+#   vocab.txt    một từ mỗi dòng, dòng i <-> vectors[i]
+#   meta.json    kích thước/mtime của file nguồn (file nguồn đổi -> tự chuyển lại), dim, số từ
+# Chuyển thủ công: python glove_store.py ../working/glove_data/glove.6B.100d.txt
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+PARSE_CHUNK = 20000 # Số dòng được ghép lại và chuyển sang float32 một lượt
+
+
+def store_path(glove_path):
+    return os.path.splitext(glove_path)[0] + ".store"
+
+
+def _source_meta(glove_path):
+    stat = os.stat(glove_path)
+    return {"version": FORMAT_VERSION, "source": os.path.basename(glove_path), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def _word_end(line, dim):
+    """Vị trí khoảng trắng kết thúc từ: dim trường cuối là vector (từ có thể chứa khoảng trắng, vd. glove.840B)."""
+    cut = line.index(" ")
+    return cut if line.count(" ", cut) == dim else len(line) - len(" ".join(line.rsplit(" ", dim)[1:])) - 1
+
+
+def convert_glove(glove_path, path=None):
+    """Chuyển glove.*.txt sang kho nhị phân (ghi vào thư mục tạm rồi đổi tên - không để lại kho hỏng)."""
+    path = path or store_path(glove_path); start = time.perf_counter()
+    with open(glove_path, encoding="utf-8", newline="\n") as f: # Chỉ '\n' là xuống dòng ('\r' có thể nằm trong từ)
+        count = sum(1 for _ in f); f.seek(0)
+        dim = len(f.readline().rstrip().split(" ")) - 1; f.seek(0)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        vectors = np.lib.format.open_memmap(os.path.join(tmp_path, "vectors.npy"), mode="w+", dtype=np.float32, shape=(count, dim))
+        with open(os.path.join(tmp_path, "vocab.txt"), "w", encoding="utf-8", newline="\n") as vocab:
+            row = 0
+            while row < count:
+                lines = [f.readline().rstrip("\n") for _ in range(min(PARSE_CHUNK, count - row))]
+                cuts = [_word_end(line, dim) for line in lines]
+                vocab.write("\n".join(line[:cut] for line, cut in zip(lines, cuts)) + "\n")
+                # Parser C của NumPy trên cả khối: không tạo 5 triệu chuỗi Python như values[1:] của script cũ
+                block = "\n".join(line[cut + 1:] for line, cut in zip(lines, cuts))
+                vectors[row:row + len(lines)] = np.fromstring(block, dtype=np.float32, sep=" ").reshape(-1, dim)
+                row += len(lines)
+        vectors.flush(); del vectors
+    meta = dict(_source_meta(glove_path), dim=dim, count=count, seconds=round(time.perf_counter() - start, 3))
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f: json.dump(meta, f, indent=2)
+    shutil.rmtree(path, ignore_errors=True) # Kho cũ của file nguồn đã đổi
+    try: os.replace(tmp_path, path)
+    except OSError: shutil.rmtree(tmp_path, ignore_errors=True) # Tiến trình khác vừa chuyển xong
+    print(f"⏱️ Đã chuyển {glove_path} ({count} từ, dim {dim}) sang {path} trong {meta['seconds']:.1f}s")
+    return path
+
+
+class GloveStore:
+    """vocab (pandas Index để tra cứu vector hóa) + vectors (float32 memory-map)."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f: self.meta = json.load(f)
+        with open(os.path.join(path, "vocab.txt"), encoding="utf-8", newline="") as f: words = f.read().split("\n")[:self.meta["count"]]
+        self.vocab = pd.Index(words); self.positions = None
+        if not self.vocab.is_unique: # Vài bản GloVe có từ lặp: giữ lần xuất hiện cuối như dict của script cũ
+            keep = ~self.vocab.duplicated(keep="last"); self.positions = np.flatnonzero(keep); self.vocab = self.vocab[keep]
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.dim = self.meta["dim"]
+
+    def lookup(self, words):
+        """Vị trí của từng từ trong kho, -1 nếu không có."""
+        rows = self.vocab.get_indexer(list(words))
+        return rows if self.positions is None else np.where(rows >= 0, self.positions[rows], -1)
+
+    def embedding_matrix(self, word_index, num_words):
+        """Ma trận (num_words, dim): hàng i = vector GloVe của từ có chỉ số i trong tokenizer Keras, 0 nếu không có/ i >= num_words."""
+        words, ids = zip(*((w, i) for w, i in word_index.items() if i < num_words)) if word_index else ((), ())
+        rows = self.lookup(words); ids = np.asarray(ids, dtype=np.int64); found = rows >= 0
+        matrix = np.zeros((num_words, self.dim), dtype=np.float32)
+        order = np.argsort(rows[found]) # Đọc mmap theo thứ tự tăng dần -> truy cập đĩa tuần tự
+        matrix[ids[found][order]] = self.vectors[rows[found][order]]
+        print(f"✅ GloVe: {int(found.sum())}/{len(ids)} từ của tokenizer có vector")
+        return matrix
+
+
+def load_glove(glove_path):
+    """Mở kho nhị phân của glove_path, tự chuyển (một lần) nếu chưa có hoặc file nguồn đã thay đổi."""
+    path = store_path(glove_path)
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f: meta = json.load(f)
+        stale = os.path.exists(glove_path) and any(meta.get(k) != v for k, v in _source_meta(glove_path).items())
+    except (OSError, ValueError):
+        stale = True
+    if stale: convert_glove(glove_path, path)
+    return GloveStore(path)
+
+
+def glove_embedding_matrix(glove_path, word_index, num_words):
+    """Thay cho đoạn đọc glove.txt vào dict + vòng lặp word_index trong các script *_GloVe.py."""
+    start = time.perf_counter()
+    matrix = load_glove(glove_path).embedding_matrix(word_index, num_words)
+    print(f"⚡ Embedding matrix {matrix.shape} sau {time.perf_counter() - start:.2f}s")
+    return matrix
+
+
+if __name__ == "__main__":
+    for source in sys.argv[1:]: convert_glove(source)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# --- Tiền xử lý văn bản dùng chung cho các script huấn luyện (thay cho hàm normalize() chép ở từng script) ---
+# Kết quả giống hệt normalize() cũ: lower -> bỏ URL -> ký tự không phải chữ/số thành khoảng trắng -> gộp khoảng trắng -> bỏ khoảng trắng đầu/cuối.
+# Thay vì 6 lượt re.sub cho TỪNG văn bản, cả lô được nối thành một chuỗi và chạy 2 regex đã biên dịch trên toàn bộ chuỗi đó.
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+NON_WORD_PATTERN = re.compile(r"\W+") # \W -> ' ' rồi ' +' -> ' ' gộp thành một lượt (khoảng trắng cũng là \W)
+# Từ phân cách giữa các văn bản khi nối: là ký tự chữ (\w) nên sống sót qua mọi bước, không bị lower() đổi
+DOC_SEPARATOR = "ǂǂǂǂ"
+
+
+def normalize_text(text):
+    """Chuẩn hóa một văn bản (dùng cho văn bản lẻ hoặc khi văn bản chứa sẵn DOC_SEPARATOR)."""
+    return NON_WORD_PATTERN.sub(" ", URL_PATTERN.sub("", text.lower())).strip()
+
+
+def _normalize_joined(texts):
+    if any(DOC_SEPARATOR in text for text in texts): return [normalize_text(text) for text in texts]
+    joined = f" {DOC_SEPARATOR} ".join(texts).lower()
+    joined = NON_WORD_PATTERN.sub(" ", URL_PATTERN.sub("", joined))
+    return [piece.strip() for piece in joined.split(DOC_SEPARATOR)]
+
+
+def normalize(data, workers=1, chunk_size=2000):
+    """Chuẩn hóa cả lô văn bản (list, Series, ...) và trả về list như normalize() cũ.
+
+    `workers` > 1: chia thành các khối `chunk_size` văn bản và xử lý song song bằng nhiều tiến trình (corpus lớn).
+    """
+    texts = list(data)
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool: results = list(pool.map(_normalize_joined, chunks))
+    else:
+        results = [_normalize_joined(chunk) for chunk in chunks]
+    return [text for chunk in results for text in chunk]
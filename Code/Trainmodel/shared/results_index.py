@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# --- Chỉ mục kết quả huấn luyện: Result/ + Dataset/New_Dataset/*/Result -> một file SQLite ---
+# Kết quả nằm rải rác trong hàng trăm CSV có timestamp, metadata mã hóa trong tên file/thư mục
+# (Result/<dataset>/<mô hình>/<optimizer>/<N>poch/..., .../Test/<dataset khác>/..., DeepLearning/<kiến trúc>/<embedding>/...).
+# Bộ chỉ mục đọc các CSV đó MỘT lần vào các bảng:
+#   runs      một dòng / lần chạy: dataset, evaluated_on, family, architecture, feature, optimizer, epochs, learning_rate,
+#             timestamp, accuracy, precision, recall, f1, tn/fp/fn/tp
+#   epochs    training log dạng dài (run_id, epoch, metric, value)
+#   reports   classification report (run_id, label, precision, recall, f1, support)
+#   files     (path, size, mtime) để lần quét sau chỉ đọc lại file mới/đổi và xóa run có file đã mất
+# Các lần chạy mới (experiments.py) ghi thẳng vào chỉ mục bằng index_files() thay vì quét lại cả cây.
+# Chạy: python results_index.py scan | best [--metric f1] [--by dataset,architecture] | sql "SELECT ..."
+import argparse
+import os
+import re
+import sqlite3
+import time
+
+import pandas as pd
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+RESULT_ROOTS = [os.path.join(REPO_ROOT, "Result"), os.path.join(REPO_ROOT, "Dataset", "New_Dataset")]
+RESULTS_INDEX_PATH = os.environ.get("RESULTS_INDEX_PATH", os.path.join(REPO_ROOT, "Result", "results_index.sqlite"))
+
+KINDS = ("training_log", "evaluation_metrics", "classification_report", "confusion_matrix")
+ARTIFACT = re.compile(r"^(?P<before>.*?)_?(?P<kind>" + "|".join(KINDS) + r")_?(?P<after>.*)\.csv$")
+TIMESTAMP = re.compile(r"(\d{8}_\d{6})")
+LEARNING_RATE = re.compile(r"LR_([0-9.]+e-?\d+|[0-9.]+)")
+EPOCHS = re.compile(r"^(\d+)\s*(?:epochs?|poch|poc)$", re.IGNORECASE) # "10poch", "50 epoch", "10poc"
+FAMILIES = {"bert": "BERT", "roberta": "RoBERTa", "deeplearning": "DeepLearning"}
+OPTIMIZERS = {"adam": "Adam", "adamw": "AdamW", "adamax": "Adamax", "admax": "Adamax"}
+# Tên viết tắt của dataset trong các thư mục Test/ đánh giá chéo -> tên thư mục trong Result/
+DATASET_ALIASES = {"isot": "ISOT Fake News Dataset", "fakenews": "Fake News Dataset", "fakenewdetection": "Fake News Detection Dataset",
+                   "fakedetec": "Fake News Detection Dataset", "fakeorreal": "Fake or Real News Dataset", "fakareal": "Fake or Real News Dataset",
+                   "fakeorrak": "Fake or Real News Dataset", "fakedetection": "Fake News Detection Dataset"}
+METRICS = {"accuracy": "accuracy", "precision": "precision", "recall": "recall", "f1 score": "f1",
+           "precision (weighted)": "precision", "recall (weighted)": "recall", "f1 score (weighted)": "f1"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, directory TEXT, dataset TEXT, evaluated_on TEXT, family TEXT, architecture TEXT, feature TEXT,
+    optimizer TEXT, epochs INTEGER, learning_rate REAL, variant TEXT, timestamp TEXT, trained_epochs INTEGER,
+    accuracy REAL, precision REAL, recall REAL, f1 REAL, tn INTEGER, fp INTEGER, fn INTEGER, tp INTEGER);
+CREATE TABLE IF NOT EXISTS epochs (run_id TEXT, epoch INTEGER, metric TEXT, value REAL);
+CREATE TABLE IF NOT EXISTS reports (run_id TEXT, label TEXT, precision REAL, recall REAL, f1 REAL, support REAL);
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, run_id TEXT);
+CREATE INDEX IF NOT EXISTS epochs_run ON epochs (run_id);
+CREATE INDEX IF NOT EXISTS reports_run ON reports (run_id);
+CREATE INDEX IF NOT EXISTS files_run ON files (run_id);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (dataset, architecture);
+"""
+RUN_COLUMNS = ["run_id", "directory", "dataset", "evaluated_on", "family", "architecture", "feature", "optimizer", "epochs", "learning_rate",
+               "variant", "timestamp", "trained_epochs", "accuracy", "precision", "recall", "f1", "tn", "fp", "fn", "tp"]
+
+
+def run_key(path):
+    """(run_id, loại artifact) của một CSV kết quả; None nếu không phải artifact. Các file cùng thư mục + cùng tên bỏ loại = một run."""
+    match = ARTIFACT.match(os.path.basename(path))
+    if not match: return None
+    key = "_".join(part for part in (match["before"], match["after"]) if part)
+    return os.path.relpath(os.path.join(os.path.dirname(path), key), REPO_ROOT), match["kind"]
+
+
+def describe(run_id):
+    """Metadata suy ra từ đường dẫn + tên file của run."""
+    parts = run_id.split(os.sep); name = parts[-1]
+    if "Result" in parts[1:]: # Dataset/New_Dataset/<dataset>/Result/<mô hình>/<optimizer>/<run>/...
+        position = parts.index("Result", 1); dataset, rest = parts[position - 1], parts[position + 1:-1]
+    else: # Result/<dataset>/...
+        dataset, rest = parts[1], parts[2:-1]
+    info = {"run_id": run_id, "directory": os.path.dirname(run_id), "dataset": dataset, "evaluated_on": dataset, "family": None,
+            "architecture": None, "feature": None, "optimizer": None, "epochs": None, "learning_rate": None, "variant": None}
+    variant = []
+    start = next((i for i, part in enumerate(rest) if part.lower() in FAMILIES), None) # Bỏ qua thư mục bọc ngoài như "Old_result"
+    if start is not None: info["family"] = FAMILIES[rest[start].lower()]; variant += rest[:start]; rest = rest[start:]
+    for i, part in enumerate(rest[1:] if start is not None else rest, 1 if start is not None else 0):
+        if part.lower() in OPTIMIZERS and info["optimizer"] is None: info["optimizer"] = OPTIMIZERS[part.lower()]
+        elif EPOCHS.match(part): info["epochs"] = int(EPOCHS.match(part)[1])
+        elif part == "Test": continue
+        elif re.match(r"test\W?\w", part, re.IGNORECASE) or (i > 0 and rest[i - 1] == "Test"): # Đánh giá chéo: Test/<ds>, "Test <ds>", Test_<ds>
+            alias = re.sub(r"^test", "", re.sub(r"[^a-z]", "", part.lower()))
+            info["evaluated_on"] = DATASET_ALIASES.get(alias, part)
+        elif info["family"] == "DeepLearning" and i == 2: info["feature"] = part
+        elif (info["family"] == "DeepLearning" and i == 1) or part == name: continue # Thư mục kiến trúc / thư mục riêng của run
+        else: variant.append(part)
+    stem = TIMESTAMP.sub("", name).strip("_ ")
+    if info["family"] == "DeepLearning": # Tên file đúng hơn thư mục (vd. BiGRU_GloVe nằm trong DeepLearning/GRU/)
+        info["architecture"] = stem.split("_")[0] or rest[1]; info["feature"] = info["feature"] or (stem.split("_") + [None])[1]
+    else:
+        info["architecture"] = info["family"]
+        for token in stem.split("_"):
+            if token.lower() in OPTIMIZERS and info["optimizer"] is None: info["optimizer"] = OPTIMIZERS[token.lower()]
+    if LEARNING_RATE.search(name): info["learning_rate"] = float(LEARNING_RATE.search(name)[1])
+    timestamp = TIMESTAMP.search(name); info["timestamp"] = timestamp[1] if timestamp else None
+    leftover = TIMESTAMP.sub("", name).strip("_ ")
+    if info["timestamp"] is None and leftover: variant.append(leftover) # vd. "sigle" / "full" / "f" trong thư mục Test
+    info["variant"] = "/".join(variant) or None
+    return info
+
+
+def parse_run(run_id, files):
+    """Đọc các CSV {loại: đường dẫn} của một run -> (dòng runs, dòng epochs, dòng reports)."""
+    row = dict.fromkeys(RUN_COLUMNS); row.update(describe(run_id)); epochs, reports = [], []
+    if "evaluation_metrics" in files:
+        for metric, value in pd.read_csv(files["evaluation_metrics"]).iloc[:, :2].itertuples(index=False):
+            column = METRICS.get(str(metric).strip().lower())
+            if column: row[column] = float(value)
+    if "confusion_matrix" in files:
+        matrix = pd.read_csv(files["confusion_matrix"], index_col=0).to_numpy()
+        if matrix.shape == (2, 2): row.update(tn=int(matrix[0, 0]), fp=int(matrix[0, 1]), fn=int(matrix[1, 0]), tp=int(matrix[1, 1]))
+    if "training_log" in files:
+        log = pd.read_csv(files["training_log"])
+        numbers = log["Epoch"].astype(int).tolist() if "Epoch" in log else list(range(1, len(log) + 1))
+        row["trained_epochs"] = len(log)
+        epochs = [(run_id, epoch, metric, float(value)) for metric in log.columns if metric != "Epoch"
+                  for epoch, value in zip(numbers, log[metric])]
+    if "classification_report" in files:
+        report = pd.read_csv(files["classification_report"], index_col=0)
+        reports = [(run_id, str(label), *(float(report.at[label, c]) if c in report else None for c in ("precision", "recall", "f1-score", "support")))
+                   for label in report.index]
+    return row, epochs, reports
+
+
+class ResultsIndex:
+    """Chỉ mục SQLite; `scan()` cập nhật tăng dần, `index_files()` cho các lần chạy mới, `query()`/`best()` để tra cứu."""
+
+    def __init__(self, path=RESULTS_INDEX_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path; self.connection = sqlite3.connect(path); self.connection.executescript(SCHEMA)
+
+    def close(self): self.connection.close()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): self.close()
+
+    def _reindex(self, runs):
+        """Đọc lại trọn các run {run_id: {loại: đường dẫn}} (một file đổi thì cả run được đọc lại)."""
+        with self.connection:
+            for run_id, files in runs.items():
+                try: row, epochs, reports = parse_run(run_id, files)
+                except (OSError, ValueError, KeyError, pd.errors.ParserError) as e:
+                    print(f"⚠️ Bỏ qua {run_id}: {type(e).__name__}: {e}"); continue
+                self._delete(run_id)
+                self.connection.execute(f"INSERT INTO runs VALUES ({', '.join('?' * len(RUN_COLUMNS))})", [row[c] for c in RUN_COLUMNS])
+                self.connection.executemany("INSERT INTO epochs VALUES (?, ?, ?, ?)", epochs)
+                self.connection.executemany("INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?)", reports)
+                self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                            [(os.path.relpath(p, REPO_ROOT), os.path.getsize(p), os.path.getmtime(p), run_id) for p in files.values()])
+
+    def _delete(self, run_id):
+        for table in ("runs", "epochs", "reports"): self.connection.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+
+    def _group(self, paths):
+        runs = {}
+        for path in paths:
+            key = run_key(path)
+            if key: runs.setdefault(key[0], {})[key[1]] = path
+        return runs
+
+    def index_files(self, paths):
+        """Ghi các artifact vừa tạo (vd. từ experiments.save_results) vào chỉ mục, không quét cây thư mục."""
+        runs = self._group(os.path.abspath(p) for p in paths)
+        for run_id in runs: # Gộp với các file đã có của run (nếu run được ghi thành nhiều lần)
+            for (path,) in self.connection.execute("SELECT path FROM files WHERE run_id = ?", (run_id,)):
+                key = run_key(path); full = os.path.join(REPO_ROOT, path)
+                if os.path.exists(full): runs[run_id].setdefault(key[1], full)
+        self._reindex(runs); return len(runs)
+
+    def scan(self, roots=RESULT_ROOTS):
+        """Quét tăng dần: chỉ đọc các run có file mới/đổi kích thước/mtime; xóa run có file đã bị xóa."""
+        start = time.perf_counter(); known = {path: (size, mtime) for path, size, mtime in self.connection.execute("SELECT path, size, mtime FROM files")}
+        found, changed = {}, set()
+        for root in roots:
+            for directory, _, names in os.walk(root):
+                if "Result" not in os.path.relpath(directory, REPO_ROOT).split(os.sep): continue
+                for name in names:
+                    if not name.endswith(".csv"): continue
+                    path = os.path.join(directory, name); key = run_key(path)
+                    if not key: continue
+                    relative = os.path.relpath(path, REPO_ROOT); found[relative] = key; stat = os.stat(path)
+                    if known.get(relative) != (stat.st_size, stat.st_mtime): changed.add(key[0])
+        removed = {run_id for path, run_id in self.connection.execute("SELECT path, run_id FROM files") if path not in found}
+        with self.connection:
+            for run_id in removed:
+                self._delete(run_id); self.connection.execute("DELETE FROM files WHERE run_id = ?", (run_id,))
+        runs = {}
+        for relative, (run_id, kind) in found.items():
+            if run_id in changed or run_id in removed: runs.setdefault(run_id, {})[kind] = os.path.join(REPO_ROOT, relative)
+        self._reindex(runs)
+        print(f"🗂️ Chỉ mục: {len(found)} file, đọc lại {len(runs)} run, xóa {len(removed - set(runs))} run trong {time.perf_counter() - start:.2f}s")
+        return len(runs)
+
+    def query(self, sql, params=()):
+        """Truy vấn SQL tùy ý -> DataFrame."""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def best(self, metric="f1", by=("dataset", "architecture"), where=None, params=()):
+        """Run có `metric` cao nhất cho mỗi nhóm `by` (vd. F1 tốt nhất theo dataset x kiến trúc)."""
+        if metric not in RUN_COLUMNS or any(column not in RUN_COLUMNS for column in by): raise ValueError(f"Cột không hợp lệ: {metric}, {by}")
+        group = ", ".join(by); condition = f"WHERE {metric} IS NOT NULL" + (f" AND ({where})" if where else "")
+        details = ", ".join(c for c in ("optimizer", "epochs", "learning_rate", "evaluated_on", "timestamp", "run_id") if c not in by)
+        return self.query(f"""SELECT {group}, {metric}, {details} FROM (
+                                 SELECT *, ROW_NUMBER() OVER (PARTITION BY {group} ORDER BY {metric} DESC, timestamp DESC) AS rank FROM runs {condition})
+                              WHERE rank = 1 ORDER BY {group}""", params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chỉ mục SQLite cho các kết quả trong Result/.")
+    parser.add_argument("--db", default=RESULTS_INDEX_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("scan", help="quét (tăng dần) Result/ và Dataset/New_Dataset/*/Result")
+    best = commands.add_parser("best", help="run tốt nhất theo nhóm")
+    best.add_argument("--metric", default="f1"); best.add_argument("--by", default="dataset,architecture")
+    best.add_argument("--where", default=None, help="điều kiện SQL thêm, vd. \"evaluated_on = dataset\"")
+    sql = commands.add_parser("sql", help="truy vấn SQL tùy ý"); sql.add_argument("statement")
+    args = parser.parse_args()
+    with ResultsIndex(args.db) as index, pd.option_context("display.width", 200, "display.max_rows", 500, "display.max_colwidth", 60):
+        if args.command == "scan": return index.scan()
+        start = time.perf_counter()
+        frame = index.best(args.metric, args.by.split(","), args.where) if args.command == "best" else index.query(args.statement)
+        print(frame.to_string(index=False)); print(f"⏱️ {len(frame)} dòng trong {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# --- Đưa ma trận TF-IDF/BoW thưa (scipy CSR) vào Keras theo lô, không gọi .toarray() trên cả tập ---
+# vectorizer.fit_transform(...).toarray() tạo mảng float64 (số văn bản x max_features): ~45k bài ISOT x 10k từ ~ 3.6 GB.
+# Ở đây ma trận giữ dạng CSR float32; mỗi lô được cắt ra và đưa vào model dưới dạng tf.SparseTensor
+# (Dense của Keras nhân sparse x dense trực tiếp), hoặc chuyển thành lô dense float32 nếu densify=True.
+# Trên CPU densify=True nhanh gấp ~2 lần (gradient của sparse_dense_matmul chậm) mà RSS gần như bằng nhau - xem bench_sparse_mlp.py.
+import numpy as np
+import tensorflow as tf
+
+
+def _batches(X, y, batch_size, shuffle, seed):
+    rng = np.random.default_rng(seed)
+
+    def generator():
+        order = rng.permutation(X.shape[0]) if shuffle else np.arange(X.shape[0]) # Xáo lại ở mỗi epoch
+        for begin in range(0, len(order), batch_size):
+            rows = order[begin:begin + batch_size]
+            batch = X[rows]; batch.sort_indices(); batch = batch.tocoo() # Chỉ số theo thứ tự hàng/cột như tf.sparse yêu cầu
+            features = tf.SparseTensor(np.stack([batch.row, batch.col], axis=1).astype(np.int64), batch.data.astype(np.float32), batch.shape)
+            yield (features, y[rows]) if y is not None else (features,)
+    return generator
+
+
+def sparse_dataset(X, y=None, batch_size=128, shuffle=False, seed=42, densify=False):
+    """Dataset các lô (features, label) từ ma trận CSR `X`; `y=None` cho predict. Giữ thứ tự khi shuffle=False."""
+    X = X.tocsr(); y = None if y is None else np.asarray(y, dtype=np.float32)
+    spec = (tf.SparseTensorSpec((None, X.shape[1]), tf.float32),) + (() if y is None else (tf.TensorSpec((None,), tf.float32),))
+    dataset = tf.data.Dataset.from_generator(_batches(X, y, batch_size, shuffle, seed), output_signature=spec)
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(-(-X.shape[0] // batch_size))) # Keras biết số bước mỗi epoch
+    if densify: dataset = dataset.map(lambda features, *label: (tf.sparse.to_dense(features),) + label, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# --- Pipeline tf.data cho fine-tune transformer: stream dữ liệu, tokenize song song, gom lô theo độ dài, pad động, prefetch ---
+# Thay cho việc đưa toàn bộ tensor đã pad max_length vào model.fit(): mỗi lô chỉ pad tới ranh giới bucket
+# chứa câu dài nhất của lô và chỉ các lô sắp dùng mới nằm trong bộ nhớ.
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+AUTOTUNE = tf.data.AUTOTUNE
+DEFAULT_BUCKETS = (64, 128, 256) # Ranh giới độ dài (token) để gom các câu dài gần nhau vào cùng lô
+
+
+def csv_text_dataset(csv_path, delimiter=";", text_column="text", label_column="label", chunksize=2048):
+    """Đọc CSV theo từng khối (không nạp cả file), trả về Dataset (text, label). Mặc định: định dạng text;label của New_Dataset."""
+    def generator():
+        for chunk in pd.read_csv(csv_path, delimiter=delimiter, names=[text_column, label_column], skiprows=1, chunksize=chunksize):
+            chunk = chunk.dropna(subset=[text_column])
+            yield from zip(chunk[text_column].astype(str), chunk[label_column].astype(np.int32))
+    return tf.data.Dataset.from_generator(generator, output_signature=(tf.TensorSpec((), tf.string), tf.TensorSpec((), tf.int32)))
+
+
+def tokenized_dataset(texts_ds, tokenizer, max_length=256, tokenize_batch=256):
+    """Tokenize theo lô `tokenize_batch` văn bản trong map(num_parallel_calls=AUTOTUNE); trả về Dataset (input_ids độ dài thay đổi, label)."""
+    def tokenize(texts):
+        rows = tokenizer([t.decode("utf-8") for t in texts.numpy()], truncation=True, max_length=max_length)["input_ids"]
+        return np.concatenate([np.asarray(r, dtype=np.int32) for r in rows]), np.asarray([len(r) for r in rows], dtype=np.int64)
+
+    def tokenize_batch_fn(texts, labels):
+        flat, lengths = tf.py_function(tokenize, [texts], (tf.int32, tf.int64))
+        flat.set_shape([None]); lengths.set_shape([None]) # py_function làm mất shape -> bucket/padded_batch cần biết rank
+        return tf.RaggedTensor.from_row_lengths(flat, lengths), labels
+
+    return texts_ds.batch(tokenize_batch).map(tokenize_batch_fn, num_parallel_calls=AUTOTUNE).unbatch()
+
+
+def cached_dataset(encoded, labels):
+    """Dataset (input_ids độ dài thay đổi, label) từ token cache (token_cache.EncodedTexts) - không tokenize lại."""
+    ragged = tf.RaggedTensor.from_row_splits(np.asarray(encoded.ids, dtype=np.int32), np.asarray(encoded.offsets, dtype=np.int64))
+    return tf.data.Dataset.from_tensor_slices((ragged, np.asarray(labels, dtype=np.int32)))
+
+
+def build_pipeline(dataset, batch_size, pad_token_id, num_classes=2, one_hot=True, shuffle_buffer=0,
+                   bucket_boundaries=DEFAULT_BUCKETS, bucket=True, seed=42):
+    """Từ Dataset (input_ids, label) tạo lô ({"input_ids", "attention_mask"}, label) pad động + prefetch.
+
+    - bucket=True: gom lô theo độ dài (thứ tự bị xáo trộn theo bucket - dùng cho huấn luyện).
+    - bucket=False: giữ nguyên thứ tự (dùng cho đánh giá/dự đoán).
+    Mỗi lô được pad tới ranh giới bucket nhỏ nhất chứa câu dài nhất của lô (không pad tới max_length), nên
+    model.fit/predict chỉ gặp len(bucket_boundaries) độ rộng khác nhau -> không trace lại đồ thị ở mỗi lô.
+    """
+    def add_mask(ids, label):
+        return ids, tf.ones_like(ids), label
+
+    dataset = dataset.map(lambda ids, label: add_mask(tf.cast(ids, tf.int32), label), num_parallel_calls=AUTOTUNE)
+    if shuffle_buffer: dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    padding_values = (tf.constant(pad_token_id, tf.int32), tf.constant(0, tf.int32), tf.constant(0, tf.int32))
+    if bucket:
+        boundaries = [b + 1 for b in bucket_boundaries] # Câu dài đúng bằng ranh giới vẫn thuộc bucket nhỏ
+        dataset = dataset.bucket_by_sequence_length(lambda ids, mask, label: tf.shape(ids)[0], boundaries,
+                                                    [batch_size] * (len(boundaries) + 1), padding_values=padding_values)
+    else:
+        dataset = dataset.padded_batch(batch_size, padding_values=padding_values)
+    widths = tf.constant(sorted(bucket_boundaries), tf.int32)
+
+    def to_inputs(ids, mask, label):
+        longest = tf.shape(ids)[1]
+        width = tf.maximum(longest, tf.reduce_min(tf.concat([tf.boolean_mask(widths, widths >= longest), widths[-1:]], 0)))
+        pad = [[0, 0], [0, width - longest]]
+        label = tf.one_hot(label, num_classes) if one_hot else label
+        return {"input_ids": tf.pad(ids, pad, constant_values=pad_token_id), "attention_mask": tf.pad(mask, pad)}, label
+
+    return dataset.map(to_inputs, num_parallel_calls=AUTOTUNE).prefetch(AUTOTUNE)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# --- Cache tokenize bền vững cho các script fine-tune transformer ---
+# Lần chạy đầu tokenize và ghi input_ids (không pad) ra đĩa dạng .npy; các lần sau (đổi optimizer/số epoch)
+# chỉ memory-map file đó, bỏ qua hoàn toàn bước tokenize.
+# Khóa = hash nội dung văn bản (tương đương hash file dataset nhưng vẫn đúng khi script tự chia train/test)
+#       + tên/lớp/kích thước vocab của tokenizer + max_length.
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+TOKEN_CACHE_DIR = os.environ.get("TOKEN_CACHE_DIR", "token_cache")
+FORMAT_VERSION = 1
+
+
+def texts_fingerprint(texts):
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(str(text).encode("utf-8")); digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer):
+    return {"name": getattr(tokenizer, "name_or_path", ""), "class": type(tokenizer).__name__, "vocab_size": len(tokenizer)}
+
+
+class EncodedTexts:
+    """input_ids của N văn bản lưu phẳng (ids) + vị trí bắt đầu (offsets), không tốn chỗ cho padding."""
+
+    def __init__(self, ids, offsets, pad_token_id):
+        self.ids = ids; self.offsets = offsets; self.pad_token_id = pad_token_id
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def row(self, i):
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def padded(self, padding="max_length", max_length=None, dtype=np.int32):
+        """Trả về {"input_ids", "attention_mask"} dạng mảng (N, L): L = max_length ('max_length') hoặc câu dài nhất ('longest')."""
+        lengths = self.lengths()
+        width = int(lengths.max(initial=0)) if padding == "longest" or max_length is None else int(max_length)
+        lengths = np.minimum(lengths, width)
+        mask = np.arange(width)[None, :] < lengths[:, None]
+        input_ids = np.full((len(self), width), self.pad_token_id, dtype=dtype)
+        # Vị trí trong mảng phẳng của từng token được giữ lại (đã cắt về width)
+        rows, cols = np.nonzero(mask)
+        input_ids[rows, cols] = self.ids[self.offsets[:-1][rows] + cols]
+        return {"input_ids": input_ids, "attention_mask": mask.astype(dtype)}
+
+
+def encode_cached(texts, tokenizer, max_length=256, cache_dir=TOKEN_CACHE_DIR, batch_size=1000):
+    """Tokenize (truncation=True, không pad) có cache trên đĩa; trả về EncodedTexts (ids được memory-map khi đọc từ cache)."""
+    texts = [str(text) for text in texts]
+    meta = {"version": FORMAT_VERSION, "texts": texts_fingerprint(texts), "count": len(texts),
+            "tokenizer": tokenizer_fingerprint(tokenizer), "max_length": max_length}
+    key = hashlib.sha256(json.dumps(meta, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+    path = os.path.join(cache_dir, key)
+    start = time.perf_counter()
+    if os.path.exists(os.path.join(path, "meta.json")):
+        encoded = EncodedTexts(np.load(os.path.join(path, "ids.npy"), mmap_mode="r"), np.load(os.path.join(path, "offsets.npy")), tokenizer.pad_token_id)
+        print(f"⚡ Token cache (warm): {len(texts)} văn bản từ {path} trong {time.perf_counter() - start:.2f}s")
+        return encoded
+
+    ids, lengths = [], []
+    for begin in range(0, len(texts), batch_size):
+        for row in tokenizer(texts[begin:begin + batch_size], truncation=True, max_length=max_length)["input_ids"]:
+            ids.extend(row); lengths.append(len(row))
+    ids = np.asarray(ids, dtype=np.int32); offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, "ids.npy"), ids); np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+    meta["seconds"] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f: json.dump(meta, f, indent=2)
+    try: os.replace(tmp_path, path) # Ghi xong mới đổi tên: lần chạy bị ngắt giữa chừng không để lại cache hỏng
+    except OSError: shutil.rmtree(tmp_path, ignore_errors=True) # Tiến trình khác đã ghi cùng khóa
+    print(f"⏱️ Token cache (cold): tokenize {len(texts)} văn bản trong {meta['seconds']:.2f}s, lưu tại {path}")
+    return EncodedTexts(ids, offsets, tokenizer.pad_token_id)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# --- Bước Word2Vec dùng chung + cache cho LSTM_W2V.py / BiLSTM_W2V.py ---
+# Word2Vec chỉ được huấn luyện một lần cho mỗi khóa (corpus sau tiền xử lý, siêu tham số, phiên bản gensim);
+# KeyedVectors được lưu với các mảng tách thành file .npy riêng nên lần chạy sau mở bằng mmap thay vì huấn luyện lại.
+# Chạy LSTM rồi BiLSTM liên tiếp (hoặc song song - có khóa file) chỉ huấn luyện Word2Vec một lần.
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from token_cache import texts_fingerprint
+
+W2V_CACHE_DIR = os.environ.get("W2V_CACHE_DIR", "w2v_cache")
+FORMAT_VERSION = 1
+
+
+def default_workers():
+    """Số luồng huấn luyện = số lõi được phép dùng (thay cho workers=4 cố định)."""
+    try: return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError: return max(1, os.cpu_count() or 1)
+
+
+@contextmanager
+def _file_lock(path):
+    """Khóa độc quyền giữa các tiến trình (Linux/macOS); trên Windows không khóa."""
+    try:
+        import fcntl
+    except ImportError:
+        yield; return
+    with open(path, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try: yield
+        finally: fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def train_word2vec(sentences, vector_size=100, window=5, min_count=1, epochs=5, seed=1, workers=None, cache_dir=W2V_CACHE_DIR):
+    """KeyedVectors của Word2Vec huấn luyện trên `sentences` (danh sách danh sách từ), đọc từ cache nếu đã có."""
+    import gensim
+    from gensim.models import KeyedVectors, Word2Vec
+    sentences = [list(s) for s in sentences]
+    params = {"vector_size": vector_size, "window": window, "min_count": min_count, "epochs": epochs, "seed": seed}
+    meta = {"version": FORMAT_VERSION, "gensim": gensim.__version__, "corpus": texts_fingerprint(" ".join(s) for s in sentences),
+            "sentences": len(sentences), "params": params}
+    key = hashlib.sha256(json.dumps(meta, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+    path = os.path.join(cache_dir, key); vectors_path = os.path.join(path, "vectors.kv")
+    os.makedirs(cache_dir, exist_ok=True)
+    with _file_lock(f"{path}.lock"): # Hai script chạy song song: script sau chờ rồi dùng kết quả của script trước
+        start = time.perf_counter()
+        if os.path.exists(os.path.join(path, "meta.json")):
+            wv = KeyedVectors.load(vectors_path, mmap="r")
+            print(f"⚡ Word2Vec (cache): {len(wv)} từ từ {path} trong {time.perf_counter() - start:.2f}s")
+            return wv
+        workers = workers or default_workers()
+        wv = Word2Vec(sentences, workers=workers, **params).wv
+        meta.update(workers=workers, seconds=round(time.perf_counter() - start, 3), words=len(wv))
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        wv.save(os.path.join(tmp_path, "vectors.kv"), sep_limit=0) # sep_limit=0: mọi mảng ra .npy riêng -> mở được bằng mmap
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f: json.dump(meta, f, indent=2)
+        shutil.rmtree(path, ignore_errors=True); os.replace(tmp_path, path)
+    print(f"⏱️ Word2Vec: huấn luyện {len(sentences)} câu với {workers} luồng trong {meta['seconds']:.1f}s, lưu tại {path}")
+    return wv
+
+
+def embedding_matrix(wv, word_index, num_words, missing="zeros", scale=0.6, seed=None):
+    """Ma trận (num_words, dim) từ word_index của Tokenizer Keras; từ không có trong wv: 0 hoặc N(0, scale) (missing="random")."""
+    items = [(w, i) for w, i in word_index.items() if i < num_words]
+    ids = np.fromiter((i for _, i in items), dtype=np.int64, count=len(items))
+    rows = np.fromiter((wv.key_to_index.get(w, -1) for w, _ in items), dtype=np.int64, count=len(items)); found = rows >= 0
+    matrix = np.zeros((num_words, wv.vector_size), dtype=np.float32)
+    if missing == "random": matrix[ids[~found]] = np.random.default_rng(seed).normal(scale=scale, size=(int((~found).sum()), wv.vector_size))
+    matrix[ids[found]] = wv.vectors[rows[found]]
+    print(f"✅ Word2Vec: {int(found.sum())}/{len(items)} từ của tokenizer có vector")
+    return matrix
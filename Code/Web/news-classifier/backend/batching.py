@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# --- Gom lô động (micro-batching) cho suy luận RoBERTa ---
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+
+class MicroBatcher:
+    """Gom các yêu cầu đến trong một cửa sổ ngắn rồi chạy MỘT lượt forward cho cả lô.
+
+    `predict_fn` nhận list[str] và trả về mảng xác suất có dạng (n, num_labels);
+    mỗi hàng được trả lại cho đúng luồng xử lý HTTP đang chờ.
+    `capture` (tùy chọn, vd. METRICS.capture): context manager trả về dict thời gian các bước của lượt forward;
+    dict đó được gắn vào từng Future của lô ở thuộc tính `stage_timings`.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0, capture=None):
+        self.predict_fn = predict_fn; self.capture = capture
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batches_run = 0; self.items_run = 0
+        self._lock = threading.Lock()
+        self._queue = None; self._worker = None; self._worker_pid = None
+
+    def _ensure_worker(self):
+        """Khởi động luồng nền một cách lười (an toàn khi server fork nhiều tiến trình)."""
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker is not None and self._worker.is_alive(): return
+        with self._lock:
+            if self._worker_pid == pid and self._worker is not None and self._worker.is_alive(): return
+            # Sau khi fork, hàng đợi/luồng của tiến trình cha không dùng được -> tạo mới
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+
+    def submit(self, text):
+        """Đưa một văn bản vào hàng đợi, trả về Future chứa vector xác suất của nó."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text, timeout=None):
+        """Phiên bản đồng bộ của submit(): chờ đến khi lô chứa văn bản này chạy xong."""
+        return self.submit(text).result(timeout=timeout)
+
+    def close(self):
+        """Dừng luồng nền (dùng trong benchmark khi tạo nhiều batcher)."""
+        if self._queue is not None and self._worker is not None and self._worker.is_alive():
+            self._queue.put(None); self._worker.join()
+
+    def stats(self):
+        avg = self.items_run / self.batches_run if self.batches_run else 0.0
+        return {"batches": self.batches_run, "items": self.items_run, "avg_batch_size": round(avg, 2),
+                "max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait * 1000.0}
+
+    def _run(self):
+        q = self._queue
+        while True:
+            first = q.get()
+            if first is None: return
+            batch = [first]; stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try: item = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty: break
+                if item is None: stop = True; break
+                batch.append(item)
+            self._process(batch)
+            if stop: return
+
+    def _process(self, batch):
+        texts = [text for text, _ in batch]
+        try:
+            with (self.capture() if self.capture is not None else nullcontext({})) as stage_timings:
+                probabilities = self.predict_fn(texts)
+        except Exception as e:
+            for _, future in batch: future.set_exception(e)
+            return
+        self.batches_run += 1; self.items_run += len(batch)
+        for i, (_, future) in enumerate(batch):
+            future.stage_timings = stage_timings # Gắn trước set_result để luồng chờ luôn thấy
+            future.set_result(probabilities[i])
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Benchmark tải: số yêu cầu/giây theo cửa sổ gom lô (BATCH_MAX_WAIT_MS).
+
+Chạy: python bench_batching.py --requests 256 --concurrency 32 --windows 0 2 5 10 20
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import load_test_texts, percentiles
+from batching import MicroBatcher
+import model as backend
+
+
+def run_load(batcher, texts, concurrency):
+    latencies = []
+    def one(text):
+        start = time.perf_counter(); batcher.predict(text); latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool: list(pool.map(one, texts))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=backend.BATCH_MAX_SIZE)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 2, 5, 10, 20], help="Các giá trị max_wait_ms cần đo")
+    args = parser.parse_args()
+    if backend.MODEL is None: raise SystemExit("❌ Mô hình chưa được tải, không thể benchmark.")
+
+    texts = [backend.preprocess_text(t) for t in load_test_texts(limit=args.requests)]
+    backend.predict_probabilities(texts[:1]) # Khởi động (warm-up) TensorFlow
+
+    # Đường cơ sở: mỗi yêu cầu một lượt forward riêng (hành vi cũ)
+    configs = [("no batching", 1, 0.0)] + [(f"window {w:g} ms", args.max_batch_size, w) for w in args.windows]
+    print(f"{'config':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'avg batch':>11}")
+    for name, size, wait in configs:
+        batcher = MicroBatcher(backend.predict_probabilities, max_batch_size=size, max_wait_ms=wait)
+        elapsed, latencies = run_load(batcher, texts, args.concurrency)
+        batcher.close()
+        p50, p95, p99 = percentiles(latencies)
+        print(f"{name:<18}{len(texts) / elapsed:>10.2f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{batcher.stats()['avg_batch_size']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
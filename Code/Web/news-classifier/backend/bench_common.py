@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# --- Tiện ích dùng chung cho các script benchmark của backend ---
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DATASET_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "Dataset", "New_Dataset"))
+
+
+def load_test_texts(limit=None, with_labels=False):
+    """Đọc văn bản (và nhãn) từ mọi file Dataset/New_Dataset/*/test.csv (phân tách bằng ';')."""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(DATASET_DIR, "*", "test.csv"))):
+        df = pd.read_csv(path, delimiter=";", names=["text", "label"], skiprows=1)
+        df["dataset"] = os.path.basename(os.path.dirname(path))
+        frames.append(df.dropna(subset=["text"]))
+    if not frames: raise FileNotFoundError(f"Không tìm thấy test.csv trong {DATASET_DIR}")
+    df = pd.concat(frames, ignore_index=True)
+    if limit: df = df.sample(n=min(limit, len(df)), random_state=42).reset_index(drop=True)
+    if with_labels: return df["text"].astype(str).tolist(), df["label"].astype(int).tolist()
+    return df["text"].astype(str).tolist()
+
+
+def percentiles(latencies_s):
+    """Trả về (p50, p95, p99) tính bằng mili-giây."""
+    arr = np.asarray(latencies_s, dtype=np.float64) * 1000.0
+    if arr.size == 0: return 0.0, 0.0, 0.0
+    return tuple(float(v) for v in np.percentile(arr, [50, 95, 99]))
+
+
+class Timer:
+    """Đo thời gian một khối lệnh: `with Timer() as t: ...; t.elapsed`."""
+    def __enter__(self):
+        self.start = time.perf_counter(); return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
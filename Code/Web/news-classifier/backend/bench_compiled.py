@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""So sánh độ trễ mỗi yêu cầu: TF eager với tf.function biên dịch sẵn theo bucket (có/không XLA).
+
+Chạy: python bench_compiled.py --per-bucket 30 --batch-size 1
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bench_common import load_test_texts, percentiles
+from inference import CompiledTFRunner, TFRunner
+import model as backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-bucket", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--xla", action="store_true", help="Đo thêm biến thể jit_compile=True")
+    args = parser.parse_args()
+    if backend.MODEL is None: raise SystemExit("❌ Mô hình chưa được tải, không thể benchmark.")
+
+    texts = [t for t in (backend.preprocess_text(x) for x in load_test_texts()) if t]
+    encoded = backend.TOKENIZER(texts, truncation=True, max_length=backend.MAX_LEN_PREDICT)
+    by_bucket = {}
+    for ids, mask in zip(encoded['input_ids'], encoded['attention_mask']):
+        rows = by_bucket.setdefault(backend.bucket_for_length(len(ids)), [])
+        if len(rows) < args.per_bucket: rows.append((ids, mask))
+
+    runners = [("eager", TFRunner(backend.MODEL))]
+    for jit in ([False, True] if args.xla else [False]):
+        runner = CompiledTFRunner(backend.MODEL, backend.LENGTH_BUCKETS, backend.TOKENIZER.pad_token_id, jit_compile=jit)
+        print(f"⏳ Biên dịch {'XLA' if jit else 'tf.function'}:"); runner.warmup(batch_sizes=(args.batch_size,))
+        runners.append(("xla" if jit else "tf.function", runner))
+
+    header = "".join(f"{name + ' p50':>18}" for name, _ in runners)
+    print(f"{'bucket':>7}{'n':>5}{header}{'speedup':>10}")
+    for bucket in sorted(by_bucket):
+        rows = by_bucket[bucket]; means = []; cells = ""
+        for _, runner in runners:
+            latencies = []
+            for start in range(0, len(rows), args.batch_size):
+                chunk = rows[start:start + args.batch_size]
+                batch = backend.TOKENIZER.pad({'input_ids': [r[0] for r in chunk], 'attention_mask': [r[1] for r in chunk]}, padding='longest', return_tensors='np')
+                t0 = time.perf_counter(); runner.logits(batch['input_ids'], batch['attention_mask']); latencies.append(time.perf_counter() - t0)
+            means.append(np.mean(latencies)); cells += f"{percentiles(latencies)[0]:>18.1f}"
+        print(f"{bucket:>7}{len(rows):>5}{cells}{means[0] / min(means[1:]):>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Benchmark giải thích: độ trễ và độ khớp top-10 từ so với SHAP gốc (Explainer mới mỗi yêu cầu, không giới hạn max_evals).
+
+Chạy: python bench_explain.py --samples 20 --budgets 100 200 500
+"""
+import argparse
+import time
+
+import numpy as np
+import shap
+
+from bench_common import load_test_texts, percentiles
+from explain import ExplanationEngine
+import model as backend
+
+
+def baseline_top_words(engine, text):
+    """Hành vi cũ: tạo shap.Explainer mới cho mỗi yêu cầu, ngân sách mặc định của SHAP."""
+    explainer = shap.Explainer(engine._predict_logits, backend.TOKENIZER)
+    values = explainer([text])
+    return engine.select_top_words(values.values[0, :, 0], values.data[0])
+
+
+def overlap(a, b):
+    return len(set(a) & set(b)) / max(1, len(set(a) | set(b)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[100, 200, 500], help="Các giá trị max_evals của SHAP")
+    args = parser.parse_args()
+    if backend.MODEL is None: raise SystemExit("❌ Mô hình chưa được tải, không thể benchmark.")
+
+    texts = [t for t in (backend.preprocess_text(x) for x in load_test_texts(limit=args.samples)) if t]
+    engine = ExplanationEngine(backend.MODEL, backend.TOKENIZER, max_len=backend.SHAP_MAX_LEN, batch_size=backend.EXPLAIN_BATCH_SIZE)
+
+    reference, base_latencies = [], []
+    for text in texts:
+        start = time.perf_counter(); reference.append(baseline_top_words(engine, text)); base_latencies.append(time.perf_counter() - start)
+
+    configs = [(f"shap max_evals={b}", "shap", b) for b in args.budgets] + [("gradient x input", "gradient", None)]
+    print(f"{'method':<24}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'top-10 Jaccard':>16}")
+    p50, p95, _ = percentiles(base_latencies)
+    print(f"{'shap (cũ)':<24}{p50:>10.0f}{p95:>10.0f}{np.mean(base_latencies) * 1000:>10.0f}{1.0:>16.3f}")
+    for name, method, budget in configs:
+        latencies, scores = [], []
+        for text, ref in zip(texts, reference):
+            start = time.perf_counter(); words = engine.top_fake_words(text, method=method, max_evals=budget)
+            latencies.append(time.perf_counter() - start); scores.append(overlap(words, ref))
+        p50, p95, _ = percentiles(latencies)
+        print(f"{name:<24}{p50:>10.0f}{p95:>10.0f}{np.mean(latencies) * 1000:>10.0f}{np.mean(scores):>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
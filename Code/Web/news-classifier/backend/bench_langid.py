@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmark nhận dạng ngôn ngữ: langdetect.detect() trên toàn văn (cũ) so với LanguageIdentifier (language.py).
+
+Mỗi cách: p50/p95 độ trễ mỗi bài, thời gian cả lô, số bài cho kết quả khác nhau giữa hai lượt chạy (tính tất định)
+và tỉ lệ đồng ý với cách cũ. LanguageIdentifier được đo cả khi cache trống (cold) lẫn khi chạy lại (cache).
+Dữ liệu: mọi file Dataset/New_Dataset/*/test.csv.
+Chạy: python bench_langid.py --limit 500 --backend langdetect fasttext --prefix-chars 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bench_common import load_test_texts, percentiles
+from language import LanguageIdentifier, make_language_backend
+
+
+def run(detect, texts):
+    latencies, results = [], []
+    for text in texts:
+        start = time.perf_counter(); results.append(detect(text)); latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def report(name, latencies, batch_seconds, first, second, baseline):
+    p50, p95, _ = percentiles(latencies)
+    unstable = sum(a != b for a, b in zip(first, second)); agree = np.mean([a == b for a, b in zip(first, baseline)])
+    print(f"{name:<34}{p50:>10.3f}{p95:>10.3f}{batch_seconds:>10.2f}{unstable:>10}{agree:>10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--backend", nargs="+", default=["langdetect"], choices=["langdetect", "fasttext"])
+    parser.add_argument("--fasttext-path", default="Model/lid.176.ftz")
+    parser.add_argument("--prefix-chars", type=int, default=1000)
+    args = parser.parse_args()
+    texts = load_test_texts(limit=args.limit)
+    print(f"📥 {len(texts)} bài, trung bình {np.mean([len(t) for t in texts]):.0f} ký tự")
+
+    import langdetect
+    def old_detect(text): # Đúng lời gọi cũ trong model.py: toàn văn, không seed
+        try: return langdetect.detect(text) if len(text) >= 15 else "unknown_short"
+        except langdetect.LangDetectException: return "unknown_error"
+    start = time.perf_counter(); latencies, baseline = run(old_detect, texts); old_seconds = time.perf_counter() - start
+    _, baseline_again = run(old_detect, texts)
+
+    print(f"\n{'cách':<34}{'p50 ms':>10}{'p95 ms':>10}{'tổng s':>10}{'đổi kq':>10}{'đồng ý':>10}")
+    report("langdetect.detect (toàn văn)", latencies, old_seconds, baseline, baseline_again, baseline)
+    for backend in args.backend:
+        factory = lambda: make_language_backend(backend, args.fasttext_path)
+        identifier = LanguageIdentifier(factory, prefix_chars=args.prefix_chars); identifier.detect("warm up the backend model") # Không tính thời gian import
+        identifier.cache.clear()
+        start = time.perf_counter(); latencies, first = run(lambda t: identifier.detect(t)[0], texts); cold_seconds = time.perf_counter() - start
+        start = time.perf_counter(); cached_latencies, _ = run(lambda t: identifier.detect(t)[0], texts); cached_seconds = time.perf_counter() - start
+        fresh = LanguageIdentifier(factory, prefix_chars=args.prefix_chars) # Tính tất định: instance mới, cache trống
+        _, second = run(lambda t: fresh.detect(t)[0], texts)
+        batch = LanguageIdentifier(factory, prefix_chars=args.prefix_chars); batch.detect("warm up the backend model")
+        start = time.perf_counter(); batch.detect_batch(texts); batch_seconds = time.perf_counter() - start
+        report(f"{backend} prefix {args.prefix_chars} (cold)", latencies, cold_seconds, first, second, baseline)
+        report(f"{backend} prefix {args.prefix_chars} (cache)", cached_latencies, cached_seconds, first, second, baseline)
+        print(f"{f'{backend} detect_batch (cold)':<34}{'':>20}{batch_seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Benchmark độ trễ theo độ dài bài: cắt cụt ở cửa sổ đầu (LONG_DOC_AGGREGATION rỗng) so với cửa sổ trượt + gộp logits.
+
+Bài thật trong Dataset/New_Dataset/*/test.csv hiếm khi vượt 512 token nên bài dài được tạo thêm bằng cách nối
+1..--max-concat bài liên tiếp. Mỗi nhóm độ dài (theo số cửa sổ): p50/p95 độ trễ (lô 1) của từng chế độ
+và tỉ lệ bài có nhãn dự đoán thay đổi khi mô hình đọc hết bài thay vì chỉ trang đầu.
+Chạy: python bench_long_docs.py --per-length 20 --aggregation mean max attention
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bench_common import load_test_texts, percentiles
+import model as backend
+
+
+def measure(texts, bundle, modes):
+    """{chế độ: (độ trễ, nhãn dự đoán)}; các chế độ chạy xen kẽ trên từng bài nên nhiễu của máy chia đều cho mọi chế độ."""
+    results = {mode: ([], []) for mode in modes}
+    for text in texts:
+        for mode in modes:
+            backend.LONG_DOC_AGGREGATION = mode
+            start = time.perf_counter(); probabilities = backend.predict_probabilities([text], bundle)
+            results[mode][0].append(time.perf_counter() - start); results[mode][1].append(int(probabilities[0].argmax()))
+    return {mode: (latencies, np.asarray(predictions)) for mode, (latencies, predictions) in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-length", type=int, default=20, help="số bài cho mỗi mức nối 1..max-concat bài")
+    parser.add_argument("--max-concat", type=int, default=8)
+    parser.add_argument("--aggregation", nargs="+", default=[backend.LONG_DOC_AGGREGATION or "mean"], choices=backend.AGGREGATIONS)
+    args = parser.parse_args()
+
+    raw = load_test_texts(limit=args.per_length * args.max_concat)
+    articles = backend.preprocess_texts(raw, backend.get_stop_words())
+    texts = [" ".join(articles[start:start + k]) for k in range(1, args.max_concat + 1)
+             for start in range(0, args.per_length * k, k) if start + k <= len(articles)]
+    with backend.REGISTRY.use() as bundle:
+        backend.warmup_model(bundle); tokenizer = bundle.tokenizer
+        window = min(backend.MAX_LEN_PREDICT, getattr(tokenizer, 'model_max_length', backend.MAX_LEN_PREDICT))
+        lengths = np.asarray([len(ids) for ids in tokenizer(texts, truncation=False)['input_ids']])
+        windows = np.asarray([len(backend.split_windows(list(range(n)), tokenizer, window, backend.LONG_DOC_OVERLAP)) for n in lengths])
+        windows = np.minimum(windows, backend.LONG_DOC_MAX_WINDOWS)
+        modes = [""] + args.aggregation; results = measure(texts, bundle, modes)
+    backend.LONG_DOC_AGGREGATION = modes[1]
+
+    print(f"\n📊 Mô hình '{bundle.spec.name}', cửa sổ {window} token, chồng lấn {backend.LONG_DOC_OVERLAP}, tối đa {backend.LONG_DOC_MAX_WINDOWS} cửa sổ")
+    header = f"{'cửa sổ':>7}{'số bài':>8}{'token tb':>10}{'cắt cụt p50':>13}"
+    for mode in args.aggregation: header += f"{mode + ' p50':>16}{mode + ' p95':>16}{'đổi nhãn':>10}"
+    print(header)
+    for n_windows in np.unique(windows):
+        rows = np.flatnonzero(windows == n_windows)
+        line = f"{n_windows:>7}{len(rows):>8}{lengths[rows].mean():>10.0f}{percentiles(np.asarray(results[''][0])[rows])[0]:>11.2f}ms"
+        for mode in args.aggregation:
+            latencies, predictions = results[mode]; p50, p95, _ = percentiles(np.asarray(latencies)[rows])
+            changed = float((predictions[rows] != results[''][1][rows]).mean())
+            line += f"{p50:>14.2f}ms{p95:>14.2f}ms{changed:>10.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
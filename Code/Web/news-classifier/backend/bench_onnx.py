@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""So sánh TF (eager) với ONNX / ONNX int8: độ chính xác trên các test.csv và độ trễ/thông lượng CPU.
+
+Chạy: python bench_onnx.py --limit 500 --batch-size 8
+Yêu cầu: đã chạy export_onnx.py cho checkpoint đang dùng (MODEL_PATH).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bench_common import load_test_texts, percentiles
+from inference import make_runner, softmax
+import model as backend
+
+
+def run(runner, encoded, batch_size):
+    probabilities, latencies = [], []
+    for start in range(0, len(encoded['input_ids']), batch_size):
+        batch = backend.TOKENIZER.pad({'input_ids': encoded['input_ids'][start:start + batch_size],
+                                       'attention_mask': encoded['attention_mask'][start:start + batch_size]},
+                                      padding='longest', return_tensors='np')
+        t0 = time.perf_counter()
+        probabilities.append(softmax(runner.logits(batch['input_ids'], batch['attention_mask'])))
+        latencies.append(time.perf_counter() - t0)
+    return np.concatenate(probabilities), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", default=["tf", "onnx", "onnx-int8"])
+    args = parser.parse_args()
+    if backend.MODEL is None: raise SystemExit("❌ Mô hình chưa được tải, không thể benchmark.")
+
+    texts, labels = load_test_texts(limit=args.limit, with_labels=True)
+    texts = [backend.preprocess_text(t) for t in texts]; labels = np.asarray(labels)
+    encoded = backend.TOKENIZER(texts, truncation=True, max_length=backend.MAX_LEN_PREDICT)
+
+    reference = None
+    print(f"{'backend':<11}{'accuracy':>10}{'agree':>8}{'max|Δp|':>10}{'p50 ms':>9}{'p95 ms':>9}{'docs/s':>9}")
+    for name in args.backends:
+        runner = make_runner(name, backend.MODEL, backend.MODEL_PATH)
+        run(runner, {k: v[:args.batch_size] for k, v in encoded.items()}, args.batch_size) # Warm-up
+        start = time.perf_counter(); probs, latencies = run(runner, encoded, args.batch_size); elapsed = time.perf_counter() - start
+        preds = probs.argmax(axis=1)
+        if reference is None: reference = probs
+        agree = float((preds == reference.argmax(axis=1)).mean()); max_diff = float(np.abs(probs - reference).max())
+        p50, p95, _ = percentiles(latencies)
+        print(f"{name:<11}{(preds == labels).mean():>10.4f}{agree:>8.4f}{max_diff:>10.4f}{p50:>9.1f}{p95:>9.1f}{len(texts) / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Benchmark độ trễ theo bucket độ dài: pad cố định 512 (cũ) so với pad động theo bucket (mới).
+
+Dữ liệu: mọi file Dataset/New_Dataset/*/test.csv.
+Chạy: python bench_padding.py --per-bucket 50 --batch-size 1
+"""
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from bench_common import load_test_texts, percentiles
+import model as backend
+
+
+def predict_max_length(texts):
+    """Đường cũ: mọi văn bản đều pad tới MAX_LEN_PREDICT."""
+    inputs = backend.TOKENIZER(list(texts), padding='max_length', truncation=True, max_length=backend.MAX_LEN_PREDICT, return_tensors='tf')
+    return tf.nn.softmax(backend.MODEL(inputs).logits, axis=-1).numpy()
+
+
+def measure(fn, batches):
+    latencies = []
+    for batch in batches:
+        start = time.perf_counter(); fn(batch); latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-bucket", type=int, default=50, help="Số văn bản tối đa mỗi bucket")
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+    if backend.MODEL is None: raise SystemExit("❌ Mô hình chưa được tải, không thể benchmark.")
+
+    texts = [t for t in (backend.preprocess_text(x) for x in load_test_texts()) if t]
+    lengths = [len(ids) for ids in backend.TOKENIZER(texts, truncation=True, max_length=backend.MAX_LEN_PREDICT)['input_ids']]
+    by_bucket = {}
+    for text, n in zip(texts, lengths):
+        rows = by_bucket.setdefault(backend.bucket_for_length(n), [])
+        if len(rows) < args.per_bucket: rows.append(text)
+
+    predict_max_length(texts[:1]); backend.predict_probabilities(texts[:1]) # Warm-up
+    print(f"{'bucket':>7}{'n':>6}{'old p50':>10}{'old p95':>10}{'new p50':>10}{'new p95':>10}{'speedup':>9}")
+    for bucket in sorted(by_bucket):
+        rows = by_bucket[bucket]
+        batches = [rows[i:i + args.batch_size] for i in range(0, len(rows), args.batch_size)]
+        old = measure(predict_max_length, batches); new = measure(backend.predict_probabilities, batches)
+        (o50, o95, _), (n50, n95, _) = percentiles(old), percentiles(new)
+        print(f"{bucket:>7}{len(rows):>6}{o50:>10.1f}{o95:>10.1f}{n50:>10.1f}{n95:>10.1f}{np.mean(old) / np.mean(new):>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
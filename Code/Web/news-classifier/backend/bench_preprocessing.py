@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""So sánh preprocess_text() cũ (từng văn bản) với preprocessing.preprocess_texts() (cả lô) của backend.
+
+Kiểm tra kết quả giống hệt nhau trên mọi test.csv trong Dataset/New_Dataset trước khi đo; thoát mã 1 nếu khác.
+Chạy: python bench_preprocessing.py --batch-size 32
+"""
+import argparse
+import re
+import sys
+import unicodedata
+
+from bench_common import Timer, load_test_texts
+from preprocessing import DOC_SEPARATOR, preprocess_texts
+
+EDGE_CASES = ["", "   ", None, 42, "Hello <b>World</b>!!", "see https://x.com/a<b>c and www.y.org", "<unclosed tag\nnext line>",
+              "Ｆｕｌｌｗｉｄｔｈ ﬁ ligature", "don't stop, the END.", "tab\tsep\r\nlines", "x" + DOC_SEPARATOR + "y", "ΣΟΦΟΣ"]
+
+
+def legacy_preprocess_text(text, stop_words):
+    """Bản preprocess_text() trước khi xử lý theo lô (model.py)."""
+    if not isinstance(text, str) or not text.strip(): return ""
+    text = text.lower()
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"https?://\S+|www\.\S+", "", text)
+    text = re.sub(r"<.*?>+", "", text)
+    text = re.sub(r"[^\w\s.,!?']", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return " ".join(word for word in text.split() if word not in stop_words)
+
+
+def load_stop_words():
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english"))
+    except (ImportError, LookupError):
+        print("⚠️ Không có NLTK stopwords, so sánh không lọc stopwords."); return frozenset()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=32, help="Kích thước lô như BATCH_CHUNK_SIZE của /classify/batch")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    stop_words = load_stop_words(); texts = load_test_texts()
+
+    corpus = EDGE_CASES + texts
+    expected = [legacy_preprocess_text(t, stop_words) for t in corpus]
+    actual = [out for start in range(0, len(corpus), args.batch_size) for out in preprocess_texts(corpus[start:start + args.batch_size], stop_words)]
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    if mismatches:
+        i = mismatches[0]
+        print(f"❌ {len(mismatches)} văn bản khác kết quả, ví dụ #{i}: {corpus[i]!r:.80}\n   cũ: {expected[i]!r:.80}\n   mới: {actual[i]!r:.80}"); sys.exit(1)
+    print(f"✅ Kết quả giống hệt preprocess_text() cũ trên {len(corpus)} văn bản")
+
+    print(f"{'cách':<34}{'tốt nhất s':>12}{'docs/s':>12}")
+    for name, fn in (("preprocess_text() từng văn bản", lambda: [legacy_preprocess_text(t, stop_words) for t in texts]),
+                     (f"preprocess_texts() lô {args.batch_size}", lambda: [preprocess_texts(texts[s:s + args.batch_size], stop_words) for s in range(0, len(texts), args.batch_size)]),
+                     ("preprocess_texts() cả corpus", lambda: preprocess_texts(texts, stop_words))):
+        best = float("inf")
+        for _ in range(args.repeat):
+            with Timer() as t: fn()
+            best = min(best, t.elapsed)
+        print(f"{name:<34}{best:>12.3f}{len(texts) / best:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Load test HTTP cho /classify: thông lượng, độ trễ và RSS của từng tiến trình phục vụ.
+
+So sánh server một tiến trình với chế độ nhiều worker:
+    python model.py                                  # terminal 1
+    python bench_server.py --pid <pid model.py>      # terminal 2
+    WEB_WORKERS=4 gunicorn -c gunicorn.conf.py       # terminal 1
+    python bench_server.py --pid <pid gunicorn master>
+--pid đo RSS của tiến trình đó và mọi tiến trình con (worker + tiến trình suy luận); cần psutil hoặc Linux /proc.
+"""
+import argparse
+import json
+import os
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import Timer, load_test_texts, percentiles
+
+
+def process_tree_rss(pid):
+    """[(pid, tên, RSS MB)] của pid và các tiến trình con."""
+    try:
+        import psutil
+        root = psutil.Process(pid)
+        return [(p.pid, p.name(), p.memory_info().rss / 2**20) for p in [root] + root.children(recursive=True)]
+    except ImportError:
+        pass
+    rows, pending = [], [pid]
+    while pending: # Không có psutil: đọc /proc (Linux)
+        current = pending.pop()
+        with open(f"/proc/{current}/status") as f: status = dict(line.split(":", 1) for line in f if ":" in line)
+        rows.append((current, status["Name"].strip(), int(status.get("VmRSS", "0 kB").split()[0]) / 1024))
+        children_path = f"/proc/{current}/task/{current}/children"
+        if os.path.exists(children_path):
+            with open(children_path) as f: pending.extend(int(c) for c in f.read().split())
+    return rows
+
+
+def post_classify(url, text):
+    body = json.dumps({"text": text, "explain": False}).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=300) as response: return response.status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5001/classify")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pid", type=int, default=None, help="pid của server (hoặc gunicorn master) để đo RSS")
+    args = parser.parse_args()
+
+    # Mỗi yêu cầu một văn bản khác nhau (thêm số thứ tự) để không trúng cache dự đoán
+    texts = load_test_texts(limit=args.requests)
+    texts = [f"{text} [{i}]" for i, text in enumerate(texts * (args.requests // len(texts) + 1))][:args.requests]
+    latencies, errors = [], []; lock = threading.Lock()
+
+    def one(text):
+        with Timer() as t:
+            try: status = post_classify(args.url, text)
+            except Exception as e: status = str(e)
+        with lock: (latencies if status == 200 else errors).append(t.elapsed if status == 200 else status)
+
+    with Timer() as total:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool: list(pool.map(one, texts))
+    p50, p95, p99 = percentiles(latencies)
+    print(f"{args.requests} yêu cầu, {args.concurrency} đồng thời: {len(latencies) / total.elapsed:.1f} req/s, "
+          f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, lỗi {len(errors)}")
+    if errors: print(f"   ví dụ lỗi: {errors[0]}")
+    if args.pid:
+        rows = process_tree_rss(args.pid)
+        print(f"{'pid':>8}  {'tiến trình':<24}{'RSS MB':>10}")
+        for pid, name, rss in rows: print(f"{pid:>8}  {name:<24}{rss:>10.1f}")
+        print(f"{'':>8}  {'tổng':<24}{sum(r[2] for r in rows):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Đo thời gian import model.py và thời gian đến dự đoán đầu tiên, có và không có bước warm-up.
+
+Mỗi kịch bản chạy trong một tiến trình Python mới để đo đúng khởi động lạnh.
+Chạy: python bench_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+SCENARIO = r"""
+import json, time
+t0 = time.perf_counter()
+import model
+t_import = time.perf_counter() - t0
+t_warmup = 0.0
+if {warm}:
+    t1 = time.perf_counter(); model.warmup(); t_warmup = time.perf_counter() - t1
+text = model.preprocess_text("Scientists confirm the moon is made of cheese, officials say in a statement on Monday.")
+t2 = time.perf_counter(); model.BATCHER.predict(text); t_first = time.perf_counter() - t2
+t3 = time.perf_counter(); model.BATCHER.predict(text); t_second = time.perf_counter() - t3
+print("RESULT " + json.dumps(dict(import_s=t_import, warmup_s=t_warmup, first_s=t_first, second_s=t_second, total_s=time.perf_counter() - t0)))
+"""
+
+
+def run_scenario(warm):
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", SCENARIO.format(warm=warm)], cwd=here, capture_output=True, text=True, check=True).stdout
+    return json.loads(next(line for line in out.splitlines() if line.startswith("RESULT "))[len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'kịch bản':<22}{'import s':>10}{'warm-up s':>11}{'1st pred ms':>13}{'2nd pred ms':>13}{'total s':>9}")
+    for name, warm in (("không warm-up", False), ("warm-up trước", True)):
+        runs = [run_scenario(warm) for _ in range(args.runs)]
+        mean = {k: float(np.mean([r[k] for r in runs])) for k in runs[0]}
+        print(f"{name:<22}{mean['import_s']:>10.2f}{mean['warmup_s']:>11.2f}{mean['first_s'] * 1000:>13.1f}{mean['second_s'] * 1000:>13.1f}{mean['total_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# --- Cache kết quả dự đoán theo nội dung (LRU + TTL, tùy chọn tầng đĩa SQLite) ---
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_for_key(text):
+    """Chuẩn hóa nhẹ để cùng một bài báo (khác khoảng trắng/Unicode) cho cùng khóa cache."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_key(text, model_name, explain=False):
+    """Khóa = SHA-256 của (tên mô hình, cờ/phương pháp explain, văn bản đã chuẩn hóa)."""
+    explain_tag = explain if isinstance(explain, str) else int(bool(explain))
+    payload = f"{model_name}\x1f{explain_tag}\x1f{normalize_for_key(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """Cache trong bộ nhớ có giới hạn số mục (LRU) và thời gian sống (TTL).
+
+    Nếu có `disk_path`, các mục cũng được ghi vào SQLite để còn dùng được sau khi khởi động lại.
+    Nếu truyền `keep_models`, các mục của mô hình không nằm trong `model_name` / `keep_models` bị xóa khi khởi tạo,
+    nên checkpoint đã bị gỡ khỏi thư mục mô hình không còn chiếm chỗ trong cache.
+    """
+
+    def __init__(self, model_name, max_entries=1024, ttl_seconds=3600, disk_path=None, keep_models=None):
+        self.model_name = model_name
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0; self.disk_hits = 0; self.misses = 0; self.evictions = 0; self.expirations = 0
+        self._db = None
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, model TEXT, value TEXT, created REAL)")
+            if keep_models is not None:
+                keep = sorted({model_name, *keep_models})
+                self._db.execute(f"DELETE FROM predictions WHERE model NOT IN ({', '.join('?' * len(keep))})", keep)
+            self._db.commit()
+
+    def key(self, text, explain=False, model_name=None):
+        """Khóa của văn bản cho `model_name` (mặc định: mô hình của cache)."""
+        return make_key(text, model_name or self.model_name, explain)
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key):
+        """Trả về giá trị đã cache hoặc None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key); self.hits += 1
+                    return value
+                del self._entries[key]; self.expirations += 1
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    value = json.loads(row[0]); self._remember(key, value, row[1]); self.disk_hits += 1
+                    return value
+                if row is not None:
+                    self._db.execute("DELETE FROM predictions WHERE key = ?", (key,)); self._db.commit(); self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value, model_name=None):
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO predictions (key, model, value, created) VALUES (?, ?, ?, ?)",
+                                 (key, model_name or self.model_name, json.dumps(value, ensure_ascii=False), created))
+                self._db.commit()
+
+    def _remember(self, key, value, created):
+        if self.max_entries == 0: return
+        self._entries[key] = (created, value); self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False); self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None: self._db.execute("DELETE FROM predictions"); self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] if self._db is not None else None
+            return {"model": self.model_name, "entries": len(self._entries), "max_entries": self.max_entries,
+                    "ttl_seconds": self.ttl, "disk_entries": disk_entries, "hits": self.hits, "disk_hits": self.disk_hits,
+                    "misses": self.misses, "evictions": self.evictions, "expirations": self.expirations,
+                    "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0}
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# --- Cascade theo độ tự tin: TF-IDF + Logistic Regression (như Old/LR.py) trả lời trước, RoBERTa chỉ chạy khi tầng rẻ không chắc ---
+# Tầng 1 trả lời khi P(Fake) nằm NGOÀI hẳn dải bất định [lower, upper] (P(Fake) < lower hoặc > upper); bài có P(Fake) trong dải,
+# kể cả đúng bằng một đầu mút, được chuyển lên mô hình lớn. Dải (0, 1) = tầng 1 không bao giờ trả lời.
+# Dải được chọn từ dữ liệu validation bởi tune_cascade.py và lưu cùng pipeline trong cascade.pkl.
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+CASCADE_MODEL_FILE = "cascade.pkl"
+
+
+def outside_band(fake, lower, upper):
+    """Mask các bài tầng 1 được trả lời: so sánh chặt, nên P(Fake) bão hòa đúng 0.0/1.0 vẫn lên mô hình lớn khi dải là (0, 1)."""
+    return (fake < lower) | (fake > upper)
+
+
+def make_pipeline(estimator="lr", max_features=200000):
+    """TF-IDF (1-2 gram, sublinear tf) + LogisticRegressionCV như Old/LR.py, hoặc MLP nhỏ (tương tự MLP_TFIDF)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegressionCV
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.pipeline import Pipeline
+    classifier = {"lr": lambda: LogisticRegressionCV(cv=5, scoring='accuracy', random_state=0, max_iter=300),
+                  "mlp": lambda: MLPClassifier(hidden_layer_sizes=(64,), early_stopping=True, max_iter=50, random_state=0)}[estimator]()
+    return Pipeline([("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_features=max_features, sublinear_tf=True, dtype=np.float32)),
+                     ("clf", classifier)])
+
+
+class CascadeStage:
+    """Tầng sàng lọc rẻ của cascade; nhận văn bản ĐÃ tiền xử lý (preprocess_texts) giống mô hình lớn.
+
+    `route(texts)` -> (xác suất (n, 2) theo thứ tự [Fake, Real], mask các bài tầng 1 đủ tự tin để trả lời).
+    """
+
+    def __init__(self, pipeline, lower=0.1, upper=0.9, name="TFIDF_LR", metadata=None):
+        if not 0.0 <= lower <= upper <= 1.0: raise ValueError(f"Dải bất định không hợp lệ: ({lower}, {upper})")
+        self.pipeline = pipeline; self.lower = float(lower); self.upper = float(upper); self.name = name
+        self.metadata = dict(metadata or {})
+        self._lock = threading.Lock()
+        self.answered = 0; self.escalated = 0; self.seconds = 0.0
+
+    @classmethod
+    def fit(cls, texts, labels, estimator="lr", name=None, **kwargs):
+        pipeline = make_pipeline(estimator).fit(texts, labels)
+        return cls(pipeline, name=name or f"TFIDF_{estimator.upper()}", **kwargs)
+
+    def probabilities(self, texts):
+        """Xác suất (n, 2): cột 0 = Fake (nhãn 0), cột 1 = Real (nhãn 1), cùng quy ước với predict_probabilities()."""
+        probabilities = self.pipeline.predict_proba(list(texts)).astype(np.float32)
+        order = np.argsort(self.pipeline.classes_) # Nhãn 0, 1 theo đúng thứ tự cột
+        return probabilities[:, order]
+
+    def confident(self, probabilities):
+        return outside_band(probabilities[:, 0], self.lower, self.upper)
+
+    def route(self, texts):
+        start = time.perf_counter()
+        probabilities = self.probabilities(texts); confident = self.confident(probabilities)
+        with self._lock:
+            self.seconds += time.perf_counter() - start
+            answered = int(confident.sum()); self.answered += answered; self.escalated += len(confident) - answered
+        return probabilities, confident
+
+    def set_band(self, lower, upper):
+        if not 0.0 <= lower <= upper <= 1.0: raise ValueError(f"Dải bất định không hợp lệ: ({lower}, {upper})")
+        self.lower, self.upper = float(lower), float(upper)
+
+    def stats(self):
+        with self._lock:
+            total = self.answered + self.escalated
+            return {"stage": self.name, "band": [self.lower, self.upper], "answered": self.answered, "escalated": self.escalated,
+                    "answered_fraction": round(self.answered / total, 4) if total else 0.0,
+                    "stage_ms_per_doc": round(self.seconds * 1000 / total, 3) if total else 0.0, "metadata": self.metadata}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"pipeline": self.pipeline, "lower": self.lower, "upper": self.upper, "name": self.name, "metadata": self.metadata}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: data = pickle.load(f)
+        return cls(data["pipeline"], data["lower"], data["upper"], data["name"], data.get("metadata"))
+
+
+def load_cascade(path, lower=None, upper=None):
+    """Tải tầng 1 từ `path` (None nếu chưa có file); `lower`/`upper` ghi đè dải đã chọn bởi tune_cascade.py."""
+    if not os.path.exists(path):
+        print(f"⚠️ Không tìm thấy tầng cascade '{path}' (chạy tune_cascade.py để tạo), mọi bài đi thẳng tới mô hình lớn."); return None
+    stage = CascadeStage.load(path)
+    if lower is not None or upper is not None: stage.set_band(stage.lower if lower is None else lower, stage.upper if upper is None else upper)
+    print(f"✅ Cascade: '{stage.name}' trả lời khi P(Fake) ngoài dải [{stage.lower:.3f}, {stage.upper:.3f}]")
+    return stage
+
+
+def band_outcomes(stage_probabilities, big_predictions, labels, lower, upper):
+    """(accuracy của cascade, tỉ lệ bài tầng 1 trả lời) với dải (lower, upper)."""
+    confident = outside_band(stage_probabilities[:, 0], lower, upper)
+    predictions = np.where(confident, stage_probabilities.argmax(axis=1), big_predictions)
+    return float((predictions == labels).mean()), float(confident.mean())
+
+
+def choose_band(stage_probabilities, big_predictions, labels, target_accuracy, grid=101):
+    """Dải (lower, upper) để tầng 1 trả lời NHIỀU bài nhất mà accuracy của cả cascade vẫn >= target_accuracy.
+
+    Ứng viên là các phân vị của P(Fake) trên tập validation (lower <= 0.5 <= upper); không dải nào đạt -> (0, 1)
+    (tầng 1 không bao giờ trả lời, cascade bằng đúng mô hình lớn).
+    """
+    fake = stage_probabilities[:, 0]
+    candidates = np.unique(np.concatenate([np.quantile(fake, np.linspace(0, 1, grid)), [0.0, 0.5, 1.0]]))
+    lowers, uppers = candidates[candidates <= 0.5], candidates[candidates >= 0.5]
+    best = (0.0, 1.0, *band_outcomes(stage_probabilities, big_predictions, labels, 0.0, 1.0))
+    for lower in lowers:
+        for upper in uppers:
+            accuracy, answered = band_outcomes(stage_probabilities, big_predictions, labels, lower, upper)
+            if accuracy >= target_accuracy and (answered, accuracy) > (best[3], best[2]): best = (float(lower), float(upper), accuracy, answered)
+    return best
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Chưng cất RoBERTa (teacher) sang BiLSTM/BiGRU (học trò) để phục vụ trên CPU.
+
+1. Văn bản huấn luyện được tiền xử lý ĐÚNG như lúc phục vụ (preprocess_texts + stopwords), teacher chạy MỘT lần
+   qua toàn bộ corpus theo lô đã sắp theo độ dài; logits được lưu vào DISTILL_CACHE_DIR (lần chạy sau, vd. đổi
+   kiến trúc/nhiệt độ của học trò, không cần chạy lại teacher).
+2. Học trò học từ nhãn thật + phân phối mềm của teacher:
+       loss = alpha * CE(nhãn, học trò) + (1 - alpha) * T^2 * KL(softmax(teacher / T) || softmax(học trò / T))
+3. Artifact <Arch>-student_pretrained_<stamp>/ (config.json, student.keras, tokenizer.json, distill_report.json)
+   được ghi vào thư mục mô hình: registry phục vụ nó như mọi checkpoint khác (chọn bằng 'model' trong yêu cầu).
+4. Báo cáo: accuracy/F1 của teacher và học trò trên tập đánh giá, tỉ lệ đồng ý, độ trễ mỗi bài (lô 1) và thông lượng
+   (lô BATCH_MAX_SIZE) qua cùng đường predict_probabilities() của server.
+
+Chạy: python distill.py --train-csv ../../../../Dataset/.../train.csv [--teacher RoBERTa_pretrained_20250405_171143] [--arch bigru]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DISTILL_CACHE_DIR = os.environ.get("DISTILL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "distill"))
+
+
+def read_corpus(paths, limit=None):
+    """(văn bản, nhãn) từ các CSV 'text;label' như Dataset/New_Dataset/*/train.csv."""
+    frames = [pd.read_csv(path, delimiter=";", names=["text", "label"], skiprows=1).dropna() for path in paths]
+    df = pd.concat(frames, ignore_index=True)
+    if limit: df = df.sample(n=min(limit, len(df)), random_state=42).reset_index(drop=True)
+    return df["text"].astype(str).tolist(), df["label"].astype(int).to_numpy()
+
+
+def teacher_logits(texts, teacher_name, batch_size=32):
+    """Logits của teacher cho các văn bản ĐÃ tiền xử lý; đọc từ cache nếu cùng teacher + cùng văn bản."""
+    import model as backend
+    digest = hashlib.sha256("\0".join([teacher_name, str(backend.MAX_LEN_PREDICT)] + texts).encode("utf-8")).hexdigest()[:20]
+    path = os.path.join(DISTILL_CACHE_DIR, f"teacher_logits_{digest}.npy")
+    if os.path.exists(path):
+        print(f"⚡ Logits của teacher (cache): {path}"); return np.load(path)
+    if backend.REGISTRY is None: raise SystemExit("❌ Không tải được teacher (xem lỗi tải mô hình ở trên).")
+    start = time.perf_counter(); logits = None
+    with backend.REGISTRY.use(teacher_name) as teacher:
+        encoded = teacher.tokenizer(texts, truncation=True, max_length=backend.MAX_LEN_PREDICT)["input_ids"]
+        order = np.argsort([len(ids) for ids in encoded]) # Lô gồm các văn bản dài gần bằng nhau: ít pad
+        for begin in range(0, len(order), batch_size):
+            rows = order[begin:begin + batch_size]
+            batch = teacher.tokenizer.pad({"input_ids": [encoded[i] for i in rows]}, padding="longest", return_tensors="np")
+            out = teacher.runner.logits(batch["input_ids"], batch["attention_mask"])
+            if logits is None: logits = np.zeros((len(texts), out.shape[1]), dtype=np.float32)
+            logits[rows] = out
+            if begin // batch_size % 50 == 0: print(f"   teacher: {begin + len(rows)}/{len(texts)} văn bản, {time.perf_counter() - start:.0f}s")
+    os.makedirs(DISTILL_CACHE_DIR, exist_ok=True); np.save(path, logits)
+    print(f"✅ Teacher chạy xong {len(texts)} văn bản trong {time.perf_counter() - start:.1f}s -> {path}")
+    return logits
+
+
+def distillation_loss(temperature, alpha, num_labels=2):
+    """y_true = [one-hot nhãn | logits teacher]; y_pred = logits học trò."""
+    import tensorflow as tf
+
+    def loss(y_true, y_pred):
+        hard, soft = y_true[:, :num_labels], y_true[:, num_labels:]
+        ce = tf.keras.losses.categorical_crossentropy(hard, y_pred, from_logits=True)
+        log_teacher, log_student = tf.nn.log_softmax(soft / temperature), tf.nn.log_softmax(y_pred / temperature)
+        kl = tf.reduce_sum(tf.exp(log_teacher) * (log_teacher - log_student), axis=-1)
+        return alpha * ce + (1 - alpha) * temperature ** 2 * kl
+    return loss
+
+
+def hard_accuracy(y_true, y_pred):
+    import tensorflow as tf
+    return tf.cast(tf.equal(tf.argmax(y_true[:, :2], axis=-1), tf.argmax(y_pred, axis=-1)), tf.float32)
+
+
+def train_student(texts, labels, logits, architecture="bilstm", num_words=20000, max_length=256, temperature=2.0, alpha=0.5,
+                  epochs=10, batch_size=64, learning_rate=1e-3):
+    import tensorflow as tf
+    from student import StudentTokenizer, build_student
+    tokenizer = StudentTokenizer.fit(texts, num_words=num_words, max_length=max_length)
+    X = tokenizer(texts, return_tensors="np")["input_ids"]
+    y = np.concatenate([np.eye(logits.shape[1], dtype=np.float32)[labels], logits], axis=1)
+    model = build_student(architecture, num_words, num_labels=logits.shape[1])
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate), loss=distillation_loss(temperature, alpha, logits.shape[1]), metrics=[hard_accuracy])
+    early_stop = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=2, restore_best_weights=True)
+    history = model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=0.1, shuffle=True, callbacks=[early_stop])
+    return model, tokenizer, history
+
+
+def save_student(model, tokenizer, out_dir, architecture, config):
+    from student import STUDENT_MODEL_TYPE, STUDENT_WEIGHTS_FILE
+    name = f"{'BiGRU' if architecture == 'bigru' else 'BiLSTM'}-student_pretrained_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    path = os.path.join(out_dir, name); os.makedirs(path, exist_ok=True)
+    model.save(os.path.join(path, STUDENT_WEIGHTS_FILE)); tokenizer.save(path)
+    with open(os.path.join(path, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(config, model_type=STUDENT_MODEL_TYPE, architecture=architecture, num_labels=int(model.output_shape[-1]),
+                       num_words=tokenizer.num_words, max_length=tokenizer.max_length), f, indent=2)
+    print(f"💾 Đã lưu học trò: {path}")
+    return path
+
+
+def serving_report(bundles, texts, labels, teacher_predictions, latency_samples=100):
+    """Chất lượng + độ trễ của từng mô hình qua predict_probabilities() (tokenize + pad + forward như lúc phục vụ)."""
+    from sklearn.metrics import accuracy_score, f1_score
+    import model as backend
+    report = {}
+    for name, bundle in bundles.items():
+        backend.warmup_model(bundle)
+        start = time.perf_counter(); probabilities = backend.predict_probabilities(texts, bundle); batch_seconds = time.perf_counter() - start
+        predictions = probabilities.argmax(axis=1)
+        single = []
+        for text in texts[:latency_samples]:
+            begin = time.perf_counter(); backend.predict_probabilities([text], bundle); single.append(time.perf_counter() - begin)
+        throughput = []
+        for begin in range(0, min(len(texts), latency_samples * 4), backend.BATCH_MAX_SIZE):
+            chunk = texts[begin:begin + backend.BATCH_MAX_SIZE]
+            t0 = time.perf_counter(); backend.predict_probabilities(chunk, bundle); throughput.append(len(chunk) / (time.perf_counter() - t0))
+        report[name] = {"accuracy": float(accuracy_score(labels, predictions)), "f1": float(f1_score(labels, predictions)),
+                        "agreement_with_teacher": float((predictions == teacher_predictions).mean()),
+                        "p50_ms": float(np.percentile(single, 50) * 1000), "p95_ms": float(np.percentile(single, 95) * 1000),
+                        "docs_per_s": float(np.median(throughput)), "eval_seconds": batch_seconds, "weights_mb": round(bundle.weight_bytes / 2**20, 1)}
+    names = list(report)
+    if len(names) == 2: report["speedup_p50"] = report[names[0]]["p50_ms"] / report[names[1]]["p50_ms"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train-csv", nargs="+", required=True, help="CSV 'text;label' để chưng cất")
+    parser.add_argument("--eval-csv", nargs="*", default=None, help="mặc định: mọi Dataset/New_Dataset/*/test.csv")
+    parser.add_argument("--teacher", default=os.environ.get("DEFAULT_MODEL"), help="tên checkpoint trong registry (mặc định: DEFAULT_MODEL)")
+    parser.add_argument("--arch", choices=["bilstm", "bigru"], default="bilstm")
+    parser.add_argument("--num-words", type=int, default=20000)
+    parser.add_argument("--max-length", type=int, default=256, help="số từ tối đa mỗi bài (sau khi bỏ stopwords)")
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.5, help="trọng số của nhãn thật (1 - alpha cho teacher)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--limit", type=int, default=None, help="chỉ dùng N bài huấn luyện (chạy thử)")
+    parser.add_argument("--eval-limit", type=int, default=1000)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument("--out-dir", default=None, help="mặc định: thư mục đầu tiên trong MODEL_DIRS")
+    args = parser.parse_args()
+    if args.teacher: os.environ["DEFAULT_MODEL"] = args.teacher # Registry tải teacher ngay lúc import model.py
+    import model as backend
+    from registry import ModelSpec
+    teacher_name = args.teacher or (backend.REGISTRY.default_name if backend.REGISTRY is not None else None)
+    if teacher_name is None: raise SystemExit("❌ Cần --teacher (không có registry mô hình).")
+
+    stop_words = backend.get_stop_words()
+    texts, labels = read_corpus(args.train_csv, args.limit); texts = backend.preprocess_texts(texts, stop_words)
+    print(f"📥 {len(texts)} bài huấn luyện, teacher '{teacher_name}'")
+    logits = teacher_logits(texts, teacher_name)
+    start = time.perf_counter()
+    student, tokenizer, history = train_student(texts, labels, logits, args.arch, args.num_words, args.max_length, args.temperature, args.alpha,
+                                                args.epochs, args.batch_size)
+    train_seconds = time.perf_counter() - start
+    config = {"teacher": teacher_name, "temperature": args.temperature, "alpha": args.alpha, "train_texts": len(texts),
+              "epochs_trained": len(history.history["loss"]), "train_seconds": round(train_seconds, 1)}
+    path = save_student(student, tokenizer, args.out_dir or backend.MODEL_DIRS[0], args.arch, config)
+
+    if args.eval_csv: eval_texts, eval_labels = read_corpus(args.eval_csv, args.eval_limit)
+    else:
+        from bench_common import load_test_texts
+        eval_texts, eval_labels = load_test_texts(limit=args.eval_limit, with_labels=True)
+    eval_texts = backend.preprocess_texts(eval_texts, stop_words); eval_labels = np.asarray(eval_labels)
+    teacher_predictions = teacher_logits(eval_texts, teacher_name).argmax(axis=1)
+    name = os.path.basename(path); student_bundle = backend.load_model_bundle(ModelSpec(name, path, path)) # Cùng loader với registry
+    if backend.REGISTRY is not None:
+        backend.REGISTRY.refresh()
+        with backend.REGISTRY.use(teacher_name) as teacher:
+            report = serving_report({teacher_name: teacher, name: student_bundle}, eval_texts, eval_labels, teacher_predictions, args.latency_samples)
+    else: # Logits teacher lấy từ cache: vẫn có chất lượng của teacher, không đo được độ trễ
+        from sklearn.metrics import accuracy_score, f1_score
+        print("⚠️ Không tải được teacher: chỉ đo độ trễ của học trò.")
+        report = serving_report({name: student_bundle}, eval_texts, eval_labels, teacher_predictions, args.latency_samples)
+        report[teacher_name] = {"accuracy": float(accuracy_score(eval_labels, teacher_predictions)), "f1": float(f1_score(eval_labels, teacher_predictions))}
+    report["config"] = config
+    with open(os.path.join(path, "distill_report.json"), "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+
+    print(f"\n{'mô hình':<46}{'accuracy':>9}{'f1':>8}{'đồng ý':>8}{'p50 ms':>9}{'p95 ms':>9}{'bài/s':>9}{'MB':>8}")
+    for model_name, r in report.items():
+        if isinstance(r, dict) and "f1" in r:
+            cells = [f"{r[k]:>{w}.{d}f}" if k in r else f"{'-':>{w}}" for k, w, d in
+                     (("agreement_with_teacher", 8, 3), ("p50_ms", 9, 2), ("p95_ms", 9, 2), ("docs_per_s", 9, 1), ("weights_mb", 8, 1))]
+            print(f"{model_name:<46}{r['accuracy']:>9.4f}{r['f1']:>8.4f}{''.join(cells)}")
+    if "speedup_p50" in report: print(f"⚡ Học trò nhanh hơn teacher x{report['speedup_p50']:.1f} mỗi bài (p50, lô 1)")
+    print(f"➡️ Phục vụ: gửi \"model\": \"{name}\" trong yêu cầu, hoặc POST /models/default để đặt làm mặc định.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# --- Giải thích dự đoán: SHAP có ngân sách đánh giá và gradient x input ---
+import threading
+
+import numpy as np
+
+from inference import TFRunner
+
+EXPLAIN_METHODS = ("shap", "gradient")
+CLASS_INDEX_FAKE = 0
+
+
+class ExplanationEngine:
+    """Tạo MỘT lần lúc khởi động và dùng lại cho mọi yêu cầu explain.
+
+    - "shap": shap.Explainer tạo lười một lần cho mỗi luồng rồi dùng lại (explainer partition và masker Text của shap giữ
+      trạng thái của lời gọi đang chạy, nên hai job giải thích song song không được dùng chung một instance), giới hạn
+      `max_evals` lượt đánh giá, các văn bản bị che (mask) được chạy theo lô `batch_size` với pad động.
+    - "gradient": gradient x input trên embedding, chỉ cần một lượt forward + backward.
+    """
+
+    def __init__(self, model, tokenizer, runner=None, max_len=256, max_evals=200, batch_size=16):
+        self.model = model; self.tokenizer = tokenizer
+        self.runner = runner if runner is not None else TFRunner(model) # SHAP dùng backend suy luận đang phục vụ
+        self.max_len = max_len; self.max_evals = max_evals; self.batch_size = batch_size
+        self._local = threading.local() # SHAP chỉ được import khi có yêu cầu đầu tiên
+        special_tokens = [tokenizer.cls_token, tokenizer.sep_token, tokenizer.pad_token,
+                          tokenizer.unk_token, tokenizer.mask_token, '<s>', '</s>', '<pad>', ' ']
+        self.special_tokens = set(tok for tok in special_tokens if tok is not None)
+
+    def _predict_logits(self, texts):
+        """Hàm dự đoán cho SHAP: chạy các văn bản bị che theo lô, pad tới câu dài nhất của mỗi lô."""
+        if isinstance(texts, np.ndarray): texts = texts.tolist()
+        if isinstance(texts, str): texts = [texts]
+        outputs = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(texts[start:start + self.batch_size], padding=True, truncation=True, return_tensors="np", max_length=self.max_len)
+            outputs.append(self.runner.logits(inputs['input_ids'], inputs['attention_mask']))
+        return np.concatenate(outputs, axis=0)
+
+    def _get_shap_explainer(self):
+        """shap.Explainer riêng của luồng hiện tại (mỗi worker giải thích một instance, tạo lười ở lần gọi đầu)."""
+        explainer = getattr(self._local, "shap_explainer", None)
+        if explainer is None:
+            import shap
+            explainer = self._local.shap_explainer = shap.Explainer(self._predict_logits, self.tokenizer)
+        return explainer
+
+    def token_scores(self, text, method="shap", max_evals=None):
+        """Trả về (scores, tokens) - đóng góp của từng token vào lớp Fake."""
+        if method == "gradient": return self._gradient_scores(text)
+        if method != "shap": raise ValueError(f"Phương pháp giải thích không hợp lệ: {method}")
+        shap_values = self._get_shap_explainer()([text], max_evals=max_evals or self.max_evals, batch_size=self.batch_size)
+        return shap_values.values[0, :, CLASS_INDEX_FAKE], shap_values.data[0]
+
+    def _gradient_scores(self, text):
+        import tensorflow as tf # Không import ở đầu module: worker HTTP import explain.py nhưng không chạy mô hình
+        inputs = self.tokenizer([text], truncation=True, max_length=self.max_len, return_tensors="tf")
+        embedding_layer = self.model.get_input_embeddings()
+        embedding_matrix = getattr(embedding_layer, "weight", None)
+        if embedding_matrix is None: embedding_matrix = embedding_layer.embeddings
+        embeds = tf.gather(embedding_matrix, inputs['input_ids'])
+        with tf.GradientTape() as tape:
+            tape.watch(embeds)
+            logits = self.model(inputs_embeds=embeds, attention_mask=inputs['attention_mask']).logits
+            target = logits[0, CLASS_INDEX_FAKE]
+        grads = tape.gradient(target, embeds)
+        scores = tf.reduce_sum(grads * embeds, axis=-1)[0].numpy()
+        tokens = self.tokenizer.convert_ids_to_tokens(inputs['input_ids'][0].numpy().tolist())
+        return scores, tokens
+
+    def top_fake_words(self, text, method="shap", num_top_words=10, max_evals=None):
+        """Các từ/subword (tiếng Anh, đã bỏ Ġ) có đóng góp dương lớn nhất vào lớp Fake."""
+        scores, tokens_or_ids = self.token_scores(text, method=method, max_evals=max_evals)
+        return self.select_top_words(scores, tokens_or_ids, num_top_words)
+
+    def select_top_words(self, scores, tokens_or_ids, num_top_words=10):
+        """Lọc token đặc biệt, bỏ Ġ, bỏ trùng và giữ tối đa num_top_words từ có điểm dương cao nhất."""
+        positive_contribs = [(scores[i], i) for i in range(len(scores)) if scores[i] > 0]
+        positive_contribs.sort(key=lambda item: item[0], reverse=True)
+        top_indices = [index for _, index in positive_contribs[:num_top_words]]
+
+        top_words = []; seen = set()
+        for idx in top_indices:
+            token_data = tokens_or_ids[idx]
+            try:
+                if isinstance(token_data, (int, np.integer)):
+                    decoded_token = self.tokenizer.decode([token_data], skip_special_tokens=False, clean_up_tokenization_spaces=False)
+                elif isinstance(token_data, str):
+                    decoded_token = token_data
+                else:
+                    continue
+                cleaned_token = decoded_token.strip()
+                if cleaned_token in self.special_tokens or not cleaned_token: continue
+                token_text = (cleaned_token[1:] if cleaned_token.startswith('Ġ') else cleaned_token).strip()
+            except Exception as decode_err:
+                print(f"⚠️ Lỗi decode/clean token tại index {idx}: {decode_err}")
+                continue
+            if token_text and len(token_text) > 1 and token_text not in seen:
+                top_words.append(token_text); seen.add(token_text)
+                if len(top_words) >= num_top_words: break
+        return top_words
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Chuyển checkpoint RoBERTa_pretrained_* (tf_model.h5) sang ONNX để phục vụ bằng ONNX Runtime.
+
+Tạo trong <model_dir>_onnx/:
+  model.onnx       - đồ thị gốc xuất từ TensorFlow (tf2onnx)
+  model.opt.onnx   - đã hợp nhất attention/LayerNorm/GELU (onnxruntime.transformers.optimizer)
+  model.int8.onnx  - lượng tử hóa động int8 trọng số của model.opt.onnx
+
+Chạy: python export_onnx.py Model/RoBERTa_pretrained_20250405_171143
+Sau đó đặt INFERENCE_BACKEND=onnx hoặc onnx-int8 khi khởi động model.py.
+"""
+import argparse
+import os
+import time
+
+import tensorflow as tf
+import tf2onnx
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from onnxruntime.transformers.optimizer import optimize_model
+from transformers import TFRobertaForSequenceClassification
+
+from inference import onnx_dir_for
+
+
+def export(model_dir, opset=14):
+    out_dir = onnx_dir_for(model_dir); os.makedirs(out_dir, exist_ok=True)
+    raw_path, opt_path, int8_path = (os.path.join(out_dir, name) for name in ("model.onnx", "model.opt.onnx", "model.int8.onnx"))
+
+    print(f"🔄 Đang tải mô hình từ '{model_dir}'...")
+    model = TFRobertaForSequenceClassification.from_pretrained(model_dir)
+    config = model.config
+    spec = (tf.TensorSpec((None, None), tf.int32, name="input_ids"), tf.TensorSpec((None, None), tf.int32, name="attention_mask"))
+
+    @tf.function(input_signature=spec)
+    def serve(input_ids, attention_mask):
+        return {"logits": model(input_ids=input_ids, attention_mask=attention_mask).logits}
+
+    start = time.perf_counter()
+    tf2onnx.convert.from_function(serve, input_signature=spec, opset=opset, output_path=raw_path)
+    print(f"✅ Đã xuất ONNX: {raw_path} ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    optimized = optimize_model(raw_path, model_type="bert", num_heads=config.num_attention_heads, hidden_size=config.hidden_size)
+    optimized.save_model_to_file(opt_path)
+    print(f"✅ Đã tối ưu đồ thị: {opt_path} ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    quantize_dynamic(opt_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"✅ Đã lượng tử hóa int8: {int8_path} ({time.perf_counter() - start:.1f}s)")
+
+    for path in (raw_path, opt_path, int8_path):
+        print(f"   {os.path.basename(path):<16}{os.path.getsize(path) / 2**20:>8.1f} MB")
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model_dirs", nargs="+", help="Các thư mục RoBERTa_pretrained_* cần chuyển đổi")
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+    for model_dir in args.model_dirs: export(model_dir, opset=args.opset)
+
+
+if __name__ == "__main__":
+    main()
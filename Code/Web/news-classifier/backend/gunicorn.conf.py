@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# --- Chế độ production nhiều worker: gunicorn -c gunicorn.conf.py ---
+# TensorFlow không an toàn khi fork sau khi đã khởi tạo runtime (luồng nội bộ, thread pool), nên thay vì
+# preload mô hình rồi fork, master khởi chạy MỘT tiến trình suy luận (inference_server.py) giữ trọng số và
+# các worker HTTP nhẹ (không import TF) gửi yêu cầu tới nó qua kết nối cục bộ có xác thực.
+# Số luồng tính toán của tiến trình suy luận: TF_INTRA_OP_THREADS / TF_INTER_OP_THREADS.
+import os
+import secrets
+import subprocess
+import sys
+import time
+
+from inference_server import InferenceClient
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("WEB_WORKERS", 4))
+threads = int(os.environ.get("WEB_THREADS", 8)) # Mỗi worker phục vụ nhiều yêu cầu đồng thời (chủ yếu chờ I/O)
+worker_class = "gthread"
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+wsgi_app = "model:app"
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+INFERENCE_STARTUP_TIMEOUT = float(os.environ.get("INFERENCE_STARTUP_TIMEOUT", 600)) # Tải + biên dịch mô hình
+_inference_process = None
+
+
+def on_starting(server):
+    """Khởi chạy tiến trình suy luận và chờ nó warm-up xong trước khi fork các worker."""
+    global _inference_process
+    address = os.environ.setdefault("INFERENCE_ADDRESS", "127.0.0.1:6001")
+    os.environ.setdefault("INFERENCE_AUTHKEY", secrets.token_hex(16)) # Worker kế thừa qua biến môi trường
+    _inference_process = subprocess.Popen([sys.executable, os.path.join(chdir, "inference_server.py"), "--address", address], cwd=chdir)
+    client = InferenceClient(address, os.environ["INFERENCE_AUTHKEY"].encode())
+    deadline = time.monotonic() + INFERENCE_STARTUP_TIMEOUT
+    while True:
+        if _inference_process.poll() is not None: raise RuntimeError(f"Tiến trình suy luận đã thoát (mã {_inference_process.returncode})")
+        if time.monotonic() > deadline: _inference_process.terminate(); raise RuntimeError("Tiến trình suy luận không sẵn sàng kịp thời gian")
+        try:
+            state = client.status()
+            if state["ready"]: server.log.info(f"Tiến trình suy luận sẵn sàng (pid {state['pid']}, backend {state['backend']})"); return
+        except (OSError, EOFError): pass # Chưa lắng nghe
+        time.sleep(1)
+
+
+def post_worker_init(worker):
+    import model
+    model.warmup() # Tải stopwords/VADER/langdetect của worker và kiểm tra kết nối tới tiến trình suy luận
+
+
+def on_exit(server):
+    if _inference_process is not None and _inference_process.poll() is None:
+        _inference_process.terminate(); _inference_process.wait(timeout=30)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# --- Các backend suy luận cho bộ phân loại RoBERTa: TensorFlow (mặc định) hoặc ONNX Runtime ---
+import os
+import time
+
+import numpy as np
+
+INFERENCE_BACKENDS = ("tf-function", "tf", "onnx", "onnx-int8")
+ONNX_FILES = {"onnx": "model.opt.onnx", "onnx-int8": "model.int8.onnx"}
+
+
+def softmax(logits):
+    logits = np.asarray(logits, dtype=np.float32)
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def onnx_dir_for(model_path):
+    """Thư mục chứa artifact ONNX do export_onnx.py tạo ra cho một checkpoint."""
+    return os.path.normpath(model_path) + "_onnx"
+
+
+class TFRunner:
+    """Chạy TFRobertaForSequenceClassification (eager)."""
+    name = "tf"
+
+    def __init__(self, model):
+        self.model = model
+
+    def logits(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits.numpy()
+
+
+class CompiledTFRunner:
+    """Mỗi bucket độ dài có một tf.function với shape cố định (None, bucket), tùy chọn XLA (jit_compile).
+
+    Đầu vào được pad thêm tới bucket nhỏ nhất chứa nó, nên mọi lời gọi đều dùng lại đồ thị đã biên dịch
+    thay vì trả chi phí dispatch Python của chế độ eager.
+    """
+    name = "tf-function"
+
+    def __init__(self, model, buckets, pad_token_id, jit_compile=False):
+        import tensorflow as tf
+        self.model = model; self.buckets = tuple(sorted(buckets)); self.pad_token_id = pad_token_id
+        self.jit_compile = jit_compile; self.compile_seconds = {}
+        self._functions = {}
+        for bucket in self.buckets:
+            spec = (tf.TensorSpec((None, bucket), tf.int32, name="input_ids"), tf.TensorSpec((None, bucket), tf.int32, name="attention_mask"))
+            self._functions[bucket] = tf.function(self._forward, input_signature=spec, jit_compile=jit_compile, reduce_retracing=True)
+
+    def _forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, training=False).logits
+
+    def bucket_for(self, length):
+        for bucket in self.buckets:
+            if length <= bucket: return bucket
+        return self.buckets[-1]
+
+    def warmup(self, batch_sizes=(1,)):
+        """Biên dịch (trace + chạy thử) mọi bucket; trả về thời gian biên dịch theo bucket (giây)."""
+        for bucket in self.buckets:
+            start = time.perf_counter()
+            for batch_size in batch_sizes:
+                ids = np.full((batch_size, bucket), self.pad_token_id, dtype=np.int32); ids[:, 0] = 0
+                self.logits(ids, np.ones((batch_size, bucket), dtype=np.int32))
+            self.compile_seconds[bucket] = round(time.perf_counter() - start, 3)
+            print(f"   ⚙️ bucket {bucket:>4}: biên dịch {self.compile_seconds[bucket]:.2f}s{' (XLA)' if self.jit_compile else ''}")
+        return dict(self.compile_seconds)
+
+    def logits(self, input_ids, attention_mask):
+        input_ids = np.asarray(input_ids, dtype=np.int32); attention_mask = np.asarray(attention_mask, dtype=np.int32)
+        length = input_ids.shape[1]; bucket = self.bucket_for(length)
+        if length < bucket:
+            pad = bucket - length
+            input_ids = np.pad(input_ids, ((0, 0), (0, pad)), constant_values=self.pad_token_id)
+            attention_mask = np.pad(attention_mask, ((0, 0), (0, pad)), constant_values=0)
+        elif length > bucket:
+            input_ids = input_ids[:, :bucket]; attention_mask = attention_mask[:, :bucket]
+        return self._functions[bucket](input_ids, attention_mask).numpy()
+
+
+class OnnxRunner:
+    """Chạy artifact ONNX (đã tối ưu đồ thị / lượng tử hóa int8) bằng ONNX Runtime trên CPU."""
+
+    def __init__(self, path, name="onnx", intra_op_threads=0, inter_op_threads=0):
+        import onnxruntime as ort
+        if not os.path.exists(path): raise FileNotFoundError(f"Không tìm thấy mô hình ONNX: {path} (hãy chạy export_onnx.py trước)")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads: options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads: options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.name = name; self.path = path
+        self._dtypes = {i.name: (np.int64 if i.type == "tensor(int64)" else np.int32) for i in self.session.get_inputs()}
+        self._output = self.session.get_outputs()[0].name
+
+    def logits(self, input_ids, attention_mask):
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        feeds = {name: np.asarray(feeds[name], dtype=dtype) for name, dtype in self._dtypes.items()}
+        return self.session.run([self._output], feeds)[0]
+
+
+def make_runner(backend, model, model_path, intra_op_threads=0, inter_op_threads=0, buckets=(64, 128, 256, 512),
+                pad_token_id=1, jit_compile=False):
+    """Tạo runner theo INFERENCE_BACKEND; backend ONNX đọc artifact trong <model_path>_onnx/."""
+    if backend == "tf": return TFRunner(model)
+    if backend == "tf-function": return CompiledTFRunner(model, buckets, pad_token_id, jit_compile=jit_compile)
+    if backend in ONNX_FILES:
+        return OnnxRunner(os.path.join(onnx_dir_for(model_path), ONNX_FILES[backend]), name=backend,
+                          intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+    raise ValueError(f"INFERENCE_BACKEND không hợp lệ: {backend} (chọn một trong {INFERENCE_BACKENDS})")
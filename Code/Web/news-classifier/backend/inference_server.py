@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# --- Tiến trình suy luận riêng: một bản trọng số, nhiều worker HTTP gửi yêu cầu qua kết nối cục bộ ---
+import threading
+from multiprocessing.connection import Client, Listener
+
+# Lỗi phía tiến trình suy luận được ném lại đúng kiểu ở worker (vd. KeyError = không có mô hình -> HTTP 404)
+REMOTE_ERRORS = {"KeyError": KeyError, "ValueError": ValueError}
+
+
+def parse_address(address):
+    """'127.0.0.1:6001' -> ('127.0.0.1', 6001); đường dẫn khác được dùng nguyên (AF_UNIX / named pipe)."""
+    host, sep, port = address.rpartition(":")
+    return (host, int(port)) if sep and port.isdigit() else address
+
+
+class InferenceServer:
+    """Nhận (op, args) từ các worker, gọi handlers[op](*args) và gửi lại ("ok", kết quả, thời gian các bước) hoặc ("error", thông báo).
+
+    Mỗi kết nối được phục vụ bởi một luồng riêng, nên các yêu cầu đồng thời từ nhiều worker
+    cùng đổ vào MicroBatcher của tiến trình này và được gom lô chung.
+    Với các op trong `timed_ops`, handler chạy trong `capture()` (vd. METRICS.capture) và dict thời gian các bước
+    (tokenize/forward của lô chứa yêu cầu) được gửi kèm kết quả để worker cộng vào timings của yêu cầu HTTP.
+    """
+
+    def __init__(self, address, authkey, handlers, capture=None, timed_ops=()):
+        self.address = parse_address(address); self.authkey = authkey; self.handlers = handlers
+        self.capture = capture; self.timed_ops = set(timed_ops)
+
+    def serve_forever(self):
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"✅ Tiến trình suy luận đang lắng nghe tại {self.address}")
+            while True:
+                try: conn = listener.accept()
+                except Exception as e: print(f"⚠️ Từ chối kết nối: {e}"); continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try: op, args = conn.recv()
+                except (EOFError, OSError): return
+                try:
+                    if self.capture is None or op not in self.timed_ops: conn.send(("ok", self.handlers[op](*args), None)); continue
+                    with self.capture() as timings: result = self.handlers[op](*args)
+                    conn.send(("ok", result, timings))
+                except Exception as e: conn.send(("error", (type(e).__name__, e.args[0] if len(e.args) == 1 else str(e))))
+
+
+class InferenceClient:
+    """Phía worker HTTP: mỗi luồng giữ một kết nối riêng tới tiến trình suy luận.
+
+    Mỗi phương thức tương ứng một hàm cùng tên trong model.py (predict_one, explain_top_words, resolve_model, ...)
+    và được chạy ở tiến trình suy luận. `on_timings(dict)` nhận thời gian các bước đo ở tiến trình suy luận (nếu có).
+    """
+
+    def __init__(self, address, authkey, on_timings=None):
+        self.address = parse_address(address); self.authkey = authkey; self.on_timings = on_timings
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None: conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        return conn
+
+    def call(self, op, *args):
+        try:
+            conn = self._conn(); conn.send((op, args)); status, result, *timings = conn.recv()
+        except (EOFError, OSError):
+            self._local.conn = None # Kết nối hỏng (tiến trình suy luận khởi động lại) -> kết nối lại ở lần sau
+            raise
+        if status == "error":
+            kind, message = result
+            if kind in REMOTE_ERRORS: raise REMOTE_ERRORS[kind](message)
+            raise RuntimeError(f"Tiến trình suy luận báo lỗi: {kind}: {message}")
+        if timings and timings[0] and self.on_timings is not None: self.on_timings(timings[0])
+        return result
+
+    def predict(self, text, model_name=None):
+        return self.call("predict", text, model_name)
+
+    def predict_many(self, texts, model_name=None):
+        return self.call("predict_many", list(texts), model_name)
+
+    def top_fake_words(self, text, method="shap", model_name=None, max_evals=None):
+        return self.call("explain", text, method, model_name, max_evals)
+
+    def resolve(self, name=None):
+        return self.call("resolve", name)
+
+    def set_default(self, name):
+        return self.call("set_default", name)
+
+    def models(self, refresh=False):
+        return self.call("models", refresh)
+
+    def status(self):
+        return self.call("status")
+
+
+def main():
+    """Chạy tiến trình suy luận: tải mô hình MỘT lần, warm-up rồi phục vụ các worker HTTP (gunicorn.conf.py tự khởi chạy)."""
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description="Tiến trình suy luận dùng chung cho các worker HTTP.")
+    parser.add_argument("--address", default=os.environ.get("INFERENCE_ADDRESS", "127.0.0.1:6001"))
+    args = parser.parse_args()
+    authkey = os.environ.get("INFERENCE_AUTHKEY", "")
+    if not authkey: raise SystemExit("❌ Cần đặt INFERENCE_AUTHKEY (khóa dùng chung với các worker).")
+    os.environ.pop("INFERENCE_ADDRESS", None) # Tiến trình này tự tải mô hình, không phải worker
+    import model
+    model.warmup()
+    if not model.WARMUP_STATE["ready"]: raise SystemExit(f"❌ Tiến trình suy luận không sẵn sàng: {model.WARMUP_STATE['error']}")
+    handlers = {
+        "predict": model.predict_one, # Gom lô chung cho yêu cầu từ mọi worker
+        "predict_many": model.predict_probabilities,
+        "explain": lambda text, method, model_name, max_evals: model.explain_top_words(text, method=method, model_name=model_name, max_evals=max_evals),
+        "resolve": model.resolve_model,
+        "set_default": model.set_default_model,
+        "models": model.models_stats,
+        "status": lambda: dict(model.WARMUP_STATE, model=model.resolve_model(), backend=model.INFERENCE_BACKEND, pid=os.getpid()),
+    }
+    # tokenize/forward chạy ở đây: gửi kèm kết quả dự đoán để worker đưa vào timings + /metrics của nó
+    InferenceServer(args.address, authkey.encode(), handlers, capture=model.METRICS.capture, timed_ops=("predict", "predict_many")).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# --- Hàng đợi job giải thích chạy nền (không chặn luồng xử lý /classify) ---
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Hàng đợi đã đầy -> endpoint trả về HTTP 429."""
+
+
+class JobQueue:
+    """Thread pool `workers` luồng, tối đa `max_queue` job đang chờ (chưa kể job đang chạy).
+
+    Trạng thái job: queued -> running -> done | error. Chỉ giữ lại `max_finished` job đã xong gần nhất.
+    """
+
+    def __init__(self, workers=2, max_queue=32, max_finished=1000):
+        self.workers = max(1, int(workers)); self.max_queue = max(0, int(max_queue)); self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="explain-job")
+        self._jobs = OrderedDict(); self._lock = threading.Lock()
+        self._active = 0 # queued + running
+        self.rejected = 0
+
+    def submit(self, fn, *args, on_done=None, **kwargs):
+        """Đưa job vào hàng đợi, trả về job_id. Ném QueueFullError nếu vượt quá sức chứa."""
+        with self._lock:
+            if self._active >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f"Hàng đợi giải thích đã đầy ({self._active} job đang chờ/chạy).")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {"job_id": job_id, "status": "queued", "created": time.time()}
+            self._active += 1
+        self._executor.submit(self._run, job_id, fn, args, kwargs, on_done)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs, on_done):
+        self._update(job_id, status="running", started=time.time())
+        try:
+            result = fn(*args, **kwargs)
+            self._update(job_id, status="done", result=result)
+        except Exception as e:
+            print(f"❌ Job giải thích {job_id} thất bại: {e}")
+            self._update(job_id, status="error", error=str(e)); on_done = None
+        try:
+            if on_done is not None: on_done(result) # Lỗi ở callback (vd. ghi cache) không làm hỏng kết quả đã tính xong
+        except Exception as e:
+            print(f"⚠️ Callback của job {job_id} lỗi (kết quả vẫn giữ nguyên): {e}")
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._jobs[job_id]["finished"] = time.time()
+                self._trim()
+
+    def _update(self, job_id, **fields):
+        with self._lock: self._jobs[job_id].update(fields)
+
+    def _trim(self):
+        finished = [k for k, job in self._jobs.items() if job["status"] in ("done", "error")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]: del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def is_full(self):
+        with self._lock: return self._active >= self.workers + self.max_queue
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "max_queue": self.max_queue, "active": self._active,
+                    "tracked_jobs": len(self._jobs), "rejected": self.rejected}
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# --- Nhận dạng ngôn ngữ: chỉ đọc một đoạn đầu giới hạn, kết quả tất định, chạy theo lô, cache theo hash và có độ tin cậy ---
+# Backend cắm được như translation.py:
+#   fasttext   : mô hình n-gram ký tự lid.176.ftz của fastText (pip install fasttext + tải file .ftz), nhanh và tất định,
+#                dự đoán cả lô trong một lời gọi
+#   langdetect : như trước nhưng cố định seed (DetectorFactory.seed) nên cùng văn bản luôn cho cùng kết quả
+#   auto       : fasttext nếu có gói + file mô hình, ngược lại langdetect
+import hashlib
+import re
+import threading
+
+from cache import PredictionCache
+
+SHORT_TEXT, DETECT_ERROR = "unknown_short", "unknown_error"
+WHITESPACE = re.compile(r"\s+")
+
+
+def bounded_prefix(text, max_chars):
+    """Đoạn đầu <= max_chars ký tự (cắt ở khoảng trắng), đã gộp khoảng trắng: đủ để nhận dạng ngôn ngữ của cả bài."""
+    text = WHITESPACE.sub(" ", text[:max_chars + 1]).strip()
+    if len(text) <= max_chars: return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars]
+
+
+class LanguageBackend:
+    """Giao diện backend: detect_batch(texts) -> [(mã ngôn ngữ, độ tin cậy 0..1)]."""
+    name = "base"
+
+    def detect_batch(self, texts):
+        raise NotImplementedError
+
+
+class FastTextBackend(LanguageBackend):
+    """fastText LID (lid.176.ftz/.bin): phân loại tuyến tính trên n-gram ký tự, vài chục micro-giây mỗi đoạn."""
+    name = "fasttext"
+
+    def __init__(self, model_path):
+        import fasttext
+        self.model = fasttext.load_model(model_path)
+
+    def detect_batch(self, texts):
+        labels, probabilities = self.model.predict(list(texts), k=1) # fastText không nhận ký tự xuống dòng (đã gộp ở bounded_prefix)
+        return [(label[0].replace("__label__", ""), min(1.0, float(prob[0]))) for label, prob in zip(labels, probabilities)]
+
+
+class LangdetectBackend(LanguageBackend):
+    """langdetect với seed cố định; độ tin cậy = xác suất của ngôn ngữ đứng đầu (detect_langs)."""
+    name = "langdetect"
+
+    def __init__(self, seed=0):
+        from langdetect import DetectorFactory
+        DetectorFactory.seed = seed # langdetect lấy mẫu ngẫu nhiên: không có seed thì cùng văn bản có thể cho kết quả khác
+
+    def detect_batch(self, texts):
+        from langdetect import LangDetectException, detect_langs
+        results = []
+        for text in texts:
+            try: best = detect_langs(text)[0]; results.append((best.lang, float(best.prob)))
+            except LangDetectException: results.append((DETECT_ERROR, 0.0))
+        return results
+
+
+def make_language_backend(name, fasttext_path=None, seed=0):
+    if name == "fasttext": return FastTextBackend(fasttext_path)
+    if name == "langdetect": return LangdetectBackend(seed)
+    if name == "auto":
+        try: return FastTextBackend(fasttext_path) if fasttext_path else LangdetectBackend(seed)
+        except (ImportError, ValueError, OSError) as e:
+            print(f"⚠️ Không dùng được fastText LID ({e}), dùng langdetect."); return LangdetectBackend(seed)
+    raise ValueError(f"Backend nhận dạng ngôn ngữ không hợp lệ: {name}")
+
+
+class LanguageIdentifier:
+    """Nhận dạng ngôn ngữ trên đoạn đầu `prefix_chars` ký tự, cache theo hash của đoạn đó.
+
+    detect(text) / detect_batch(texts) -> (mã ngôn ngữ, độ tin cậy); văn bản ngắn hơn `min_chars` -> ('unknown_short', 0.0),
+    backend lỗi -> ('unknown_error', 0.0). Backend được tạo lười ở lần gọi đầu (import langdetect/fasttext tốn thời gian).
+    """
+
+    def __init__(self, backend_factory, prefix_chars=1000, min_chars=15, cache_entries=8192, cache_path=None, name="langid"):
+        self._factory = backend_factory; self._backend = None; self._lock = threading.Lock()
+        self.prefix_chars = prefix_chars; self.min_chars = min_chars
+        # Ngôn ngữ của một đoạn văn không đổi theo thời gian -> không hết hạn (TTL = 0)
+        self.cache = PredictionCache(name, max_entries=cache_entries, ttl_seconds=0, disk_path=cache_path, keep_models=())
+
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None: self._backend = self._factory()
+            return self._backend
+
+    def _key(self, prefix):
+        return hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+    def detect(self, text):
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts):
+        results = [None] * len(texts); pending = {}
+        for i, text in enumerate(texts):
+            prefix = bounded_prefix(text or "", self.prefix_chars)
+            if len(prefix) < self.min_chars: results[i] = (SHORT_TEXT, 0.0); continue
+            key = self._key(prefix); cached = self.cache.get(key)
+            if cached is not None: results[i] = tuple(cached)
+            else: pending.setdefault(key, (prefix, []))[1].append(i) # Văn bản trùng trong lô chỉ nhận dạng một lần
+        if pending:
+            try: detected = self.backend.detect_batch([prefix for prefix, _ in pending.values()])
+            except Exception as e:
+                print(f"❌ Lỗi khi nhận dạng ngôn ngữ: {e}"); detected = [(DETECT_ERROR, 0.0)] * len(pending)
+            for (key, (_, rows)), (lang, confidence) in zip(pending.items(), detected):
+                if lang != DETECT_ERROR: self.cache.put(key, [lang, confidence])
+                for i in rows: results[i] = (lang, confidence)
+        return results
+
+    def stats(self):
+        return dict(self.cache.stats(), backend=self._backend.name if self._backend is not None else None, prefix_chars=self.prefix_chars)
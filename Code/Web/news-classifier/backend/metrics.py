@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# --- Đo độ trễ theo từng bước của pipeline, bộ đếm lỗi và xuất định dạng văn bản của Prometheus cho /metrics ---
+# Mỗi bước (detect, translate, preprocess, tokenize, forward, sentiment, explain, ...) được bọc bằng `with METRICS.stage(...)`:
+# chỉ tốn một perf_counter, một bisect và một lock ngắn. Thời gian được cộng vào histogram của bước đó và, nếu luồng hiện tại
+# đang trong một yêu cầu (start_request() ... end_request()), vào dict `timings` của yêu cầu đó.
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Cận trên các bucket (giây): từ tra cache (~0.1 ms) tới giải thích SHAP của bài dài (~30 s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Histogram tích lũy kiểu Prometheus + cửa sổ `window` mẫu gần nhất để tính p50/p95/p99."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=2048):
+        self.buckets = tuple(buckets); self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0; self.count = 0; self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds; self.count += 1; self.recent.append(seconds)
+
+    def quantiles(self):
+        if not self.recent: return {}
+        return dict(zip(QUANTILES, np.quantile(np.fromiter(self.recent, dtype=np.float64), QUANTILES).tolist()))
+
+
+def _sample(name, labels, value):
+    """Một dòng mẫu Prometheus: tên{nhãn="giá trị",...} giá trị (bỏ {} khi không có nhãn)."""
+    text = ",".join(f'{key}="{label}"' for key, label in labels)
+    return f"{name}{{{text}}} {value}" if text else f"{name} {value}"
+
+
+class Metrics:
+    """Histogram theo (tên, nhãn) và bộ đếm; `enabled=False` biến mọi lời gọi thành no-op."""
+
+    def __init__(self, prefix="newsclf", enabled=True, window=2048):
+        self.prefix = prefix; self.enabled = enabled; self.window = window
+        self._histograms = {}; self._counters = {}; self._lock = threading.Lock()
+        self._local = threading.local()
+        self.collectors = [] # Hàm trả về [(tên, kiểu, nhãn, giá trị)] đọc lúc scrape (vd. thống kê cache)
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled: return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None: histogram = self._histograms[key] = Histogram(window=self.window)
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled: return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock: self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """Đo một bước của pipeline; bước ném lỗi vẫn được đo và được đếm vào errors_total{stage=...}."""
+        if not self.enabled: yield; return
+        start = time.perf_counter()
+        try: yield
+        except Exception:
+            self.inc("errors_total", stage=name, **labels); raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe("stage_latency_seconds", seconds, stage=name, **labels)
+            timings = getattr(self._local, "timings", None)
+            if timings is not None: timings[name] = timings.get(name, 0.0) + seconds
+
+    def start_request(self):
+        """Bắt đầu gom thời gian các bước chạy trong luồng hiện tại (gọi ở before_request)."""
+        self._local.timings = {}; self._local.start = time.perf_counter()
+
+    def end_request(self):
+        self._local.timings = None; self._local.start = None
+
+    @contextmanager
+    def capture(self):
+        """Gom thời gian các bước chạy trong khối này vào một dict riêng (vd. tokenize/forward trên luồng micro-batcher),
+        để luồng xử lý yêu cầu cộng lại bằng merge()."""
+        previous = getattr(self._local, "timings", None); captured = self._local.timings = {}
+        try: yield captured
+        finally: self._local.timings = previous
+
+    def merge(self, timings):
+        """Cộng thời gian các bước đo ở luồng khác vào yêu cầu đang chạy trong luồng này (no-op nếu không trong yêu cầu)."""
+        current = getattr(self._local, "timings", None)
+        if current is None or not timings: return
+        for name, seconds in timings.items(): current[name] = current.get(name, 0.0) + seconds
+
+    def timings_ms(self):
+        """{bước: ms} của yêu cầu đang chạy trong luồng này, kèm "total" tính từ start_request()."""
+        timings = getattr(self._local, "timings", None) or {}
+        out = {name: round(seconds * 1000, 3) for name, seconds in timings.items()}
+        start = getattr(self._local, "start", None)
+        if start is not None: out["total"] = round((time.perf_counter() - start) * 1000, 3)
+        return out
+
+    def render(self):
+        """Toàn bộ số liệu ở định dạng văn bản của Prometheus (text/plain; version=0.0.4)."""
+        with self._lock:
+            histograms = [(name, labels, list(h.buckets), list(h.counts), h.sum, h.count, h.quantiles()) for (name, labels), h in self._histograms.items()]
+            counters = list(self._counters.items())
+        families = {}
+        for name, labels, buckets, counts, total, count, quantiles in sorted(histograms, key=lambda h: (h[0], h[1])):
+            base = f"{self.prefix}_{name}"; family = families.setdefault(base, ("histogram", []))[1]
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ["+Inf"], counts):
+                cumulative += bucket_count; family.append(_sample(f"{base}_bucket", labels + (("le", bound),), cumulative))
+            family.append(_sample(f"{base}_sum", labels, f"{total:.6f}")); family.append(_sample(f"{base}_count", labels, count))
+            # p50/p95/p99 của `window` mẫu gần nhất (histogram ở trên là tích lũy từ lúc khởi động)
+            recent = base.replace("_seconds", "_recent_seconds"); gauge = families.setdefault(recent, ("gauge", []))[1]
+            for q, value in quantiles.items(): gauge.append(_sample(recent, labels + (("quantile", q),), f"{value:.6f}"))
+        for (name, labels), value in sorted(counters):
+            families.setdefault(f"{self.prefix}_{name}", ("counter", []))[1].append(_sample(f"{self.prefix}_{name}", labels, value))
+        for collector in self.collectors:
+            try: samples = collector()
+            except Exception as e: print(f"⚠️ Không đọc được số liệu từ {getattr(collector, '__name__', collector)}: {e}"); continue
+            for name, kind, labels, value in samples:
+                if value is None: continue
+                families.setdefault(f"{self.prefix}_{name}", (kind, []))[1].append(_sample(f"{self.prefix}_{name}", sorted(labels.items()), value))
+        lines = []
+        for family, (kind, samples) in families.items():
+            lines.append(f"# TYPE {family} {kind}"); lines.extend(samples)
+        return "\n".join(lines) + "\n"
@@ -1,59 +1,152 @@
 # -*- coding: utf-8 -*-
 # --- Các thư viện cần thiết ---
-import pandas as pd
+# (shap, deep_translator, langdetect/fasttext, vaderSentiment và nltk được import lười khi thực sự cần;
+#  tensorflow/transformers chỉ được import khi tiến trình này tự tải mô hình - worker HTTP không cần)
+import time
+_IMPORT_START = time.perf_counter()
 import numpy as np
-import tensorflow as tf
 # import seaborn as sns
 # import matplotlib.pyplot as plt
 # from datetime import datetime
 # from sklearn.metrics import ...
-from transformers import RobertaTokenizer, TFRobertaForSequenceClassification
 from flask_cors import CORS
-from flask import Flask, request, jsonify
-import re
-import unicodedata
-import nltk
-from deep_translator import GoogleTranslator
-import shap
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from flask import Flask, g, request, jsonify, Response, stream_with_context
 import traceback
-from langdetect import detect, LangDetectException
+import json
+import functools
+import threading
 import os
+from batching import MicroBatcher
+from cache import PredictionCache
+from cascade import CASCADE_MODEL_FILE, load_cascade
+from explain import ExplanationEngine, EXPLAIN_METHODS
+from inference import make_runner, softmax
+from inference_server import InferenceClient
+from registry import LoadedModel, ModelRegistry
+from student import StudentExplainer, is_student, load_student
+from jobs import JobQueue, QueueFullError
+from metrics import Metrics
+from language import LanguageIdentifier, make_language_backend
+from preprocessing import preprocess_texts
+from translation import TranslationService, make_backend
+from windowing import AGGREGATIONS, aggregate_logits, special_token_layout, split_windows
+
+# --- Các thành phần phụ được tải lười ---
+@functools.lru_cache(maxsize=None)
+def get_stop_words():
+    """Danh sách stopwords tiếng Anh (tải NLTK data nếu cần)."""
+    import nltk
+    try: nltk.data.find('tokenizers/punkt'); nltk.data.find('corpora/stopwords')
+    except LookupError:
+        print("Đang tải NLTK data (có thể mất vài phút)...")
+        nltk.download('punkt', quiet=True); nltk.download('stopwords', quiet=True)
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("english"))
+
+@functools.lru_cache(maxsize=None)
+def get_sentiment_analyzer():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
 
-# --- Cài đặt NLTK (nếu cần) ---
-try: nltk.data.find('tokenizers/punkt'); nltk.data.find('corpora/stopwords')
-except nltk.downloader.DownloadError:
-    print("Đang tải NLTK data (có thể mất vài phút)...")
-    nltk.download('punkt', quiet=True); nltk.download('stopwords', quiet=True)
-from nltk.corpus import stopwords # Tạm thời không dùng stopwords
-stop_words_en = set(stopwords.words("english"))
 
 # --- Các Hằng số và Tải Mô hình ---
-MODEL_BASE_PATH = "D:/LuanVan/FakeNews/Code/Web/news-classifier/backend/Model/"
-MODEL_NAME = "RoBERTa_pretrained_20250405_171143"
-TOKENIZER_NAME = "RoBERTa_token_pretrained_20250405_171143"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Thư mục chứa checkpoint (phân tách bằng os.pathsep); registry tự tìm các cặp <Arch>_pretrained_<stamp> / <Arch>_token_pretrained_<stamp>
+MODEL_DIRS = [d for d in os.environ.get("MODEL_DIRS", os.pathsep.join([os.path.join(BACKEND_DIR, "Model"), BACKEND_DIR])).split(os.pathsep) if d]
+MODEL_NAME = os.environ.get("DEFAULT_MODEL", "RoBERTa_pretrained_20250405_171143") # Mô hình mặc định khi yêu cầu không chỉ định 'model'
 # 20250305_162139 íot
 # 20250405_171143 fakedetecnews
-MODEL_PATH = os.path.join(MODEL_BASE_PATH, MODEL_NAME)
-TOKENIZER_PATH = os.path.join(MODEL_BASE_PATH, TOKENIZER_NAME)
+MAX_RESIDENT_MODELS = int(os.environ.get("MAX_RESIDENT_MODELS", 2)) # Số mô hình tối đa nằm trong bộ nhớ cùng lúc (LRU)
 
 MAX_LEN_PREDICT = 512
+# Backend suy luận: tf-function (tf.function biên dịch sẵn theo bucket) | tf (eager) | onnx | onnx-int8
+# (artifact ONNX do export_onnx.py tạo trong <thư mục checkpoint>_onnx/)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "tf-function")
+TF_XLA_JIT = os.environ.get("TF_XLA_JIT", "0") == "1" # Biên dịch XLA cho các tf.function phục vụ
+# Số luồng cho mỗi tiến trình chạy mô hình (0 = để TF/ONNX Runtime tự chọn theo số nhân CPU)
+TF_INTRA_OP_THREADS = int(os.environ.get("TF_INTRA_OP_THREADS", 0))
+TF_INTER_OP_THREADS = int(os.environ.get("TF_INTER_OP_THREADS", 0))
+# Chế độ nhiều worker (gunicorn.conf.py): trọng số chỉ nằm trong MỘT tiến trình suy luận (inference_server.py),
+# các worker HTTP không tải mô hình mà gửi yêu cầu tới địa chỉ này. Rỗng = tự tải mô hình (python model.py)
+INFERENCE_ADDRESS = os.environ.get("INFERENCE_ADDRESS", "")
+INFERENCE_AUTHKEY = os.environ.get("INFERENCE_AUTHKEY", "")
 SHAP_MAX_LEN = 256
-
-print("--- Tải Mô hình và Tokenizer ---")
-print("🔄 Đang tải mô hình vào bộ nhớ cache...")
-# ... (Phần try...except để load model giữ nguyên như trước) ...
-try:
-    if not os.path.exists(MODEL_PATH) or not os.path.exists(TOKENIZER_PATH):
-         raise FileNotFoundError(f"Không tìm thấy mô hình hoặc tokenizer tại đường dẫn: {MODEL_BASE_PATH}")
-    MODEL = TFRobertaForSequenceClassification.from_pretrained(MODEL_PATH)
-    TOKENIZER = RobertaTokenizer.from_pretrained(TOKENIZER_PATH)
-    print(f"✅ Mô hình từ '{MODEL_NAME}' và Tokenizer từ '{TOKENIZER_NAME}' đã tải thành công!")
-except FileNotFoundError as fnf_error:
-    print(f"❌ Lỗi nghiêm trọng: {fnf_error}"); MODEL = None; TOKENIZER = None
-except Exception as e:
-    print(f"❌ Lỗi không xác định khi tải mô hình: {e}"); MODEL = None; TOKENIZER = None
-print("--- Tải Mô hình và Tokenizer Hoàn tất ---")
+SHAP_MAX_EVALS = int(os.environ.get("SHAP_MAX_EVALS", 200)) # Ngân sách số lượt đánh giá của SHAP cho mỗi yêu cầu
+EXPLAIN_BATCH_SIZE = int(os.environ.get("EXPLAIN_BATCH_SIZE", 16)) # Số văn bản bị che chạy chung một lượt forward
+EXPLAIN_METHOD = os.environ.get("EXPLAIN_METHOD", "shap") # Mặc định khi yêu cầu không chỉ định 'explain_method'
+# Giải thích chạy nền: /classify trả kết quả ngay kèm job id, kết quả lấy qua /explain/<job_id>
+EXPLAIN_ASYNC = os.environ.get("EXPLAIN_ASYNC", "1") == "1" # Mặc định khi yêu cầu không chỉ định 'explain_async'
+EXPLAIN_WORKERS = int(os.environ.get("EXPLAIN_WORKERS", 2))
+EXPLAIN_QUEUE_SIZE = int(os.environ.get("EXPLAIN_QUEUE_SIZE", 32)) # Vượt quá -> HTTP 429
+
+# Gom lô động: chờ tối đa BATCH_MAX_WAIT_MS để gom tối đa BATCH_MAX_SIZE yêu cầu vào một lượt forward
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 16))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 5))
+# Bài dài hơn một cửa sổ (MAX_LEN_PREDICT token): chia thành các cửa sổ chồng lấn LONG_DOC_OVERLAP token, chạy chung một lượt
+# forward rồi gộp logits theo LONG_DOC_AGGREGATION = mean | max | attention (rỗng = cắt cụt ở cửa sổ đầu như trước).
+# Tối đa LONG_DOC_MAX_WINDOWS cửa sổ mỗi bài để chặn độ trễ của bài cực dài
+LONG_DOC_AGGREGATION = os.environ.get("LONG_DOC_AGGREGATION", "mean")
+LONG_DOC_OVERLAP = int(os.environ.get("LONG_DOC_OVERLAP", 128))
+LONG_DOC_MAX_WINDOWS = int(os.environ.get("LONG_DOC_MAX_WINDOWS", 8))
+if LONG_DOC_AGGREGATION and LONG_DOC_AGGREGATION not in AGGREGATIONS:
+    raise ValueError(f"LONG_DOC_AGGREGATION không hợp lệ: {LONG_DOC_AGGREGATION} (chọn một trong {AGGREGATIONS} hoặc để rỗng)")
+# Bucket độ dài (token): văn bản được nhóm theo bucket và chỉ pad tới câu dài nhất trong nhóm
+LENGTH_BUCKETS = (64, 128, 256, MAX_LEN_PREDICT)
+
+# Cache dự đoán: khóa theo hash văn bản + MODEL_NAME + cờ explain; CACHE_DB_PATH rỗng = chỉ cache trong bộ nhớ
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 1024))
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", 3600)) # 0 = không hết hạn
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", "")
+
+# Dịch: TRANSLATION_BACKEND = google | dictionary (từ điển JSON ngoại tuyến) | identity (không dịch)
+TRANSLATION_BACKEND = os.environ.get("TRANSLATION_BACKEND", "google")
+TRANSLATION_DICT_PATH = os.environ.get("TRANSLATION_DICT_PATH", "")
+TRANSLATION_CHUNK_CHARS = int(os.environ.get("TRANSLATION_CHUNK_CHARS", 1500)) # Bài dài được dịch theo đoạn thay vì cắt cụt
+TRANSLATION_MAX_CHARS = int(os.environ.get("TRANSLATION_MAX_CHARS", 20000))
+TRANSLATION_CACHE_PATH = os.environ.get("TRANSLATION_CACHE_PATH", os.path.join(BACKEND_DIR, "cache", "translations.sqlite"))
+
+# Cascade: tầng TF-IDF/LR (tune_cascade.py) trả lời bài nó chắc chắn, chỉ bài có P(Fake) trong dải bất định mới chạy mô hình lớn.
+# Yêu cầu có explain (giải thích cần mô hình lớn) hoặc "cascade": false luôn đi thẳng tới mô hình lớn
+CASCADE_ENABLED = os.environ.get("CASCADE", "0") == "1"
+CASCADE_PATH = os.environ.get("CASCADE_PATH", os.path.join(BACKEND_DIR, "Model", "cascade", CASCADE_MODEL_FILE))
+CASCADE_LOWER = os.environ.get("CASCADE_LOWER", "") # Rỗng = dải đã chọn bởi tune_cascade.py
+CASCADE_UPPER = os.environ.get("CASCADE_UPPER", "")
+
+# Nhận dạng ngôn ngữ (language.py): LANGID_BACKEND = auto | fasttext | langdetect; chỉ đọc LANGID_PREFIX_CHARS ký tự đầu,
+# kết quả cache theo hash. Độ tin cậy < LANGID_MIN_CONFIDENCE -> không dịch (xử lý như tiếng Anh)
+LANGID_BACKEND = os.environ.get("LANGID_BACKEND", "auto")
+LANGID_FASTTEXT_PATH = os.environ.get("LANGID_FASTTEXT_PATH", os.path.join(BACKEND_DIR, "Model", "lid.176.ftz"))
+LANGID_SEED = int(os.environ.get("LANGID_SEED", 0))
+LANGID_PREFIX_CHARS = int(os.environ.get("LANGID_PREFIX_CHARS", 1000))
+LANGID_MIN_CONFIDENCE = float(os.environ.get("LANGID_MIN_CONFIDENCE", 0.5))
+LANGID_CACHE_ENTRIES = int(os.environ.get("LANGID_CACHE_ENTRIES", 8192))
+
+# Số liệu (/metrics, định dạng Prometheus): histogram độ trễ theo từng bước + bộ đếm lỗi/cache. METRICS_ENABLED=0 tắt đo.
+# Phản hồi của /classify kèm `timings` (ms theo bước) khi yêu cầu có "timings": true hoặc RESPONSE_TIMINGS=1
+# (`predict` gồm thời gian chờ gom lô; `tokenize`/`forward` là thời gian của cả micro-batch chứa bài đó)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+RESPONSE_TIMINGS = os.environ.get("RESPONSE_TIMINGS", "0") == "1"
+METRICS_WINDOW = int(os.environ.get("METRICS_WINDOW", 2048)) # Số mẫu gần nhất dùng để tính p50/p95/p99
+
+# /classify/batch: số bài được dự đoán chung một lượt forward trước khi stream kết quả ra
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", 32))
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+# Tầng 1 rẻ (sklearn) nên mỗi worker HTTP tự giữ một bản: bài trả lời được không cần đi tới tiến trình suy luận
+CASCADE = load_cascade(CASCADE_PATH, float(CASCADE_LOWER) if CASCADE_LOWER else None, float(CASCADE_UPPER) if CASCADE_UPPER else None) if CASCADE_ENABLED else None
+
+METRICS = Metrics(enabled=METRICS_ENABLED, window=METRICS_WINDOW)
+
+def merge_remote_timings(timings):
+    """tokenize/forward đo ở tiến trình suy luận (chế độ nhiều worker): cộng vào timings của yêu cầu đang chạy và vào histogram
+    của worker, nhãn process="inference" (mỗi yêu cầu ghi thời gian của lô chứa nó, không phải một lần cho mỗi lô)."""
+    METRICS.merge(timings)
+    for name, seconds in timings.items(): METRICS.observe("stage_latency_seconds", seconds, stage=name, process="inference")
+
+INFERENCE_CLIENT = None
+if INFERENCE_ADDRESS:
+    INFERENCE_CLIENT = InferenceClient(INFERENCE_ADDRESS, INFERENCE_AUTHKEY.encode(), on_timings=merge_remote_timings)
+    print(f"🔗 Worker HTTP (pid {os.getpid()}): dùng tiến trình suy luận tại {INFERENCE_ADDRESS}, không tải mô hình.")
 
 
 # --- Các Hàm Hỗ trợ ---
@@ -63,150 +156,334 @@ def preprocess_text(text):
         print("⚠️ Văn bản đầu vào rỗng hoặc không hợp lệ cho tiền xử lý.")
         return ""
     try:
-        text = text.lower() # Chuyển thành chữ thường
-        text = unicodedata.normalize("NFKC", text) # Chuẩn hóa Unicode
-        text = re.sub(r"https?://\S+|www\.\S+", "", text) # Xóa URL
-        text = re.sub(r"<.*?>+", "", text) # Xóa thẻ HTML (nếu có)
-        # Giữ lại chữ cái, số, khoảng trắng và một số dấu câu cơ bản
-        text = re.sub(r"[^\w\s.,!?']", "", text)
-        text = re.sub(r"\s+", " ", text).strip() # Chuẩn hóa khoảng trắng
-
-        # !!! BỎ COMMENT ĐỂ XÓA STOPWORDS !!!
-        words = text.split()
-        # Lọc bỏ các từ trong danh sách stop_words_en đã định nghĩa ở đầu file
-        filtered_words = [word for word in words if word not in stop_words_en]
-        # Nối các từ còn lại thành chuỗi mới
-        text = " ".join(filtered_words)
-
-        # !!! TRẢ VỀ TEXT ĐÃ LỌC STOPWORDS !!!
-        return text
+        return preprocess_texts([text], get_stop_words())[0]
     except Exception as e:
         print(f"❌ Lỗi trong hàm preprocess_text: {e}")
         return "" # Trả về chuỗi rỗng nếu có lỗi
 
+TRANSLATOR = TranslationService(make_backend(TRANSLATION_BACKEND, TRANSLATION_DICT_PATH or None), chunk_chars=TRANSLATION_CHUNK_CHARS,
+                                max_chars=TRANSLATION_MAX_CHARS, cache_path=TRANSLATION_CACHE_PATH or None)
+
 def translate_text(text, src_lang="auto", target_lang="en"):
-    """Dịch văn bản sử dụng GoogleTranslator."""
+    """Dịch văn bản qua TRANSLATOR (có cache, gộp yêu cầu trùng, dịch bài dài theo đoạn)."""
     if not text or not isinstance(text, str) or not text.strip(): return text
-    max_translate_len = 1500; text_to_translate = text[:max_translate_len]
     try:
-        translated = GoogleTranslator(source=src_lang, target=target_lang).translate(text_to_translate)
+        translated = TRANSLATOR.translate(text, src_lang=src_lang, target_lang=target_lang)
         return translated if translated and isinstance(translated, str) and translated.strip() else text
-    except Exception as e: print(f"❌ Lỗi khi dịch từ '{src_lang}' sang '{target_lang}': {e}"); return text
+    except Exception as e:
+        print(f"❌ Lỗi khi dịch từ '{src_lang}' sang '{target_lang}': {e}"); METRICS.inc("errors_total", stage="translate"); return text
 
-analyzer = SentimentIntensityAnalyzer()
+def translate_texts(texts, src_lang, target_lang="en"):
+    """Dịch cả lô văn bản cùng ngôn ngữ nguồn; bản dịch lỗi/rỗng được thay bằng văn bản gốc."""
+    try: translated = TRANSLATOR.translate_batch(texts, src_lang=src_lang, target_lang=target_lang)
+    except Exception as e:
+        print(f"⚠️ Dịch lô từ '{src_lang}' thất bại ({e}), dịch từng bài."); return [translate_text(t, src_lang, target_lang) for t in texts]
+    return [out if out and isinstance(out, str) and out.strip() else text for text, out in zip(texts, translated)]
+
+LANGUAGE_ID = LanguageIdentifier(lambda: make_language_backend(LANGID_BACKEND, LANGID_FASTTEXT_PATH, LANGID_SEED),
+                                 prefix_chars=LANGID_PREFIX_CHARS, cache_entries=LANGID_CACHE_ENTRIES)
+
+def detect_language(original_text):
+    """(ngôn ngữ, độ tin cậy); văn bản quá ngắn -> 'unknown_short', không phát hiện được -> 'unknown_error'."""
+    return LANGUAGE_ID.detect(original_text)
+
+def needs_translation(detected_lang, confidence=1.0):
+    """Chỉ dịch khi chắc chắn văn bản không phải tiếng Anh: nhận dạng kém tin cậy thì giữ nguyên văn bản gốc."""
+    return detected_lang not in ('en', 'unknown_short', 'unknown_error') and confidence >= LANGID_MIN_CONFIDENCE
+
+def detect_and_translate(original_text):
+    """Phát hiện ngôn ngữ và dịch sang tiếng Anh nếu cần. Trả về (detected_lang, text_to_process)."""
+    with METRICS.stage("detect"): (detected_lang, confidence), text_to_process = detect_language(original_text), original_text
+    if detected_lang == 'unknown_error': METRICS.inc("errors_total", stage="detect")
+    print(f"🔍 Ngôn ngữ phát hiện (hoặc giả định): '{detected_lang}' (độ tin cậy {confidence:.2f})")
+    if needs_translation(detected_lang, confidence):
+        print(f"🔄 Đang dịch từ '{detected_lang}' sang 'en'...")
+        with METRICS.stage("translate"): translated = translate_text(original_text, src_lang=detected_lang, target_lang='en')
+        if translated != original_text and translated.strip(): text_to_process = translated; print(f"✅ Đã dịch sang tiếng Anh: '{text_to_process[:100]}...'")
+        else: print(f"⚠️ Dịch không thành công hoặc kết quả rỗng, tiếp tục xử lý bằng văn bản gốc.")
+    return detected_lang, text_to_process
+
+def build_response(original_text, text_to_process, detected_lang, probabilities, sentiment_score, top_words, model_name=None, answered_by=None):
+    """Tạo dict kết quả JSON chung cho /classify và /classify/batch."""
+    response = {
+        "original_text": original_text,
+        "processed_english_text": text_to_process,
+        "detected_language": detected_lang,
+        "real_probability": round(float(probabilities[1] * 100), 2),
+        "fake_probability": round(float(probabilities[0] * 100), 2),
+        "sentiment_score": round(sentiment_score, 4),
+        "top_fake_words": top_words, # Luôn là list tiếng Anh
+        "model": model_name, # Mô hình đã phục vụ yêu cầu
+    }
+    if answered_by is not None: response["answered_by"] = answered_by # Chế độ cascade: tầng 1 hay mô hình lớn đã trả lời
+    return response
+
+def bucket_for_length(num_tokens):
+    """Trả về bucket nhỏ nhất chứa được num_tokens token."""
+    for bucket in LENGTH_BUCKETS:
+        if num_tokens <= bucket: return bucket
+    return LENGTH_BUCKETS[-1]
+
+def predict_probabilities(texts, model=None):
+    """Chạy forward cho cả lô văn bản đã tiền xử lý, trả về xác suất softmax (n, 2).
+
+    `model`: LoadedModel, tên mô hình trong registry, hoặc None (mô hình mặc định).
+    Không pad cố định 512 nữa: các văn bản được nhóm theo bucket độ dài và mỗi nhóm
+    chỉ pad tới câu dài nhất của nhóm, nên tiêu đề ngắn không tốn chi phí attention của cả bài báo.
+    Bài dài hơn một cửa sổ (khi bật LONG_DOC_AGGREGATION) thành nhiều hàng chạy chung lượt forward với cả lô;
+    logits các cửa sổ của cùng bài được gộp lại trước softmax.
+    """
+    if INFERENCE_CLIENT is not None: return np.asarray(INFERENCE_CLIENT.predict_many(texts, model))
+    if not isinstance(model, LoadedModel):
+        with REGISTRY.use(model) as bundle: return predict_probabilities(texts, bundle)
+    tokenizer = model.tokenizer
+    window = min(MAX_LEN_PREDICT, getattr(tokenizer, 'model_max_length', MAX_LEN_PREDICT))
+    long_docs = bool(LONG_DOC_AGGREGATION) and LONG_DOC_MAX_WINDOWS > 1
+    if long_docs: # Đủ token cho tối đa LONG_DOC_MAX_WINDOWS cửa sổ, phần sau bị cắt như trước
+        front, back = special_token_layout(tokenizer); max_tokens = window + (LONG_DOC_MAX_WINDOWS - 1) * max(1, window - front - back - LONG_DOC_OVERLAP)
+    else: max_tokens = window
+    with METRICS.stage("tokenize"):
+        encoded = tokenizer(list(texts), truncation=True, max_length=max_tokens)['input_ids']
+        rows_ids = []; owners = [] # Mỗi hàng của lượt forward thuộc về bài nào
+        for i, ids in enumerate(encoded):
+            for window_ids in (split_windows(ids, tokenizer, window, LONG_DOC_OVERLAP) if long_docs else [ids]):
+                rows_ids.append(window_ids); owners.append(i)
+    logits = np.zeros((len(rows_ids), model.model.config.num_labels), dtype=np.float32)
+    groups = {}
+    for row, ids in enumerate(rows_ids): groups.setdefault(bucket_for_length(len(ids)), []).append(row)
+    for bucket, rows in groups.items():
+        inputs = tokenizer.pad({'input_ids': [rows_ids[row] for row in rows]}, padding='longest', return_tensors='np')
+        with METRICS.stage("forward", bucket=bucket): logits[rows] = model.runner.logits(inputs['input_ids'], inputs['attention_mask'])
+    if len(rows_ids) == len(texts): return softmax(logits) # Không bài nào dài hơn một cửa sổ: đường nhanh
+    owners = np.asarray(owners)
+    return softmax(np.stack([aggregate_logits(logits[owners == i], LONG_DOC_AGGREGATION) for i in range(len(texts))]))
+
+def load_model_bundle(spec):
+    """Loader của REGISTRY: tải checkpoint + tokenizer và dựng runner, micro-batcher, explainer riêng cho mô hình đó."""
+    if is_student(spec.model_path): # Học trò BiLSTM/BiGRU do distill.py tạo: không cần transformers
+        model, tokenizer, runner = load_student(spec.model_path, spec.tokenizer_path)
+        bundle = LoadedModel(spec, model, tokenizer, runner)
+        bundle.batcher = MicroBatcher(lambda texts: predict_probabilities(texts, bundle), max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, capture=METRICS.capture)
+        bundle.explainer = StudentExplainer(tokenizer, runner, max_evals=SHAP_MAX_EVALS, batch_size=EXPLAIN_BATCH_SIZE)
+        return bundle
+    from transformers import RobertaTokenizer, TFRobertaForSequenceClassification
+    model = TFRobertaForSequenceClassification.from_pretrained(spec.model_path)
+    tokenizer = RobertaTokenizer.from_pretrained(spec.tokenizer_path)
+    try:
+        runner = make_runner(INFERENCE_BACKEND, model, spec.model_path, intra_op_threads=TF_INTRA_OP_THREADS, inter_op_threads=TF_INTER_OP_THREADS,
+                             buckets=LENGTH_BUCKETS, pad_token_id=tokenizer.pad_token_id, jit_compile=TF_XLA_JIT)
+        print(f"✅ Backend suy luận của '{spec.name}': '{runner.name}'")
+    except Exception as e:
+        print(f"❌ Không khởi tạo được backend '{INFERENCE_BACKEND}' ({e}), dùng TensorFlow."); runner = make_runner("tf", model, spec.model_path)
+    bundle = LoadedModel(spec, model, tokenizer, runner)
+    bundle.batcher = MicroBatcher(lambda texts: predict_probabilities(texts, bundle), max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, capture=METRICS.capture)
+    bundle.explainer = ExplanationEngine(model, tokenizer, runner=runner, max_len=SHAP_MAX_LEN, max_evals=SHAP_MAX_EVALS, batch_size=EXPLAIN_BATCH_SIZE)
+    return bundle
+
+REGISTRY = None
+if INFERENCE_CLIENT is None:
+    print("--- Tải Mô hình và Tokenizer ---")
+    print("🔄 Đang tải mô hình vào bộ nhớ cache...")
+    try:
+        import tensorflow as tf
+        # Phải đặt trước khi TF khởi tạo runtime (tức là trước khi tải mô hình)
+        if TF_INTRA_OP_THREADS: tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+        if TF_INTER_OP_THREADS: tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+        REGISTRY = ModelRegistry(MODEL_DIRS, load_model_bundle, default=MODEL_NAME, max_resident=MAX_RESIDENT_MODELS)
+        if REGISTRY.default_name is None: raise FileNotFoundError(f"Không tìm thấy mô hình hoặc tokenizer trong: {MODEL_DIRS}")
+        print(f"📚 Mô hình có sẵn: {sorted(REGISTRY.specs)}")
+        with REGISTRY.use(): pass # Mô hình mặc định được tải ngay lúc khởi động, các mô hình khác tải khi có yêu cầu
+    except FileNotFoundError as fnf_error:
+        print(f"❌ Lỗi nghiêm trọng: {fnf_error}"); REGISTRY = None
+    except Exception as e:
+        print(f"❌ Lỗi không xác định khi tải mô hình: {e}"); REGISTRY = None
+    print("--- Tải Mô hình và Tokenizer Hoàn tất ---")
+
+def model_available():
+    """Tiến trình này phục vụ được dự đoán: tự giữ registry mô hình hoặc nối tới tiến trình suy luận."""
+    return INFERENCE_CLIENT is not None or REGISTRY is not None
+
+def resolve_model(name=None):
+    """Tên mô hình sẽ phục vụ yêu cầu (None = mô hình mặc định hiện tại); KeyError nếu không tồn tại."""
+    return INFERENCE_CLIENT.resolve(name) if INFERENCE_CLIENT is not None else REGISTRY.resolve(name)
+
+def predict_one(text, model_name=None):
+    """Dự đoán một văn bản qua micro-batcher của mô hình (gom lô cùng các yêu cầu đồng thời khác)."""
+    if INFERENCE_CLIENT is not None: return INFERENCE_CLIENT.predict(text, model_name)
+    with REGISTRY.use(model_name) as bundle:
+        future = bundle.batcher.submit(text); probabilities = future.result()
+    METRICS.merge(getattr(future, "stage_timings", None)) # tokenize/forward chạy trên luồng micro-batcher: cộng vào timings của yêu cầu này
+    return probabilities
+
+def use_cascade(explain=False, requested=True):
+    return CASCADE is not None and not explain and requested is not False
+
+def cascade_cache_model(model_name, explain=False, requested=True):
+    """Tên dùng trong khóa cache: kết quả qua cascade (phụ thuộc dải) không lẫn với kết quả của riêng mô hình lớn."""
+    return f"{model_name}|{CASCADE.name}:{CASCADE.lower:g}-{CASCADE.upper:g}" if use_cascade(explain, requested) else model_name
+
+def predict_one_cascade(text, model_name=None, enabled=True):
+    """(xác suất, tầng đã trả lời) cho một văn bản: tầng 1 nếu nó chắc chắn, ngược lại predict_one() qua mô hình lớn."""
+    if enabled and CASCADE is not None:
+        with METRICS.stage("cascade"): probabilities, confident = CASCADE.route([text])
+        if confident[0]: return probabilities[0], CASCADE.name
+    with METRICS.stage("predict"): return predict_one(text, model_name), model_name # predict = chờ gom lô + tokenize + forward của cả lô (hai bước sau cũng có riêng trong timings)
+
+def predict_many_cascade(texts, model_name=None, enabled=True):
+    """Như predict_one_cascade() cho cả lô: chỉ các bài tầng 1 không chắc chắn đi chung một lượt forward của mô hình lớn."""
+    if not enabled or CASCADE is None: return predict_probabilities(texts, model_name), [model_name] * len(texts)
+    probabilities, confident = CASCADE.route(texts)
+    escalate = np.flatnonzero(~confident)
+    if escalate.size: probabilities[escalate] = predict_probabilities([texts[i] for i in escalate], model_name)
+    return probabilities, [CASCADE.name if c else model_name for c in confident]
+
+def explain_top_words(text, method="shap", model_name=None, max_evals=None):
+    """Top từ làm tăng xác suất Fake theo mô hình `model_name`; mô hình được giữ lại cho tới khi giải thích xong."""
+    with METRICS.stage("explain", method=method):
+        if INFERENCE_CLIENT is not None: return INFERENCE_CLIENT.top_fake_words(text, method=method, model_name=model_name, max_evals=max_evals)
+        with REGISTRY.use(model_name) as bundle: return bundle.explainer.top_fake_words(text, method=method, max_evals=max_evals)
+
+def warmup_model(bundle):
+    """Biên dịch/chạy thử mọi shape phục vụ của một mô hình; trả về thời gian biên dịch theo bucket."""
+    if hasattr(bundle.runner, "warmup"): return bundle.runner.warmup(batch_sizes=(1, BATCH_MAX_SIZE))
+    for bucket in LENGTH_BUCKETS: # Backend không biên dịch trước: vẫn chạy thử từng bucket để khởi tạo kernel
+        ids = np.full((1, bucket), bundle.tokenizer.pad_token_id, dtype=np.int32); ids[0, 0] = bundle.tokenizer.cls_token_id
+        bundle.runner.logits(ids, np.ones((1, bucket), dtype=np.int32))
+    return {}
+
+def set_default_model(name):
+    """Hot-swap: tải + warm-up mô hình mới rồi mới đổi mặc định; trả về tên mô hình mặc định trước đó."""
+    if INFERENCE_CLIENT is not None: return INFERENCE_CLIENT.set_default(name)
+    return REGISTRY.set_default(name, warmup=warmup_model)
+
+def models_stats(refresh=False):
+    if INFERENCE_CLIENT is not None: return INFERENCE_CLIENT.models(refresh)
+    if refresh: REGISTRY.refresh()
+    return REGISTRY.stats()
+
+MODEL_ALIASES = {"MODEL": lambda b: b.model, "TOKENIZER": lambda b: b.tokenizer, "RUNNER": lambda b: b.runner,
+                 "BATCHER": lambda b: b.batcher, "EXPLAINER": lambda b: b.explainer, "MODEL_PATH": lambda b: b.spec.model_path}
+
+def __getattr__(name):
+    """model.MODEL / TOKENIZER / RUNNER / BATCHER / EXPLAINER / MODEL_PATH: của mô hình mặc định HIỆN TẠI (dùng trong các script benchmark)."""
+    if name not in MODEL_ALIASES: raise AttributeError(f"module 'model' has no attribute '{name}'")
+    if REGISTRY is None: return None
+    with REGISTRY.use() as bundle: return MODEL_ALIASES[name](bundle)
+
+EXPLAIN_JOBS = JobQueue(workers=EXPLAIN_WORKERS, max_queue=EXPLAIN_QUEUE_SIZE)
+
+# Khóa cache gồm tên mô hình phục vụ yêu cầu; tiến trình tự giữ registry xóa mục của checkpoint không còn trên đĩa
+PREDICTION_CACHE = PredictionCache(MODEL_NAME, max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS, disk_path=CACHE_DB_PATH or None,
+                                   keep_models=list(REGISTRY.specs) if REGISTRY is not None else None)
 
 # --- Khởi tạo Flask App ---
 app = Flask(__name__)
 CORS(app)
 
+# --- Đo độ trễ và đếm yêu cầu theo endpoint ---
+@app.before_request
+def start_request_timer():
+    METRICS.start_request()
+
+def record_request(endpoint, status):
+    """Ghi độ trễ (tính từ start_request) + trạng thái của yêu cầu đang chạy trong luồng này rồi dừng đo."""
+    timings = METRICS.timings_ms()
+    if "total" in timings and endpoint != 'metrics':
+        METRICS.observe("request_latency_seconds", timings["total"] / 1000, endpoint=endpoint)
+        METRICS.inc("requests_total", endpoint=endpoint, status=status)
+    METRICS.end_request()
+
+@app.after_request
+def remember_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def end_request_timer(exc):
+    # Yêu cầu stream (/classify/batch) tự ghi ở cuối generate(): teardown này chạy trước khi gửi byte đầu tiên
+    if g.get("streaming"): return
+    record_request(request.endpoint or "unknown", 500 if exc is not None else g.get("response_status", 500))
+
+def cache_metrics():
+    """Bộ đếm của các cache và của cascade, đọc lúc scrape /metrics."""
+    samples = []
+    for cache, stats in (("prediction", PREDICTION_CACHE.stats()), ("translation", TRANSLATOR.stats()), ("language", LANGUAGE_ID.stats())):
+        samples += [("cache_hits_total", "counter", {"cache": cache, "tier": "memory"}, stats["hits"]),
+                    ("cache_hits_total", "counter", {"cache": cache, "tier": "disk"}, stats["disk_hits"]),
+                    ("cache_misses_total", "counter", {"cache": cache}, stats["misses"]),
+                    ("cache_entries", "gauge", {"cache": cache}, stats["entries"])]
+    if CASCADE is not None:
+        stats = CASCADE.stats()
+        samples += [("cascade_articles_total", "counter", {"answered_by": "stage1"}, stats["answered"]),
+                    ("cascade_articles_total", "counter", {"answered_by": "model"}, stats["escalated"])]
+    explain = EXPLAIN_JOBS.stats()
+    samples += [("explain_jobs_active", "gauge", {}, explain["active"]), ("explain_jobs_rejected_total", "counter", {}, explain["rejected"])]
+    return samples
+
+METRICS.collectors.append(cache_metrics)
+
 # --- Định nghĩa API Endpoint ---
 @app.route('/classify', methods=['POST'])
 def classify_text():
     """API endpoint chính để phân loại tin tức."""
-    if MODEL is None or TOKENIZER is None: return jsonify({"error": "Lỗi Server: Mô hình chưa được tải thành công!"}), 503
+    if not model_available(): return jsonify({"error": "Lỗi Server: Mô hình chưa được tải thành công!"}), 503
 
     try:
         data = request.get_json(); original_text = data.get('text', ''); explain_flag = data.get('explain', False)
+        explain_method = data.get('explain_method', EXPLAIN_METHOD)
+        explain_async = bool(data.get('explain_async', EXPLAIN_ASYNC)); cascade_requested = data.get('cascade', True)
+        include_timings = bool(data.get('timings', RESPONSE_TIMINGS))
+        if explain_flag and explain_method not in EXPLAIN_METHODS: return jsonify({"error": f"Lỗi: explain_method phải là một trong {list(EXPLAIN_METHODS)}."}), 400
         print(f"\n--- Yêu cầu mới ---"); print(f"📥 Đã nhận: Explain={explain_flag}, Text='{original_text[:100]}...'")
         if not original_text or not isinstance(original_text, str) or not original_text.strip(): return jsonify({"error": "Lỗi: Văn bản đầu vào không hợp lệ hoặc bị rỗng."}), 400
     except Exception as e: return jsonify({"error": f"Lỗi định dạng yêu cầu: {str(e)}"}), 400
+    # Chốt tên mô hình ngay từ đầu: hot-swap giữa chừng không làm yêu cầu này đổi mô hình
+    try: model_name = resolve_model(data.get('model'))
+    except KeyError as e: return jsonify({"error": f"Lỗi: {e.args[0]}"}), 404
 
-    detected_lang = 'en'; text_to_process = original_text
-    try:
-        min_len_detect = 15
-        if len(original_text) >= min_len_detect: detected_lang = detect(original_text)
-        else: detected_lang = 'unknown_short'
-        print(f"🔍 Ngôn ngữ phát hiện (hoặc giả định): '{detected_lang}'")
-        if detected_lang != 'en' and detected_lang != 'unknown_short':
-            print(f"🔄 Đang dịch từ '{detected_lang}' sang 'en'...")
-            translated = translate_text(original_text, src_lang=detected_lang, target_lang='en')
-            if translated != original_text and translated.strip(): text_to_process = translated; print(f"✅ Đã dịch sang tiếng Anh: '{text_to_process[:100]}...'")
-            else: print(f"⚠️ Dịch không thành công hoặc kết quả rỗng, tiếp tục xử lý bằng văn bản gốc.")
-    except LangDetectException: print("⚠️ Không thể phát hiện ngôn ngữ, giả định là tiếng Anh."); detected_lang = 'unknown_error'
-    except Exception as e: print(f"❌ Lỗi trong quá trình xử lý ngôn ngữ: {e}")
+    cascade_on = use_cascade(explain_flag, cascade_requested)
+    cache_key = PREDICTION_CACHE.key(original_text, explain_method if explain_flag else False, model_name=cascade_cache_model(model_name, explain_flag, cascade_requested))
+    with METRICS.stage("cache"): cached = PREDICTION_CACHE.get(cache_key)
+    if cached is not None:
+        print("⚡ Trúng cache, trả về kết quả đã lưu.")
+        return jsonify(dict(cached, original_text=original_text, **({"timings": METRICS.timings_ms()} if include_timings else {})))
+    if explain_flag and explain_async and EXPLAIN_JOBS.is_full():
+        print("⚠️ Hàng đợi giải thích đã đầy, từ chối yêu cầu."); return jsonify({"error": "Lỗi: Server đang quá tải yêu cầu giải thích, vui lòng thử lại sau."}), 429, {"Retry-After": "5"}
+
+    detected_lang, text_to_process = detect_and_translate(original_text)
 
     print("⚙️ Tiền xử lý văn bản...")
-    processed_text = preprocess_text(text_to_process)
+    with METRICS.stage("preprocess"): processed_text = preprocess_text(text_to_process)
     if not processed_text: print("❌ Văn bản trở nên rỗng sau tiền xử lý."); return jsonify({"error": "Lỗi: Văn bản không hợp lệ sau tiền xử lý."}), 400
 
     print("🧠 Thực hiện dự đoán...")
     try:
-        inputs = TOKENIZER([processed_text], padding='max_length', truncation=True, max_length=MAX_LEN_PREDICT, return_tensors='tf')
-        outputs = MODEL(inputs); logits = outputs.logits[0].numpy(); probabilities = tf.nn.softmax(logits).numpy()
+        probabilities, answered_by = predict_one_cascade(processed_text, model_name, cascade_on) # Gom lô cùng các yêu cầu đồng thời khác
     except Exception as e: print(f"❌ Lỗi khi mô hình dự đoán: {e}"); traceback.print_exc(); return jsonify({"error": f"Lỗi khi mô hình dự đoán: {str(e)}"}), 500
 
     fake_prob_percent = float(probabilities[0] * 100); real_prob_percent = float(probabilities[1] * 100)
-    print(f"📊 Kết quả dự đoán - P(Fake): {fake_prob_percent:.2f}%, P(Real): {real_prob_percent:.2f}%")
+    print(f"📊 Kết quả dự đoán ({answered_by}) - P(Fake): {fake_prob_percent:.2f}%, P(Real): {real_prob_percent:.2f}%")
 
     print("😊 Tính toán điểm cảm xúc...")
-    sentiment_score = analyzer.polarity_scores(processed_text)['compound']
+    with METRICS.stage("sentiment"): sentiment_score = get_sentiment_analyzer().polarity_scores(processed_text)['compound']
     print(f"Sentiment score: {sentiment_score:.4f}")
 
-    top_words_en = []
-    if explain_flag:
-        print(f"⏳ Tính toán SHAP (max_length={SHAP_MAX_LEN})...")
+    top_words_en = []; explain_job_id = None
+    if explain_flag and explain_async:
+        print(f"⏳ Đưa yêu cầu giải thích (method={explain_method}) vào hàng đợi nền...")
+        full_response = build_response(original_text, text_to_process, detected_lang, probabilities, sentiment_score, [], model_name)
+        try:
+            # Khi job xong, kết quả đầy đủ được lưu vào cache với khóa của yêu cầu explain
+            explain_job_id = EXPLAIN_JOBS.submit(explain_top_words, processed_text, method=explain_method, model_name=model_name,
+                                                 on_done=lambda words: PREDICTION_CACHE.put(cache_key, dict(full_response, top_fake_words=words), model_name=model_name))
+            print(f"✅ Đã tạo job giải thích: {explain_job_id}")
+        except QueueFullError as e: print(f"⚠️ {e}"); return jsonify({"error": "Lỗi: Server đang quá tải yêu cầu giải thích, vui lòng thử lại sau."}), 429, {"Retry-After": "5"}
+    elif explain_flag:
+        print(f"⏳ Tính toán giải thích (method={explain_method}, max_length={SHAP_MAX_LEN}, max_evals={SHAP_MAX_EVALS})...")
         try:
-            def shap_predict_fn(texts_for_shap):
-                if isinstance(texts_for_shap, np.ndarray): texts_for_shap = texts_for_shap.tolist()
-                if isinstance(texts_for_shap, str): texts_for_shap = [texts_for_shap]
-                shap_inputs = TOKENIZER(texts_for_shap, padding=True, truncation=True, return_tensors="tf", max_length=SHAP_MAX_LEN)
-                return MODEL(input_ids=shap_inputs['input_ids'], attention_mask=shap_inputs['attention_mask']).logits.numpy()
-
-            explainer = shap.Explainer(shap_predict_fn, TOKENIZER); shap_values = explainer([processed_text])
-            class_index_fake = 0; shap_values_for_fake = shap_values.values[0, :, class_index_fake]; tokens_or_ids = shap_values.data[0]
-            positive_contribs = [(shap_values_for_fake[i], i) for i in range(len(shap_values_for_fake)) if shap_values_for_fake[i] > 0]
-            positive_contribs.sort(key=lambda item: item[0], reverse=True)
-            num_top_words = 10; top_indices = [index for shap_val, index in positive_contribs[:num_top_words]]
-            
-            processed_tokens_shap = set(); special_tokens = [ # Danh sách các token đặc biệt cần loại bỏ hoàn toàn
-                TOKENIZER.cls_token, TOKENIZER.sep_token, TOKENIZER.pad_token,
-                TOKENIZER.unk_token, TOKENIZER.mask_token, '<s>', '</s>', '<pad>', ' '
-            ]
-            # Đảm bảo các token đặc biệt không None
-            special_tokens = [tok for tok in special_tokens if tok is not None]
-
-            for idx in top_indices:
-                token_data = tokens_or_ids[idx]
-                token_text = "" # Khởi tạo lại cho mỗi token
-                try:
-                    # --- Bước 1: Decode token ID hoặc lấy token string ---
-                    if isinstance(token_data, (int, np.integer)):
-                         # Decode IDs, giữ lại ký tự đặc biệt ban đầu để kiểm tra
-                         decoded_token = TOKENIZER.decode([token_data], skip_special_tokens=False, clean_up_tokenization_spaces=False)
-                    elif isinstance(token_data, str):
-                         decoded_token = token_data # Nếu SHAP data đã là string
-                    else:
-                         continue # Bỏ qua nếu không phải int hoặc string
-
-                    # --- Bước 2: Kiểm tra và loại bỏ token đặc biệt ---
-                    # Loại bỏ khoảng trắng thừa trước/sau do decode
-                    cleaned_token = decoded_token.strip()
-                    if cleaned_token in special_tokens or not cleaned_token: # Nếu là token đặc biệt hoặc rỗng thì bỏ qua
-                         continue
-
-                    # --- !!! Bước 3: Bỏ ký tự Ġ ở đầu (nếu có) !!! ---
-                    if cleaned_token.startswith('Ġ'):
-                        token_text = cleaned_token[1:] # Lấy chuỗi từ ký tự thứ 2 trở đi
-                    else:
-                        token_text = cleaned_token # Giữ nguyên nếu không có Ġ
-
-                    # --- Bước 4: Làm sạch khoảng trắng lần cuối (phòng trường hợp decode tạo ra) ---
-                    token_text = token_text.strip()
-
-                except Exception as decode_err:
-                    print(f"⚠️ Lỗi decode/clean token SHAP tại index {idx}: {decode_err}")
-                    continue # Bỏ qua token này nếu có lỗi
-
-                # --- Bước 5: Thêm vào list nếu hợp lệ và chưa có ---
-                # Đảm bảo token không rỗng sau khi xử lý và có độ dài tối thiểu (vd: > 1)
-                if token_text and len(token_text) > 1 and token_text not in processed_tokens_shap:
-                     top_words_en.append(token_text)
-                     processed_tokens_shap.add(token_text)
-                     if len(top_words_en) >= num_top_words:
-                        break # Đủ 10 từ thì dừng
-
-            print(f"✅ SHAP hoàn tất. Top words/subwords (EN, đã bỏ Ġ) làm tăng độ giả: {top_words_en}")
-        except Exception as e: print(f"❌ Lỗi nghiêm trọng trong quá trình tính toán SHAP: {e}"); traceback.print_exc()
+            top_words_en = explain_top_words(processed_text, method=explain_method, model_name=model_name)
+            print(f"✅ Giải thích hoàn tất. Top words/subwords (EN, đã bỏ Ġ) làm tăng độ giả: {top_words_en}")
+        except Exception as e: print(f"❌ Lỗi nghiêm trọng trong quá trình tính toán giải thích: {e}"); traceback.print_exc()
     else: print("ℹ️ Bỏ qua tính toán SHAP theo yêu cầu.")
 
     # Luôn sử dụng kết quả tiếng Anh từ SHAP
@@ -216,21 +493,204 @@ def classify_text():
 
     # 8. Chuẩn bị và Trả về Kết quả JSON
     try:
-        response_data = {
-            "original_text": original_text,
-            "processed_english_text": text_to_process,
-            "detected_language": detected_lang,
-            "real_probability": round(real_prob_percent, 2),
-            "fake_probability": round(fake_prob_percent, 2),
-            "sentiment_score": round(sentiment_score, 4),
-            "top_fake_words": top_words_final, # Luôn là list tiếng Anh
-        }
+        response_data = build_response(original_text, text_to_process, detected_lang, probabilities, sentiment_score, top_words_final, model_name,
+                                       answered_by if cascade_on else None)
+        if explain_job_id is not None:
+            response_data.update(explain_job_id=explain_job_id, explain_status="queued")
+        else: PREDICTION_CACHE.put(cache_key, response_data, model_name=model_name)
+        if include_timings: response_data = dict(response_data, timings=METRICS.timings_ms()) # Không lưu vào cache
         print(f"✅ Chuẩn bị gửi phản hồi: {response_data}")
         return jsonify(response_data)
     except Exception as e:
         print(f"❌ Lỗi khi tạo JSON response: {e}")
         return jsonify({"error": f"Lỗi khi tạo phản hồi: {str(e)}"}), 500
 
+def classify_chunk(chunk, model_name=None, cascade=True):
+    """Chạy pipeline dịch -> tiền xử lý -> dự đoán cho một nhóm bài (index, item) bằng MỘT lượt forward.
+
+    Trả về list kết quả theo đúng thứ tự đầu vào; bài lỗi có trường "error" thay vì làm hỏng cả lô.
+    """
+    results = [None] * len(chunk); pending = []
+    cascade_on = use_cascade(requested=cascade); cache_model = cascade_cache_model(model_name, requested=cascade)
+    for pos, (index, item) in enumerate(chunk):
+        article_id = item.get('id', index); text = item.get('text')
+        if "error" in item and text is None: results[pos] = {"id": article_id, "error": item["error"]}; continue
+        if not isinstance(text, str) or not text.strip():
+            results[pos] = {"id": article_id, "error": "Lỗi: Văn bản đầu vào không hợp lệ hoặc bị rỗng."}; continue
+        cache_key = PREDICTION_CACHE.key(text, False, model_name=cache_model); cached = PREDICTION_CACHE.get(cache_key)
+        if cached is not None: results[pos] = dict(cached, id=article_id, original_text=text); continue
+        pending.append([pos, article_id, cache_key, text, None, text])
+
+    # Nhận dạng ngôn ngữ cả nhóm một lượt, rồi dịch theo lô: gom các bài cùng ngôn ngữ nguồn thành một lần gọi
+    by_lang = {}
+    with METRICS.stage("detect", pipeline="batch"): languages = LANGUAGE_ID.detect_batch([row[3] for row in pending])
+    for row, (lang, confidence) in zip(pending, languages):
+        row[4] = lang
+        if needs_translation(lang, confidence): by_lang.setdefault(lang, []).append(row)
+    with METRICS.stage("translate", pipeline="batch"):
+        for lang, rows in by_lang.items():
+            for row, translated in zip(rows, translate_texts([row[3] for row in rows], lang)): row[5] = translated
+
+    ready = []
+    with METRICS.stage("preprocess", pipeline="batch"):
+        processed_texts = preprocess_texts([row[5] for row in pending], get_stop_words()) # Cả nhóm trong một lượt regex
+    for (pos, article_id, cache_key, text, detected_lang, text_to_process), processed_text in zip(pending, processed_texts):
+        if not processed_text:
+            results[pos] = {"id": article_id, "error": "Lỗi: Văn bản không hợp lệ sau tiền xử lý."}; continue
+        ready.append((pos, article_id, cache_key, text, detected_lang, text_to_process, processed_text))
+    pending = ready
+
+    if pending:
+        try:
+            with METRICS.stage("predict", pipeline="batch"): probabilities, answered_by = predict_many_cascade([p[-1] for p in pending], model_name, cascade_on)
+        except Exception as e:
+            print(f"❌ Lỗi khi mô hình dự đoán lô: {e}"); traceback.print_exc()
+            for pos, article_id, *_ in pending: results[pos] = {"id": article_id, "error": f"Lỗi khi mô hình dự đoán: {str(e)}"}
+            return results
+        for (pos, article_id, cache_key, text, detected_lang, text_to_process, processed_text), probs, served in zip(pending, probabilities, answered_by):
+            with METRICS.stage("sentiment", pipeline="batch"): sentiment_score = get_sentiment_analyzer().polarity_scores(processed_text)['compound']
+            response_data = build_response(text, text_to_process, detected_lang, probs, sentiment_score, [], model_name, served if cascade_on else None)
+            PREDICTION_CACHE.put(cache_key, response_data, model_name=model_name)
+            results[pos] = dict(response_data, id=article_id)
+    return results
+
+def iter_ndjson_articles(stream):
+    """Đọc từng dòng NDJSON từ luồng upload (không nạp toàn bộ file vào bộ nhớ)."""
+    for line in stream:
+        line = line.decode('utf-8') if isinstance(line, bytes) else line
+        if not line.strip(): continue
+        try: item = json.loads(line)
+        except ValueError as e: item = {"error": f"Dòng NDJSON không hợp lệ: {e}"}
+        yield item if isinstance(item, dict) else {"text": item}
+
+@app.route('/classify/batch', methods=['POST'])
+def classify_batch():
+    """Phân loại nhiều bài một lúc, stream kết quả dạng NDJSON (mỗi dòng một bài) theo từng nhóm BATCH_CHUNK_SIZE.
+
+    Đầu vào: JSON {"texts": [...]} / {"articles": [{"id": ..., "text": ...}]} / list, hoặc upload NDJSON
+    (Content-Type: application/x-ndjson). Chế độ lô không tính SHAP. Chọn mô hình bằng "model" trong JSON hoặc ?model=;
+    khi bật CASCADE, "cascade": false (hoặc ?cascade=0) bắt mọi bài đi thẳng tới mô hình lớn.
+    """
+    if not model_available(): return jsonify({"error": "Lỗi Server: Mô hình chưa được tải thành công!"}), 503
+    requested_model = request.args.get('model'); cascade_requested = request.args.get('cascade') != '0'
+    if request.mimetype in NDJSON_MIMETYPES:
+        articles = iter_ndjson_articles(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        articles = data.get('articles', data.get('texts')) if isinstance(data, dict) else data
+        if not isinstance(articles, list): return jsonify({"error": "Lỗi: Cần danh sách 'texts' hoặc 'articles', hoặc upload NDJSON."}), 400
+        articles = ({"text": a} if not isinstance(a, dict) else a for a in articles)
+        if isinstance(data, dict): requested_model = data.get('model', requested_model); cascade_requested = data.get('cascade', cascade_requested)
+    try: model_name = resolve_model(requested_model)
+    except KeyError as e: return jsonify({"error": f"Lỗi: {e.args[0]}"}), 404
+    print(f"\n--- Yêu cầu lô mới (model={model_name}, chunk={BATCH_CHUNK_SIZE}) ---")
+
+    def generate():
+        chunk = []; total = 0; status = 200
+        try:
+            for index, item in enumerate(articles):
+                chunk.append((index, item))
+                if len(chunk) >= BATCH_CHUNK_SIZE:
+                    for result in classify_chunk(chunk, model_name, cascade_requested): yield json.dumps(result, ensure_ascii=False) + "\n"
+                    total += len(chunk); chunk = []
+            if chunk:
+                for result in classify_chunk(chunk, model_name, cascade_requested): yield json.dumps(result, ensure_ascii=False) + "\n"
+                total += len(chunk)
+            print(f"✅ Đã stream xong {total} bài.")
+        except Exception:
+            status = 500; raise
+        finally: record_request(request.endpoint or "unknown", status) # Độ trễ của cả stream, không chỉ tới byte đầu tiên
+
+    g.streaming = True
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/explain/<job_id>', methods=['GET'])
+def explain_status(job_id):
+    """Trạng thái (queued/running/done/error) và kết quả của một job giải thích."""
+    job = EXPLAIN_JOBS.get(job_id)
+    if job is None: return jsonify({"error": "Lỗi: Không tìm thấy job giải thích (sai id hoặc đã hết hạn)."}), 404
+    body = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == "done": body["top_fake_words"] = job["result"]
+    elif job["status"] == "error": body["error"] = job["error"]
+    return jsonify(body)
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Số lần trúng/trượt và kích thước của cache dự đoán, cache dịch và cache nhận dạng ngôn ngữ."""
+    return jsonify(dict(PREDICTION_CACHE.stats(), translation=TRANSLATOR.stats(), language=LANGUAGE_ID.stats()))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Số liệu dạng văn bản Prometheus: histogram + p50/p95/p99 độ trễ theo bước và theo endpoint, bộ đếm lỗi, cache, cascade."""
+    return Response(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/cascade/stats', methods=['GET'])
+def cascade_stats():
+    """Tỉ lệ bài tầng 1 của cascade tự trả lời / chuyển lên mô hình lớn, dải bất định và độ trễ của tầng 1."""
+    if CASCADE is None: return jsonify({"enabled": False})
+    return jsonify(dict(CASCADE.stats(), enabled=True))
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    """Các mô hình có sẵn, mô hình mặc định và bộ nhớ của từng mô hình đang thường trú (?refresh=1 để quét lại thư mục)."""
+    if not model_available(): return jsonify({"error": "Lỗi Server: Mô hình chưa được tải thành công!"}), 503
+    return jsonify(models_stats(refresh=request.args.get('refresh') == '1'))
+
+@app.route('/models/default', methods=['POST'])
+def switch_default_model():
+    """Đổi mô hình mặc định không cần khởi động lại: {"model": "<tên>"}. Yêu cầu đang chạy vẫn hoàn tất với mô hình cũ."""
+    if not model_available(): return jsonify({"error": "Lỗi Server: Mô hình chưa được tải thành công!"}), 503
+    name = (request.get_json(silent=True) or {}).get('model')
+    if not name or not isinstance(name, str): return jsonify({"error": "Lỗi: Cần trường 'model'."}), 400
+    try: previous = set_default_model(name)
+    except KeyError as e: return jsonify({"error": f"Lỗi: {e.args[0]}"}), 404
+    except Exception as e: print(f"❌ Không đổi được mô hình mặc định: {e}"); traceback.print_exc(); return jsonify({"error": f"Lỗi khi tải mô hình '{name}': {str(e)}"}), 500
+    return jsonify({"default": name, "previous": previous})
+
+# --- Khởi động nóng (warm-up) và trạng thái sẵn sàng ---
+WARMUP_STATE = {"ready": False, "started": False, "seconds": None, "compile_seconds": {}, "error": None}
+WARMUP_TEXT = "breaking news the president announced new economic measures on monday according to officials"
+
+def warmup():
+    """Chạy thử mọi shape đã biên dịch và mọi thành phần của pipeline trước khi báo sẵn sàng (/ready)."""
+    WARMUP_STATE["started"] = True
+    if not model_available(): WARMUP_STATE["error"] = "Mô hình chưa được tải thành công"; return WARMUP_STATE
+    start = time.perf_counter()
+    try:
+        print("⏳ Warm-up: biên dịch/chạy thử các shape phục vụ...")
+        if INFERENCE_CLIENT is not None: WARMUP_STATE["compile_seconds"] = INFERENCE_CLIENT.status()["compile_seconds"] # Đã biên dịch ở tiến trình suy luận
+        else:
+            with REGISTRY.use() as bundle: WARMUP_STATE["compile_seconds"] = warmup_model(bundle)
+        processed = preprocess_text(WARMUP_TEXT) # Tải stopwords
+        get_sentiment_analyzer().polarity_scores(processed); detect_language(WARMUP_TEXT)
+        predict_one(processed) # Đi qua đúng đường của một yêu cầu thật
+        WARMUP_STATE.update(ready=True, seconds=round(time.perf_counter() - start, 3))
+        print(f"✅ Warm-up hoàn tất sau {WARMUP_STATE['seconds']}s - server sẵn sàng.")
+    except Exception as e:
+        WARMUP_STATE["error"] = str(e); print(f"❌ Warm-up thất bại: {e}"); traceback.print_exc()
+    return WARMUP_STATE
+
+def start_warmup_async():
+    """Warm-up trong luồng nền để /health trả lời ngay trong khi /ready còn báo 503."""
+    thread = threading.Thread(target=warmup, name="warmup", daemon=True); thread.start()
+    return thread
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Liveness: tiến trình còn sống và đang nhận request."""
+    return jsonify({"status": "alive"})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: mô hình đã tải và warm-up đã xong (chỉ nên nhận traffic khi trả về 200)."""
+    try: default_model = resolve_model() if model_available() else None
+    except Exception: default_model = None
+    body = {"status": "ready" if WARMUP_STATE["ready"] else "warming_up", "model": default_model,
+            "backend": "remote" if INFERENCE_CLIENT is not None else INFERENCE_BACKEND, "pid": os.getpid(), "import_seconds": IMPORT_SECONDS,
+            "warmup_seconds": WARMUP_STATE["seconds"], "compile_seconds": WARMUP_STATE["compile_seconds"]}
+    if WARMUP_STATE["error"]: body.update(status="error", error=WARMUP_STATE["error"])
+    return jsonify(body), (200 if WARMUP_STATE["ready"] else 503)
+
 # --- Xử lý lỗi chung của Flask ---
 @app.errorhandler(Exception)
 def handle_exception(e):
@@ -239,8 +699,12 @@ def handle_exception(e):
     response = jsonify(error="Đã xảy ra lỗi không mong muốn trên server."); response.status_code = 500
     return response
 
+IMPORT_SECONDS = round(time.perf_counter() - _IMPORT_START, 3)
+print(f"⏱️ Import model.py mất {IMPORT_SECONDS}s")
+
 # --- Chạy App ---
 if __name__ == "__main__":
     APP_PORT = 5001; print(f"--- Khởi chạy Flask App trên cổng {APP_PORT} ---")
+    start_warmup_async()
     # app.run(host='0.0.0.0', port=APP_PORT, debug=True)
-    app.run(host='0.0.0.0', port=APP_PORT, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=APP_PORT, debug=False, threaded=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# --- Tiền xử lý theo lô cho bộ phân loại (cùng kết quả với preprocess_text() từng văn bản trước đây) ---
+# Các văn bản được nối bằng một dòng phân cách rồi chạy mỗi regex MỘT lần trên cả chuỗi; dòng phân cách
+# ngăn URL/thẻ HTML khớp vượt sang văn bản kế bên ('.' và \S không khớp '\n').
+import re
+import unicodedata
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+HTML_TAG_PATTERN = re.compile(r"<.*?>+")
+DISALLOWED_CHARS_PATTERN = re.compile(r"[^\w\s.,!?']") # Giữ chữ cái, số, khoảng trắng và một số dấu câu cơ bản
+DOC_SEPARATOR = "ǂǂǂǂ" # Ký tự chữ (\w): không bị lower()/NFKC/các regex trên thay đổi
+
+
+def _clean_joined(text):
+    text = unicodedata.normalize("NFKC", text.lower())
+    return DISALLOWED_CHARS_PATTERN.sub("", HTML_TAG_PATTERN.sub("", URL_PATTERN.sub("", text)))
+
+
+def preprocess_texts(texts, stop_words=frozenset()):
+    """Tiền xử lý cả lô: lower, NFKC, bỏ URL/HTML/ký tự lạ, chuẩn hóa khoảng trắng, bỏ stopwords.
+
+    Phần tử không phải chuỗi hoặc rỗng cho kết quả "" (giống preprocess_text()).
+    """
+    results = [""] * len(texts)
+    valid = [i for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+    if not valid: return results
+    batch = [texts[i] for i in valid]
+    if any(DOC_SEPARATOR in text for text in batch): pieces = [_clean_joined(text) for text in batch]
+    else: pieces = _clean_joined(f"\n{DOC_SEPARATOR}\n".join(batch)).split(DOC_SEPARATOR)
+    for i, piece in zip(valid, pieces):
+        # split() vừa gộp mọi khoảng trắng vừa bỏ khoảng trắng đầu/cuối (thay cho re.sub(r"\s+", " ") + strip())
+        results[i] = " ".join(word for word in piece.split() if word not in stop_words)
+    return results
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# --- Registry mô hình: tìm checkpoint trên đĩa, tải lười, giới hạn số mô hình thường trú (LRU), đổi mô hình mặc định nóng ---
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+ModelSpec = namedtuple("ModelSpec", ["name", "model_path", "tokenizer_path"])
+
+CHECKPOINT_PATTERN = re.compile(r"^(?P<arch>.+)_pretrained_(?P<stamp>\d{8}_\d{6})$")
+TOKENIZER_FILES = ("vocab.json", "tokenizer.json", "tokenizer_config.json")
+
+
+def discover_models(search_dirs):
+    """Tìm các cặp checkpoint/tokenizer theo quy ước lưu của script huấn luyện.
+
+    `<Arch>_pretrained_<stamp>/config.json` là checkpoint; tokenizer là `<Arch>_token_pretrained_<stamp>/`
+    nằm cùng thư mục, hoặc chính thư mục checkpoint nếu tokenizer được lưu chung. Checkpoint không có tokenizer bị bỏ qua.
+    Thư mục đứng trước trong `search_dirs` được ưu tiên khi trùng tên.
+    """
+    specs = {}
+    for directory in search_dirs:
+        if not os.path.isdir(directory): continue
+        for entry in sorted(os.listdir(directory)):
+            match = CHECKPOINT_PATTERN.match(entry); model_path = os.path.join(directory, entry)
+            if match is None or entry in specs or not os.path.isfile(os.path.join(model_path, "config.json")): continue
+            tokenizer_path = os.path.join(directory, f"{match.group('arch')}_token_pretrained_{match.group('stamp')}")
+            if not os.path.isdir(tokenizer_path):
+                if not any(os.path.isfile(os.path.join(model_path, f)) for f in TOKENIZER_FILES):
+                    print(f"⚠️ Bỏ qua checkpoint '{entry}': không tìm thấy tokenizer đi kèm."); continue
+                tokenizer_path = model_path
+            specs[entry] = ModelSpec(entry, model_path, tokenizer_path)
+    return specs
+
+
+def current_rss_bytes():
+    """RSS hiện tại của tiến trình (psutil, hoặc /proc trên Linux); None nếu không đo được."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def weight_bytes(model):
+    """Tổng dung lượng trọng số của một mô hình Keras/TF (không tính activation hay bộ nhớ đệm của runtime)."""
+    total = 0
+    for weight in getattr(model, "weights", []):
+        size = 1
+        for dim in weight.shape: size *= int(dim)
+        total += size * getattr(weight.dtype, "size", 4)
+    return total
+
+
+class LoadedModel:
+    """Một mô hình đang thường trú: model + tokenizer + runner + batcher + explainer (do `loader` của registry dựng).
+
+    Bị loại khỏi LRU hoặc bị thay khi đang có yêu cầu dùng thì chỉ được đóng khi yêu cầu cuối cùng trả lại.
+    """
+
+    def __init__(self, spec, model, tokenizer, runner, batcher=None, explainer=None):
+        self.spec = spec; self.name = spec.name
+        self.model = model; self.tokenizer = tokenizer; self.runner = runner; self.batcher = batcher; self.explainer = explainer
+        self.load_seconds = None; self.rss_delta_bytes = None; self.weight_bytes = weight_bytes(model)
+        self.loaded_at = time.time(); self.requests = 0
+        self._refs = 0; self._retired = False; self._closed = False; self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock: self._refs += 1; self.requests += 1
+
+    def release(self):
+        with self._lock:
+            self._refs -= 1; close = self._retired and self._refs == 0
+        if close: self.close()
+
+    def retire(self):
+        """Đánh dấu không còn trong registry; đóng ngay nếu không còn yêu cầu nào đang dùng."""
+        with self._lock:
+            self._retired = True; close = self._refs == 0
+        if close: self.close()
+
+    def close(self):
+        """Giải phóng đúng một lần (retire() và release() cuối cùng có thể cùng thấy refs == 0)."""
+        with self._lock:
+            if self._closed: return
+            self._closed = True
+        if self.batcher is not None and hasattr(self.batcher, "close"): self.batcher.close()
+        print(f"🗑️ Đã giải phóng mô hình '{self.name}'.")
+
+    def info(self):
+        mb = lambda b: round(b / 2**20, 1) if b is not None else None
+        return {"name": self.name, "backend": getattr(self.runner, "name", None), "weights_mb": mb(self.weight_bytes),
+                "rss_delta_mb": mb(self.rss_delta_bytes), "load_seconds": self.load_seconds, "in_flight": self._refs,
+                "requests": self.requests, "loaded_at": self.loaded_at}
+
+
+class ModelRegistry:
+    """Quản lý các mô hình tìm thấy trên đĩa.
+
+    - `use(name)`: context manager trả về LoadedModel (tải lười nếu chưa thường trú); name=None = mô hình mặc định.
+    - Tối đa `max_resident` mô hình nằm trong bộ nhớ; mô hình ít dùng gần đây nhất bị loại (trừ mô hình mặc định).
+    - `set_default(name)`: tải + warm-up mô hình mới TRƯỚC, rồi mới đổi con trỏ mặc định; yêu cầu đang chạy
+      vẫn dùng mô hình cũ cho tới khi xong.
+    """
+
+    def __init__(self, search_dirs, loader, default=None, max_resident=2):
+        self.search_dirs = list(search_dirs); self.loader = loader; self.max_resident = max(1, int(max_resident))
+        self.specs = discover_models(self.search_dirs)
+        self._resident = OrderedDict(); self._lock = threading.Lock()
+        self._loading = {} # name -> Lock: hai yêu cầu cùng mô hình chưa tải chỉ tải một lần
+        # Mặc định: checkpoint mới nhất theo dấu thời gian trong tên (không theo tên kiến trúc)
+        newest = max(self.specs, key=lambda n: (CHECKPOINT_PATTERN.match(n)["stamp"], n), default=None)
+        self.default_name = default if default in self.specs else newest
+        if default and default not in self.specs: print(f"⚠️ Không tìm thấy mô hình mặc định '{default}', dùng '{self.default_name}'.")
+
+    def refresh(self):
+        """Quét lại thư mục mô hình (checkpoint mới được copy vào không cần khởi động lại)."""
+        specs = discover_models(self.search_dirs)
+        with self._lock: self.specs = specs
+        return sorted(specs)
+
+    def resolve(self, name=None):
+        """Tên mô hình sẽ phục vụ yêu cầu; KeyError nếu không có mô hình tên này."""
+        name = name or self.default_name
+        if name not in self.specs: raise KeyError(f"Không có mô hình '{name}'. Có sẵn: {sorted(self.specs)}")
+        return name
+
+    def _load(self, name):
+        with self._lock:
+            bundle = self._resident.get(name)
+            if bundle is not None: self._resident.move_to_end(name); return bundle
+            load_lock = self._loading.setdefault(name, threading.Lock())
+        with load_lock:
+            with self._lock:
+                bundle = self._resident.get(name)
+                if bundle is not None: return bundle
+            print(f"🔄 Đang tải mô hình '{name}'...")
+            rss_before = current_rss_bytes(); start = time.perf_counter()
+            bundle = self.loader(self.specs[name])
+            bundle.load_seconds = round(time.perf_counter() - start, 3)
+            rss_after = current_rss_bytes()
+            if rss_before is not None and rss_after is not None: bundle.rss_delta_bytes = rss_after - rss_before
+            print(f"✅ Đã tải '{name}' sau {bundle.load_seconds}s (trọng số {bundle.weight_bytes / 2**20:.1f} MB).")
+            with self._lock:
+                self._resident[name] = bundle; self._loading.pop(name, None)
+                evicted = self._evict(keep=name)
+        for old in evicted: old.retire()
+        return bundle
+
+    def _evict(self, keep=None):
+        """Loại các mô hình dùng ít gần đây nhất khi vượt max_resident (gọi khi đang giữ khóa)."""
+        evicted = []
+        for name in list(self._resident):
+            if len(self._resident) <= self.max_resident: break
+            if name in (self.default_name, keep): continue
+            evicted.append(self._resident.pop(name)); print(f"♻️ Loại mô hình '{name}' khỏi bộ nhớ (LRU).")
+        return evicted
+
+    @contextmanager
+    def use(self, name=None):
+        while True:
+            bundle = self._load(self.resolve(name))
+            bundle.acquire()
+            if not bundle._retired: break
+            bundle.release() # Vừa bị loại giữa lúc tải và lúc nhận -> tải lại
+        try: yield bundle
+        finally: bundle.release()
+
+    def set_default(self, name, warmup=None):
+        """Đổi mô hình mặc định mà không dừng server; `warmup(bundle)` chạy trước khi đổi con trỏ."""
+        name = self.resolve(name)
+        with self.use(name) as bundle:
+            if warmup is not None: warmup(bundle)
+            with self._lock:
+                previous = self.default_name; self.default_name = name
+                evicted = self._evict(keep=name) # Mô hình mặc định cũ giờ có thể bị loại
+        for old in evicted: old.retire()
+        print(f"🔁 Mô hình mặc định: '{previous}' -> '{name}'.")
+        return previous
+
+    def stats(self):
+        rss = current_rss_bytes()
+        with self._lock:
+            resident = [bundle.info() for bundle in self._resident.values()]
+            return {"default": self.default_name, "available": sorted(self.specs), "max_resident": self.max_resident,
+                    "resident": resident, "resident_weights_mb": round(sum(r["weights_mb"] or 0 for r in resident), 1),
+                    "process_rss_mb": round(rss / 2**20, 1) if rss is not None else None}
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# --- Mô hình "học trò" (BiLSTM/BiGRU Keras) chưng cất từ RoBERTa: tokenizer, runner, giải thích và loader cho registry ---
+# Artifact do distill.py tạo: <Arch>-student_pretrained_<stamp>/ gồm config.json (model_type "keras-student"), student.keras,
+# tokenizer.json. Registry nhận ra nó như mọi checkpoint khác; các lớp dưới đây cung cấp đúng phần API của tokenizer/model
+# transformers mà model.py dùng (gọi tokenizer, tokenizer.pad, pad_token_id, config.num_labels, runner.logits).
+import json
+import os
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+STUDENT_MODEL_TYPE = "keras-student"
+STUDENT_WEIGHTS_FILE = "student.keras"
+STUDENT_TOKENIZER_FILE = "tokenizer.json"
+PAD_ID, OOV_ID = 0, 1
+FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n' # Như Tokenizer của Keras (giữ dấu ')
+FILTER_TABLE = str.maketrans(FILTERS, " " * len(FILTERS))
+
+
+def read_config(model_path):
+    try:
+        with open(os.path.join(model_path, "config.json"), encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_student(model_path):
+    return read_config(model_path).get("model_type") == STUDENT_MODEL_TYPE
+
+
+class StudentTokenizer:
+    """Tokenizer theo từ (id 0 = pad, 1 = từ lạ, từ phổ biến nhất = 2...), giữ `num_words` id đầu như Tokenizer của Keras."""
+    pad_token, unk_token = "<pad>", "<OOV>"
+    cls_token = sep_token = mask_token = None
+    pad_token_id, cls_token_id = PAD_ID, OOV_ID # cls_token_id: warmup_model() đặt vào đầu chuỗi thử
+
+    def __init__(self, word_index, num_words, max_length):
+        self.word_index = {w: i for w, i in word_index.items() if i < num_words}; self.num_words = num_words; self.max_length = max_length
+        self.model_max_length = max_length # Độ dài cửa sổ khi suy luận bài dài (windowing.py)
+        self.index_word = {i: w for w, i in self.word_index.items()}; self.index_word.update({PAD_ID: self.pad_token, OOV_ID: self.unk_token})
+
+    @staticmethod
+    def split(text):
+        return text.lower().translate(FILTER_TABLE).split()
+
+    @classmethod
+    def fit(cls, texts, num_words=20000, max_length=256):
+        counts = Counter(word for text in texts for word in cls.split(text))
+        word_index = {word: i for i, (word, _) in enumerate(counts.most_common(num_words - 2), 2)}
+        return cls(word_index, num_words, max_length)
+
+    def encode(self, text, max_length=None, truncation=True):
+        limit = (max_length or self.max_length) if truncation else None
+        return [self.word_index.get(word, OOV_ID) for word in self.split(text)[:limit]] or [OOV_ID]
+
+    def __call__(self, texts, truncation=True, max_length=None, padding=False, return_tensors=None):
+        if isinstance(texts, str): texts = [texts]
+        ids = [self.encode(text, max_length, truncation) for text in texts]
+        encoded = {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+        return self.pad(encoded, return_tensors=return_tensors) if padding or return_tensors else encoded
+
+    def pad(self, encoded, padding="longest", return_tensors="np"):
+        ids = encoded["input_ids"]; width = max((len(row) for row in ids), default=1)
+        input_ids = np.full((len(ids), width), PAD_ID, dtype=np.int32); attention_mask = np.zeros((len(ids), width), dtype=np.int32)
+        for i, row in enumerate(ids): input_ids[i, :len(row)] = row; attention_mask[i, :len(row)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    def build_inputs_with_special_tokens(self, ids):
+        return list(ids) # Không có token đặc biệt
+
+    def convert_ids_to_tokens(self, ids):
+        return [self.index_word.get(int(i), self.unk_token) for i in ids]
+
+    def decode(self, ids, **kwargs):
+        return " ".join(self.convert_ids_to_tokens(ids))
+
+    def save(self, path):
+        with open(os.path.join(path, STUDENT_TOKENIZER_FILE), "w", encoding="utf-8") as f:
+            json.dump({"num_words": self.num_words, "max_length": self.max_length, "word_index": self.word_index}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, STUDENT_TOKENIZER_FILE), encoding="utf-8") as f: data = json.load(f)
+        return cls(data["word_index"], data["num_words"], data["max_length"])
+
+
+def build_student(architecture, num_words, embedding_dim=128, units=(64, 32), dense=64, num_labels=2):
+    """BiLSTM/BiGRU hai tầng như BiLSTM.py, đầu ra là logits (num_labels) để học theo logits của teacher."""
+    import tensorflow as tf
+    cell = {"bilstm": tf.keras.layers.LSTM, "bigru": tf.keras.layers.GRU}[architecture.lower()]
+    return tf.keras.Sequential([
+        tf.keras.Input((None,), dtype="int32", name="input_ids"),
+        tf.keras.layers.Embedding(num_words, embedding_dim, mask_zero=True), # Bỏ qua phần pad (quan trọng cho chiều ngược)
+        tf.keras.layers.Bidirectional(cell(units[0], return_sequences=True)),
+        tf.keras.layers.Bidirectional(cell(units[1])),
+        tf.keras.layers.Dense(dense, activation='relu'),
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(num_labels, name="logits"),
+    ])
+
+
+class StudentModel:
+    """Bọc mô hình Keras với `config.num_labels` và `weights` như TFRobertaForSequenceClassification."""
+
+    def __init__(self, keras_model, config):
+        self.keras_model = keras_model; self.config = SimpleNamespace(**config)
+        self.config.num_labels = config.get("num_labels", 2)
+
+    @property
+    def weights(self):
+        return self.keras_model.weights
+
+
+class StudentRunner:
+    """Forward qua tf.function với shape (None, None): độ dài động, không phải biên dịch lại theo bucket."""
+    name = STUDENT_MODEL_TYPE
+
+    def __init__(self, model):
+        import tensorflow as tf
+        self.model = model
+        self._forward = tf.function(lambda ids: model.keras_model(ids, training=False),
+                                    input_signature=[tf.TensorSpec((None, None), tf.int32, name="input_ids")])
+
+    def logits(self, input_ids, attention_mask=None):
+        return self._forward(np.asarray(input_ids, dtype=np.int32)).numpy()
+
+
+class StudentExplainer:
+    """Giải thích cho học trò bằng che từng từ (occlusion): điểm của một từ = P(Fake) giảm bao nhiêu khi bỏ mọi lần xuất hiện của nó.
+
+    Mô hình nhỏ nên chạy tối đa `max_evals` văn bản bị che theo lô vẫn rẻ; "shap" và "gradient" đều dùng cách này.
+    """
+
+    def __init__(self, tokenizer, runner, max_evals=200, batch_size=16, class_index_fake=0):
+        self.tokenizer = tokenizer; self.runner = runner; self.max_evals = max_evals; self.batch_size = batch_size
+        self.class_index_fake = class_index_fake
+
+    def _fake_probabilities(self, rows):
+        from inference import softmax
+        out = []
+        for start in range(0, len(rows), self.batch_size):
+            batch = self.tokenizer.pad({"input_ids": rows[start:start + self.batch_size]})
+            out.append(softmax(self.runner.logits(batch["input_ids"]))[:, self.class_index_fake])
+        return np.concatenate(out)
+
+    def top_fake_words(self, text, method="shap", num_top_words=10, max_evals=None):
+        ids = self.tokenizer.encode(text); words = [w for w in dict.fromkeys(ids) if w != OOV_ID][:max(1, (max_evals or self.max_evals) - 1)]
+        if not words: return []
+        rows = [ids] + [[i for i in ids if i != word] or [OOV_ID] for word in words]
+        probabilities = self._fake_probabilities(rows); scores = probabilities[0] - probabilities[1:]
+        ranked = [words[i] for i in np.argsort(-scores) if scores[i] > 0]
+        return [token for token in self.tokenizer.convert_ids_to_tokens(ranked) if len(token) > 1][:num_top_words]
+
+
+def load_student(model_path, tokenizer_path=None):
+    """(StudentModel, StudentTokenizer, StudentRunner) từ một artifact của distill.py."""
+    import tensorflow as tf
+    config = read_config(model_path)
+    keras_model = tf.keras.models.load_model(os.path.join(model_path, STUDENT_WEIGHTS_FILE), compile=False)
+    model = StudentModel(keras_model, config)
+    tokenizer = StudentTokenizer.load(tokenizer_path or model_path)
+    return model, tokenizer, StudentRunner(model)
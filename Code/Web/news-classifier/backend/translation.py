@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# --- Lớp dịch: backend cắm được, cache bền vững, gộp yêu cầu trùng và dịch theo đoạn ---
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import Future
+
+from cache import PredictionCache
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+class TranslationBackend:
+    """Giao diện backend dịch. Lớp con cần cài đặt translate(); translate_batch() mặc định gọi lần lượt."""
+    name = "base"
+
+    def translate(self, text, src_lang, target_lang):
+        raise NotImplementedError
+
+    def translate_batch(self, texts, src_lang, target_lang):
+        return [self.translate(text, src_lang, target_lang) for text in texts]
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """GoogleTranslator (deep_translator); đối tượng translator được tạo một lần cho mỗi cặp ngôn ngữ."""
+    name = "google"
+
+    def __init__(self):
+        self._translators = {}; self._lock = threading.Lock()
+
+    def _get(self, src_lang, target_lang):
+        with self._lock:
+            translator = self._translators.get((src_lang, target_lang))
+            if translator is None:
+                from deep_translator import GoogleTranslator # Chỉ import khi có văn bản cần dịch
+                translator = self._translators[(src_lang, target_lang)] = GoogleTranslator(source=src_lang, target=target_lang)
+            return translator
+
+    def translate(self, text, src_lang, target_lang):
+        return self._get(src_lang, target_lang).translate(text)
+
+    def translate_batch(self, texts, src_lang, target_lang):
+        return self._get(src_lang, target_lang).translate_batch(list(texts))
+
+
+class DictionaryBackend(TranslationBackend):
+    """Backend ngoại tuyến: tra từng từ trong từ điển JSON {"src_lang": {"từ": "word"}}; dùng cho test và môi trường không có mạng."""
+    name = "dictionary"
+
+    def __init__(self, path=None, mapping=None):
+        if mapping is None and path:
+            with open(path, encoding="utf-8") as f: mapping = json.load(f)
+        self.mapping = mapping or {}
+
+    def translate(self, text, src_lang, target_lang):
+        table = self.mapping.get(src_lang, {})
+        return " ".join(table.get(word.lower(), word) for word in text.split())
+
+
+class IdentityBackend(TranslationBackend):
+    """Không dịch (trả lại nguyên văn) - dùng khi tắt dịch hoặc làm mock."""
+    name = "identity"
+
+    def translate(self, text, src_lang, target_lang):
+        return text
+
+
+def make_backend(name, dictionary_path=None):
+    if name == "google": return GoogleTranslateBackend()
+    if name == "dictionary": return DictionaryBackend(path=dictionary_path)
+    if name == "identity": return IdentityBackend()
+    raise ValueError(f"Backend dịch không hợp lệ: {name}")
+
+
+def split_chunks(text, max_chars):
+    """Cắt văn bản dài thành các đoạn <= max_chars, ưu tiên ranh giới câu rồi đến khoảng trắng."""
+    chunks, current = [], ""
+    for sentence in SENTENCE_SPLIT.split(text.strip()):
+        while len(sentence) > max_chars: # Câu quá dài: cắt tại khoảng trắng gần nhất
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current: chunks.append(current); current = ""
+            chunks.append(sentence[:cut].strip()); sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars: chunks.append(current); current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current: chunks.append(current)
+    return chunks
+
+
+class TranslationService:
+    """Dịch có cache theo (ngôn ngữ nguồn, hash văn bản), gộp các yêu cầu trùng đang chạy và dịch bài dài theo đoạn."""
+
+    def __init__(self, backend, chunk_chars=1500, max_chars=20000, cache_entries=4096, cache_path=None):
+        self.backend = backend; self.chunk_chars = chunk_chars; self.max_chars = max_chars
+        # Bản dịch không phụ thuộc mô hình phân loại -> không hết hạn (TTL = 0)
+        self.cache = PredictionCache(f"translate:{backend.name}", max_entries=cache_entries, ttl_seconds=0, disk_path=cache_path, keep_models=())
+        self._inflight = {}; self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _key(self, text, src_lang, target_lang):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{src_lang}:{target_lang}:{digest}"
+
+    def translate(self, text, src_lang="auto", target_lang="en"):
+        """Dịch một văn bản; ném lỗi của backend nếu dịch thất bại."""
+        text = text[:self.max_chars]
+        key = self._key(text, src_lang, target_lang)
+        cached = self.cache.get(key)
+        if cached is not None: return cached
+        with self._lock:
+            future = self._inflight.get(key); owner = future is None
+            if owner: future = self._inflight[key] = Future()
+            else: self.coalesced += 1
+        if not owner: return future.result() # Văn bản giống hệt đang được dịch ở luồng khác
+        try:
+            chunks = split_chunks(text, self.chunk_chars) or [text]
+            if len(chunks) == 1: translated = self.backend.translate(chunks[0], src_lang, target_lang)
+            else: translated = " ".join(self.backend.translate_batch(chunks, src_lang, target_lang))
+            if translated and translated.strip(): self.cache.put(key, translated)
+            future.set_result(translated)
+            return translated
+        except Exception as e:
+            future.set_exception(e); raise
+        finally:
+            with self._lock: self._inflight.pop(key, None)
+
+    def translate_batch(self, texts, src_lang="auto", target_lang="en"):
+        """Dịch nhiều văn bản cùng ngôn ngữ nguồn: bản đã cache lấy ngay, phần còn lại (ngắn) gửi một lô."""
+        results = [None] * len(texts); short, long_ = [], []
+        for i, text in enumerate(texts):
+            text = text[:self.max_chars]
+            cached = self.cache.get(self._key(text, src_lang, target_lang))
+            if cached is not None: results[i] = cached
+            elif len(text) <= self.chunk_chars: short.append((i, text))
+            else: long_.append((i, text))
+        if short:
+            translated = self.backend.translate_batch([t for _, t in short], src_lang, target_lang)
+            for (i, text), out in zip(short, translated):
+                results[i] = out
+                if out and out.strip(): self.cache.put(self._key(text, src_lang, target_lang), out)
+        for i, text in long_: results[i] = self.translate(text, src_lang, target_lang)
+        return results
+
+    def stats(self):
+        return dict(self.cache.stats(), backend=self.backend.name, coalesced=self.coalesced, inflight=len(self._inflight))
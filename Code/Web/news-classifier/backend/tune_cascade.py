@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Huấn luyện tầng TF-IDF/LR của cascade và chọn dải bất định từ dữ liệu validation.
+
+1. Tầng 1 (cascade.py) học trên văn bản đã tiền xử lý ĐÚNG như lúc phục vụ (preprocess_texts + stopwords).
+2. Trên tập validation: P(Fake) của tầng 1 + dự đoán của mô hình lớn (logits dùng chung cache với distill.py).
+   Dải (lower, upper) được chọn để tầng 1 trả lời nhiều bài nhất mà accuracy của cả cascade >= mục tiêu
+   (mặc định: accuracy của mô hình lớn - --max-drop).
+3. Báo cáo: tỉ lệ bài tầng 1 trả lời, độ trễ mỗi bài của từng tầng (lô 1, qua predict_probabilities() như server)
+   và độ trễ trung bình kỳ vọng của cascade so với chỉ chạy mô hình lớn. Kết quả ghi vào CASCADE_PATH + cascade_report.json.
+
+Phục vụ: CASCADE=1 python model.py (CASCADE_LOWER / CASCADE_UPPER ghi đè dải đã chọn).
+Chạy: python tune_cascade.py --train-csv ../../../../Dataset/.../train.csv --val-csv .../val.csv [--target-accuracy 0.97]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+
+def per_doc_ms(fn, texts):
+    """Độ trễ p50 (ms) khi gọi fn([văn bản]) từng bài một."""
+    latencies = []
+    for text in texts:
+        start = time.perf_counter(); fn([text]); latencies.append(time.perf_counter() - start)
+    return float(np.percentile(latencies, 50) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train-csv", nargs="*", default=None, help="CSV 'text;label' để huấn luyện tầng 1 (bỏ trống: dùng lại CASCADE_PATH)")
+    parser.add_argument("--val-csv", nargs="*", default=None, help="mặc định: mọi Dataset/New_Dataset/*/test.csv")
+    parser.add_argument("--teacher", default=os.environ.get("DEFAULT_MODEL"), help="mô hình lớn nhận bài bất định (mặc định: DEFAULT_MODEL)")
+    parser.add_argument("--estimator", choices=["lr", "mlp"], default="lr")
+    parser.add_argument("--target-accuracy", type=float, default=None, help="accuracy tối thiểu của cascade trên tập validation")
+    parser.add_argument("--max-drop", type=float, default=0.005, help="khi không có --target-accuracy: accuracy mô hình lớn - max-drop")
+    parser.add_argument("--teacher-ms", type=float, default=None, help="độ trễ mỗi bài của mô hình lớn nếu không tải được để đo")
+    parser.add_argument("--limit", type=int, default=None, help="chỉ dùng N bài huấn luyện (chạy thử)")
+    parser.add_argument("--val-limit", type=int, default=2000)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument("--out", default=None, help="mặc định: CASCADE_PATH")
+    args = parser.parse_args()
+    if args.teacher: os.environ["DEFAULT_MODEL"] = args.teacher
+    import model as backend
+    from cascade import CascadeStage, choose_band
+    from distill import read_corpus, teacher_logits
+    teacher_name = args.teacher or (backend.REGISTRY.default_name if backend.REGISTRY is not None else None)
+    if teacher_name is None: raise SystemExit("❌ Cần --teacher (không có registry mô hình).")
+    out = args.out or backend.CASCADE_PATH; stop_words = backend.get_stop_words()
+
+    if args.train_csv:
+        texts, labels = read_corpus(args.train_csv, args.limit); texts = backend.preprocess_texts(texts, stop_words)
+        start = time.perf_counter(); stage = CascadeStage.fit(texts, labels, estimator=args.estimator)
+        print(f"✅ Tầng 1 '{stage.name}' học xong {len(texts)} bài trong {time.perf_counter() - start:.1f}s")
+    else: stage = CascadeStage.load(out); print(f"📂 Dùng lại tầng 1 '{stage.name}' từ {out}")
+
+    if args.val_csv: val_texts, val_labels = read_corpus(args.val_csv, args.val_limit)
+    else:
+        from bench_common import load_test_texts
+        val_texts, val_labels = load_test_texts(limit=args.val_limit, with_labels=True)
+    val_texts = backend.preprocess_texts(val_texts, stop_words); val_labels = np.asarray(val_labels)
+    stage_probabilities = stage.probabilities(val_texts)
+    big_predictions = teacher_logits(val_texts, teacher_name).argmax(axis=1)
+    big_accuracy = float((big_predictions == val_labels).mean()); stage_accuracy = float((stage_probabilities.argmax(axis=1) == val_labels).mean())
+    target = args.target_accuracy if args.target_accuracy is not None else big_accuracy - args.max_drop
+    lower, upper, accuracy, answered = choose_band(stage_probabilities, big_predictions, val_labels, target)
+    stage.set_band(lower, upper)
+
+    samples = val_texts[:args.latency_samples]
+    stage_ms = per_doc_ms(stage.probabilities, samples); big_ms = args.teacher_ms
+    if backend.REGISTRY is not None:
+        with backend.REGISTRY.use(teacher_name) as bundle:
+            backend.warmup_model(bundle); big_ms = per_doc_ms(lambda batch: backend.predict_probabilities(batch, bundle), samples)
+    cascade_ms = stage_ms + (1 - answered) * big_ms if big_ms is not None else None
+
+    report = {"stage": stage.name, "teacher": teacher_name, "val_texts": len(val_texts), "band": [lower, upper], "target_accuracy": target,
+              "teacher_accuracy": big_accuracy, "stage_accuracy": stage_accuracy, "cascade_accuracy": accuracy,
+              "answered_fraction": answered, "escalated_fraction": 1 - answered, "stage_ms": stage_ms, "teacher_ms": big_ms,
+              "cascade_ms": cascade_ms, "latency_saved_fraction": 1 - cascade_ms / big_ms if cascade_ms is not None else None,
+              "tradeoff": [dict(zip(("max_drop", "lower", "upper", "accuracy", "answered_fraction"),
+                                    (drop, *choose_band(stage_probabilities, big_predictions, val_labels, big_accuracy - drop))))
+                           for drop in (0.0, 0.005, 0.01, 0.02, 0.05)]}
+    stage.metadata.update({k: report[k] for k in ("teacher", "target_accuracy", "cascade_accuracy", "answered_fraction")})
+    stage.save(out)
+    with open(os.path.join(os.path.dirname(os.path.abspath(out)), "cascade_report.json"), "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+
+    print(f"\n📊 Validation: {len(val_texts)} bài | mô hình lớn {big_accuracy:.4f} | tầng 1 một mình {stage_accuracy:.4f} | mục tiêu {target:.4f}")
+    print(f"{'giảm tối đa':>12}{'lower':>8}{'upper':>8}{'accuracy':>10}{'tầng 1 trả lời':>16}")
+    for row in report["tradeoff"]:
+        print(f"{row['max_drop']:>12.3f}{row['lower']:>8.3f}{row['upper']:>8.3f}{row['accuracy']:>10.4f}{row['answered_fraction']:>16.1%}")
+    print(f"✅ Dải đã chọn ({lower:.3f}, {upper:.3f}): cascade accuracy {accuracy:.4f}, tầng 1 trả lời {answered:.1%}, "
+          f"{1 - answered:.1%} bài chuyển lên '{teacher_name}'")
+    if cascade_ms is not None:
+        print(f"⏱️ Mỗi bài (p50, lô 1): tầng 1 {stage_ms:.2f} ms, mô hình lớn {big_ms:.2f} ms -> cascade ~{cascade_ms:.2f} ms "
+              f"(tiết kiệm {report['latency_saved_fraction']:.1%})")
+    else: print(f"⏱️ Tầng 1: {stage_ms:.2f} ms/bài; không đo được mô hình lớn (truyền --teacher-ms để ước tính phần tiết kiệm).")
+    print(f"💾 Đã lưu {out}\n➡️ Phục vụ: CASCADE=1 python model.py")
+
+
+if __name__ == "__main__":
+    main()
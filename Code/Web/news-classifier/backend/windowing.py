@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# --- Suy luận bài dài: chia chuỗi token thành các cửa sổ chồng lấn và gộp logits của các cửa sổ ---
+# Bài vừa một cửa sổ đi đường cũ (một hàng, không đổi gì); bài dài hơn thành nhiều hàng độ dài tối đa, chạy chung
+# MỘT lượt forward với cả lô, rồi logits các cửa sổ của cùng bài được gộp lại theo LONG_DOC_AGGREGATION.
+import numpy as np
+
+AGGREGATIONS = ("mean", "max", "attention")
+
+
+def special_token_layout(tokenizer):
+    """(số token đặc biệt ở đầu, ở cuối) của một chuỗi đơn, vd. RoBERTa <s> ... </s> -> (1, 1); tokenizer học trò -> (0, 0)."""
+    template = list(tokenizer.build_inputs_with_special_tokens([-1]))
+    front = template.index(-1)
+    return front, len(template) - front - 1
+
+
+def split_windows(ids, tokenizer, window, overlap):
+    """Các cửa sổ <= `window` token (kể cả token đặc biệt) phủ toàn bộ `ids`, hai cửa sổ liền nhau chung `overlap` token nội dung.
+
+    Cửa sổ cuối được dời về sát cuối bài nên mọi cửa sổ đều đầy; `ids` vừa một cửa sổ -> [ids].
+    """
+    if len(ids) <= window: return [list(ids)]
+    front, back = special_token_layout(tokenizer)
+    content = list(ids[front:len(ids) - back]); size = window - front - back; stride = max(1, size - overlap)
+    starts = list(range(0, len(content) - size, stride)) + [len(content) - size]
+    return [list(tokenizer.build_inputs_with_special_tokens(content[start:start + size])) for start in starts]
+
+
+def aggregate_logits(logits, mode="mean"):
+    """Gộp logits (n_cửa_sổ, n_nhãn) của một bài thành một hàng.
+
+    mean      : trung bình logits các cửa sổ.
+    max       : logits của cửa sổ tự tin nhất (khoảng cách lớn nhất giữa hai logit cao nhất).
+    attention : trung bình có trọng số softmax(độ tự tin) của từng cửa sổ (mọi cửa sổ đều đầy nên không cần trọng số
+                theo độ dài), nên đoạn mơ hồ (vd. chân trang, quảng cáo) ít ảnh hưởng hơn đoạn mô hình chắc chắn.
+    """
+    logits = np.asarray(logits, dtype=np.float32)
+    if len(logits) == 1: return logits[0]
+    if mode == "mean": return logits.mean(axis=0)
+    top2 = np.sort(logits, axis=1)[:, -2:]; margin = top2[:, 1] - top2[:, 0]
+    if mode == "max": return logits[int(np.argmax(margin))]
+    if mode == "attention":
+        weights = np.exp(margin - margin.max()); weights /= weights.sum()
+        return (weights[:, None] * logits).sum(axis=0)
+    raise ValueError(f"LONG_DOC_AGGREGATION không hợp lệ: {mode} (chọn một trong {AGGREGATIONS})")